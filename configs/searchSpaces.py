@@ -1642,6 +1642,112 @@ ttSELL = [
 
 
 
+#?-------------------------------------------------------
+#?Dynamic Thresholds BUY Search Space
+#?-------------------------------------------------------
+dtBUY = [
+
+    # =====================================================
+    # STDV BANDS BUY — close stretches below EMA - sigma*std
+    # =====================================================
+    {
+        "type": "stdvBandsThreshold",
+
+        "ema_period": [20, 40],
+        "window": [50],
+        "sigma": [1.0, 1.4, 1.8, 2.2],
+        "wd": 0,
+    },
+
+    # =====================================================
+    # KURTOSIS — fat-tailed return regime
+    # =====================================================
+    {
+        "type": "kurtosisThreshold",
+
+        "window": [20, 50],
+        "k_range": [(3.0, 20.0), (6.0, 20.0)],
+    },
+
+    # =====================================================
+    # SKEW — negatively skewed return regime
+    # =====================================================
+    {
+        "type": "skewThreshold",
+
+        "window": [20, 50],
+        "s_range": [(-5.0, -1.0), (-5.0, -2.0)],
+    },
+
+    # =====================================================
+    # STDV + KURTOSIS BUY — stretch below the band while kurtosis cools down
+    # =====================================================
+    {
+        "type": "stdvKurtosisThreshold",
+
+        "ema_p": [40],
+        "window": [50],
+        "sig": [1.4, 1.8],
+        "k_win": [50],
+        "delta_k": [0.5, 0.9],
+        "n": [5],
+    },
+
+    # =====================================================
+    # DERIVATIVE — flat slope (1st derivative near 0)
+    # =====================================================
+    {
+        "type": "derivativeThreshold",
+
+        "k": [40],
+        "alpha": [0.5, 1.0],
+        "derivatives": ["first"],
+        "lower": [-0.001, -0.0005],
+        "upper": [0.001, 0.0005],
+        "wd": 0,
+    },
+]
+
+
+
+
+#?-------------------------------------------------------
+#?Dynamic Thresholds SELL Search Space
+#?-------------------------------------------------------
+dtSELL = [
+
+    # =====================================================
+    # STDV BANDS SELL — close stretches above EMA + sigma*std
+    # =====================================================
+    {
+        "type": "stdvBandsThreshold",
+
+        "ema_period": [20, 40],
+        "window": [50],
+        "sigma": [1.0, 1.4, 1.8, 2.2],
+        "wd": 0,
+        "sell": True,
+    },
+
+    # =====================================================
+    # STDV + KURTOSIS SELL — stretch above the band while kurtosis cools down
+    # =====================================================
+    {
+        "type": "stdvKurtosisThreshold",
+
+        "ema_p": [40],
+        "window": [50],
+        "sig": [1.4, 1.8],
+        "k_win": [50],
+        "delta_k": [0.5, 0.9],
+        "n": [5],
+        "sell": True,
+    },
+]
+
+
+
+
 #?-------------------------------------------------------
 #?Other Custom - exploring Search Spaces
 #?-------------------------------------------------------
@@ -1774,7 +1880,9 @@ ALL_SEARCH_SPACES = {
     "range_buy": irtBUY,
     "range_sell": irtSELL,
     "time_buy": ttBUY,
-    "time_sell": ttSELL
+    "time_sell": ttSELL,
+    "dynamic_buy": dtBUY,
+    "dynamic_sell": dtSELL
 }
 
 
@@ -1 +1,2 @@
-from .fetch_yfinance import *
\ No newline at end of file
+from .fetch_yfinance import *
+from .ohlcv import *
\ No newline at end of file
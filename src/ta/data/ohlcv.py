@@ -0,0 +1,88 @@
+# === External libraries ===
+import numpy as np
+import pandas as pd
+
+
+# ============================================================
+# OHLCV — read-only price container
+# ============================================================
+class OHLCV:
+    """
+    Read-only view of an OHLCV DataFrame.
+
+    Each column is stored once as a numpy array with writeable=False and handed
+    out as zero-copy pd.Series views, so indicator and threshold functions can
+    share one instance without defensive df.copy() calls. Anything that tries
+    to write into a column raises instead of silently corrupting the prices.
+
+    Supports the DataFrame surface the indicator layer uses: df['close'],
+    df[['Date', 'close']], df.columns, df.index, len(df), 'col' in df.
+    """
+
+    def __init__(self, df: pd.DataFrame):
+        if isinstance(df, OHLCV):
+            self.__dict__.update(df.__dict__)
+            return
+        self.index = df.index
+        self._data = {}
+        for col in df.columns:
+            values = np.array(df[col].to_numpy(), copy=True, order="C")   # source dtype kept
+            values.flags.writeable = False
+            self._data[col] = values
+        self._fingerprint = None
+
+    # --- DataFrame-like access ---
+    @property
+    def columns(self) -> pd.Index:
+        return pd.Index(list(self._data))
+
+    @property
+    def empty(self) -> bool:
+        return len(self.index) == 0
+
+    def __len__(self):
+        return len(self.index)
+
+    def __contains__(self, col):
+        return col in self._data
+
+    def __getitem__(self, col):
+        if isinstance(col, (list, tuple)):
+            return pd.DataFrame({c: self[c] for c in col}, index=self.index, copy=False)
+        return pd.Series(self._data[col], index=self.index, name=col, copy=False)
+
+    def values(self, col: str) -> np.ndarray:
+        """The read-only numpy array behind a column."""
+        return self._data[col]
+
+    def to_frame(self) -> pd.DataFrame:
+        """A writable DataFrame copy (for code that needs to add columns)."""
+        return pd.DataFrame({c: v.copy() for c, v in self._data.items()}, index=self.index)
+
+    @property
+    def fingerprint(self) -> str:
+        """Content hash used by the indicator cache, computed once per instance."""
+        if self._fingerprint is None:
+            from src.ta.functions.indicators.indicator_cache import content_hash
+            self._fingerprint = content_hash(self)
+        return self._fingerprint
+
+    # --- pickling (joblib workers): keep columns read-only after transfer ---
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        for values in self._data.values():
+            if values.flags.writeable:
+                values.flags.writeable = False
+
+    def __repr__(self):
+        return f"OHLCV(rows={len(self)}, columns={list(self._data)})"
+
+
+def as_ohlcv(df) -> OHLCV:
+    """Wrap a DataFrame once; OHLCV instances are returned unchanged."""
+    return df if isinstance(df, OHLCV) else OHLCV(df)
+
+
+def as_frame(df) -> pd.DataFrame:
+    """Writable DataFrame for pandas-only code paths."""
+    return df.to_frame() if isinstance(df, OHLCV) else df
@@ -5,29 +5,8 @@ from .volume_indicators import *
 from .threshold_functions import *
 from .universal_indicator_dispatcher import *
 from .universal_threshold_dispatcher import *
+from .registry import indicator_line, indicator_registry
 
 
-# 📌 Indicator mapping for API access
-INDICATOR_MAP = {
-    # --- Momentum ---
-    "rsi": calculate_rsi,
-    "williams": calculate_williams,
-    "roc": calculate_roc,
-    "stochrsi": calculate_stochrsi,
-
-    # --- Trend ---
-    "ma": calculate_ma,
-    "ema": calculate_ema,
-    "ema_ribbon": calculate_ema_ribbon,
-    "ema_crossover": calculate_ema_crossover,
-    "macd": calculate_macd,
-    "adx": calculate_adx,
-
-    # --- Volatility ---
-    "bbands": calculate_bbands,
-    "atr": calculate_atr,
-    "donchian": calculate_donchian,
-}
-
-
-
+# 📌 Indicator mapping for API access (generated from the indicator registry)
+INDICATOR_MAP = {name: spec.func for name, spec in indicator_registry().items()}
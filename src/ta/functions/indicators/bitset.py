@@ -0,0 +1,86 @@
+# === External libraries ===
+import numpy as np
+
+from . import kernels
+
+
+# Signal algebra on packed bitsets aligned to the dataset rows.
+#
+# A rule's signals over n bars are ceil(n / 64) uint64 words, bar i being bit
+# i % 64 of word i // 64. AND / OR / AND-NOT are one vectorized word operation
+# per 64 bars and a combination is scored by popcount, so joining rules costs
+# microseconds whatever their signal counts; positions (and dates) are only
+# unpacked for the results someone reads. SignalSet.words / from_words and its
+# &, |, - operators are built on these.
+
+
+def n_words(n: int) -> int:
+    return (int(n) + 63) // 64
+
+
+def to_words(positions, n: int) -> np.ndarray:
+    """Bitset of n bars with the given row positions set."""
+    return kernels.pack_positions(np.asarray(positions, dtype=np.int64), n_words(n))
+
+
+def to_positions(words, count: int = None) -> np.ndarray:
+    """Sorted int32 positions of the set bits (count: popcount, if already known)."""
+    words = np.ascontiguousarray(words, dtype=np.uint64)
+    return kernels.unpack_words(words, popcount(words) if count is None else int(count))
+
+
+def popcount(words) -> int:
+    return int(kernels.popcount(np.ascontiguousarray(words, dtype=np.uint64)))
+
+
+def bits_and(words: list) -> np.ndarray:
+    """Bars set in every bitset."""
+    out = np.array(words[0], dtype=np.uint64)
+    for w in words[1:]:
+        np.bitwise_and(out, w, out=out)
+    return out
+
+
+def bits_or(words: list) -> np.ndarray:
+    """Bars set in any bitset."""
+    out = np.array(words[0], dtype=np.uint64)
+    for w in words[1:]:
+        np.bitwise_or(out, w, out=out)
+    return out
+
+
+def bits_andnot(words, *others) -> np.ndarray:
+    """Bars set in words and in none of the others."""
+    out = np.array(words, dtype=np.uint64)
+    for w in others:
+        np.bitwise_and(out, ~np.asarray(w, dtype=np.uint64), out=out)
+    return out
+
+
+def bits_spread(words, radius: int, n: int) -> np.ndarray:
+    """Forward dilation: bar i is set when the bitset has a bar in i - radius .. i (within n bars)."""
+    out = kernels.spread_words(np.ascontiguousarray(words, dtype=np.uint64), max(int(radius), 0))
+    if n % 64:
+        out[-1] &= np.uint64((1 << (n % 64)) - 1)
+    return out
+
+
+def bits_k_of_n(words: list, k: int, n: int) -> np.ndarray:
+    """
+    Bars set in at least k of the bitsets.
+
+    Parameters:
+        words (list): Bitsets of the same n bars
+        k (int): Minimum number of bitsets (k <= 0: every bar, k > len(words): none)
+        n (int): Number of bars (bounds the k <= 0 case)
+    """
+    k = int(k)
+    if k <= 0:
+        return to_words(np.arange(n), n)
+    if k > len(words):
+        return np.zeros(n_words(n), dtype=np.uint64)
+    if k == 1:
+        return bits_or(words)
+    if k == len(words):
+        return bits_and(words)
+    return kernels.at_least(np.ascontiguousarray(np.vstack(words), dtype=np.uint64), k)
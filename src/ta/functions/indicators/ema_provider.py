@@ -0,0 +1,101 @@
+# === External libraries ===
+import os
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from . import kernels
+from .indicator_cache import DatasetRegistry
+
+
+# One memo of close.ewm(span=s, adjust=False).mean() per span and dataset.
+#
+# EMA, EMA ribbon, EMA crossover, MACD and the stdv-bands threshold all start
+# from EMAs of the close. A MACD grid over fast x slow x signal only has
+# len(fast) + len(slow) distinct EMAs; the provider computes each once (missing
+# spans of a request in a single fused pass) and hands out read-only arrays:
+#
+#     emas = ema_provider(df)
+#     fast, slow = emas.ema(12), emas.ema(26)
+#     ribbon = emas.emas([8, 13, 21, 34, 55, 89, 144, 233])   # (n, 8)
+
+MAX_SPANS = 64     # memoized spans per dataset (oldest dropped first)
+
+
+# ============================================================
+# Provider
+# ============================================================
+class EMAProvider:
+    """Memoized ``ewm(span, adjust=False).mean()`` of one series."""
+
+    def __init__(self, x, max_spans: int = MAX_SPANS):
+        self.x = np.array(x, dtype=np.float64, order="C")
+        self.x.flags.writeable = False
+        self.max_spans = max_spans
+        self._emas = OrderedDict()
+        self._lock = threading.Lock()
+
+    def ema(self, span) -> np.ndarray:
+        """EMA of one span (the memoized read-only array itself)."""
+        return self._columns([span])[0]
+
+    def emas(self, spans) -> np.ndarray:
+        """(n_bars x len(spans)) matrix; spans not memoized yet are computed in one fused pass."""
+        columns = self._columns(spans)
+        return np.column_stack(columns) if columns else np.empty((len(self.x), 0))
+
+    def _columns(self, spans):
+        spans = [_span_key(s) for s in spans]
+        with self._lock:
+            found = {s: self._emas[s] for s in spans if s in self._emas}
+        missing = [s for s in dict.fromkeys(spans) if s not in found]
+        if missing:
+            alphas = np.array([kernels.span_alpha(s) for s in missing])
+            fresh = kernels.ewm_bank(self.x, alphas, False)
+            for j, s in enumerate(missing):
+                column = np.ascontiguousarray(fresh[:, j])
+                column.flags.writeable = False
+                found[s] = column
+        with self._lock:
+            for s in spans:
+                self._emas[s] = found[s]
+                self._emas.move_to_end(s)
+            while len(self._emas) > self.max_spans:
+                self._emas.popitem(last=False)
+        return [found[s] for s in spans]
+
+    def __len__(self):
+        return len(self.x)
+
+
+def _span_key(span):
+    span = float(span)
+    return int(span) if span.is_integer() else span
+
+
+# ============================================================
+# Per-dataset registry
+# ============================================================
+_providers = DatasetRegistry(lambda df, col: EMAProvider(df[col].to_numpy(dtype=np.float64)), max_datasets=8)
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_providers._reset_lock)
+
+
+def ema_provider(df: pd.DataFrame, col: str = "close") -> EMAProvider:
+    """
+    The EMAProvider of one column of a dataset, shared across indicator calls.
+
+    Parameters:
+        df (pd.DataFrame | OHLCV): Price data
+        col (str): Column the EMAs are taken of
+
+    Returns:
+        EMAProvider keyed on (dataset fingerprint, col)
+    """
+    return _providers.get(df, col)
+
+
+def clear_ema_providers() -> None:
+    _providers.clear()
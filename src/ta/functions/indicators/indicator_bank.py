@@ -0,0 +1,223 @@
+# === External libraries ===
+from dataclasses import dataclass, field
+
+import numpy as np
+import pandas as pd
+
+from . import kernels
+from .ema_provider import ema_provider
+from .moment_index import moment_index
+from .precision import as_output
+from .range_index import extremum_index
+from .registry import get_indicator, indicator_registry
+from .universal_indicator_dispatcher import _calculate_indicator_kernel, _price_array, _stochrsi_k, _williams
+
+
+# ============================================================
+# Parameter layout per indicator
+# ============================================================
+# Positional order used when a bank is requested with plain tuples, plus the
+# defaults calculate_indicator falls back to for missing keys: the registry
+# schema of every indicator with scalar parameters (i.e. all but ema_ribbon).
+BANK_PARAMS = {
+    name: spec.params
+    for name, spec in indicator_registry().items()
+    if not any(isinstance(default, (list, tuple)) for _, default in spec.params)
+}
+
+
+@dataclass
+class IndicatorBank:
+    """
+    One indicator line evaluated for many parameter sets over the same bars.
+
+    values[:, j] holds the line for params[j]; valid[:, j] marks the rows the
+    matching calculate_indicator frame would keep (NaN + warm-up masking).
+    """
+    type: str
+    line: str
+    params: list
+    values: np.ndarray
+    valid: np.ndarray
+    index: pd.Index = field(repr=False)
+    dates: np.ndarray = field(repr=False)
+
+    def __len__(self):
+        return len(self.params)
+
+    def column(self, j: int):
+        """(row positions, values) of column j, i.e. the rows of the indicator frame."""
+        rows = np.flatnonzero(self.valid[:, j])
+        return rows, self.values[rows, j]
+
+    def frame(self, j: int) -> pd.DataFrame:
+        """Column j in the ['Date', line] layout calculate_indicator returns."""
+        rows, values = self.column(j)
+        return pd.DataFrame({"Date": self.dates[rows], self.line: values}, index=self.index[rows])
+
+
+# ============================================================
+# Public API
+# ============================================================
+def canonical_params(type: str, params) -> tuple:
+    """Resolve an int / tuple / dict parameter set to the full positional tuple."""
+    layout = BANK_PARAMS[type]
+    if isinstance(params, dict):
+        return tuple(_canonical_value(params.get(name, default)) for name, default in layout)
+    if not isinstance(params, (tuple, list)):
+        params = (params,)
+    params = tuple(params) + tuple(default for _, default in layout[len(params):])
+    return tuple(_canonical_value(p) for p in params[:len(layout)])
+
+
+def indicator_bank(df: pd.DataFrame, type: str, params: list, line: str = None) -> IndicatorBank:
+    """
+    Compute one indicator for every parameter set in a single pass.
+
+    Parameters:
+        df (pd.DataFrame): OHLCV with 'Date'
+        type (str): Indicator type (same names as calculate_indicator)
+        params (list): ints, tuples (BANK_PARAMS order) or kwarg dicts
+        line (str): Output column for multi-line indicators
+                    (default: the first column, as the threshold functions use)
+
+    Returns:
+        IndicatorBank with an (n_bars x n_params) value matrix and valid mask
+    """
+    type = type.lower()
+    if type not in BANK_PARAMS:
+        raise ValueError(f"Unsupported indicator type: {type}")
+
+    resolved = [canonical_params(type, p) for p in params]
+    unique = list(dict.fromkeys(resolved))
+    n = len(df)
+
+    builder = _BUILDERS.get(type)
+    if builder is not None and line in (None, _default_line(type)):
+        values = builder(df, unique)
+        line = _default_line(type)
+        valid = ~np.isnan(values)
+        spec = get_indicator(type)
+        if spec.masked:
+            warmups = np.array([spec.warmup_bars(dict(zip(spec.names, p))) for p in unique], dtype=np.int64)
+            valid &= np.arange(n)[:, None] >= warmups[None, :]
+    else:
+        values, valid, line = _generic_bank(df, type, unique, line)
+
+    position = {p: j for j, p in enumerate(unique)}
+    cols = np.array([position[p] for p in resolved], dtype=np.int64)
+    if len(unique) != len(resolved):
+        values, valid = values[:, cols], valid[:, cols]
+
+    values = as_output(np.where(valid, values, np.nan))
+    return IndicatorBank(type, line, resolved, values, valid, df.index, df["Date"].to_numpy())
+
+
+# ============================================================
+# Builders (shared intermediates)
+# ============================================================
+def _canonical_value(x):
+    if isinstance(x, (list, tuple, set)):
+        return tuple(x)
+    if isinstance(x, np.generic):
+        return x.item()
+    return x
+
+
+def _periods(unique):
+    return np.array([int(p[0]) for p in unique], dtype=np.int64)
+
+
+def _default_line(type: str) -> str:
+    return get_indicator(type).line({})
+
+
+def _bank_rsi(df, unique):
+    return kernels.rsi_bank(_price_array(df, "close"), _periods(unique))
+
+
+def _bank_ma(df, unique):
+    return moment_index(df).moments(_periods(unique))[0]
+
+
+def _bank_bbands(df, unique):
+    # lower band (default line) for every (period, std) pair in one broadcast
+    return moment_index(df).bands(unique)[0]
+
+
+def _bank_atr(df, unique):
+    tr = kernels.true_range(_price_array(df, "high"), _price_array(df, "low"), _price_array(df, "close"))
+    return kernels.sma_bank(tr, _periods(unique))
+
+
+def _bank_adx(df, unique):
+    return kernels.adx_bank(_price_array(df, "high"), _price_array(df, "low"), _price_array(df, "close"), _periods(unique))
+
+
+def _bank_macd(df, unique):
+    # every distinct fast/slow span once, in one fused pass
+    spans = list(dict.fromkeys(s for fast, slow, _ in unique for s in (fast, slow)))
+    emas = ema_provider(df).emas(spans)
+    col = {s: j for j, s in enumerate(spans)}
+    fast = np.array([col[p[0]] for p in unique], dtype=np.int64)
+    slow = np.array([col[p[1]] for p in unique], dtype=np.int64)
+    return emas[:, fast] - emas[:, slow]
+
+
+def _bank_stochrsi(df, unique):
+    # RSI per length and its rolling extremes come from the dataset's ExtremumIndex
+    close, index = _price_array(df, "close"), extremum_index(df)
+    out = np.empty((len(close), len(unique)))
+    for j, (rsi_length, stoch_length, k, d) in enumerate(unique):
+        # the frame path drops rows where %D is NaN too; %D is NaN exactly where %K is
+        out[:, j] = _stochrsi_k(index, close, int(rsi_length), int(stoch_length), k)
+    return out
+
+
+def _bank_williams(df, unique):
+    close, index = _price_array(df, "close"), extremum_index(df)
+    out = np.empty((len(close), len(unique)))
+    for j, p in enumerate(_periods(unique)):
+        out[:, j] = _williams(index, close, p)
+    return out
+
+
+def _bank_donchian(df, unique):
+    # lower band (default line), kept only where the frame's upper band is defined
+    index = extremum_index(df)
+    out = np.empty((len(df), len(unique)))
+    for j, p in enumerate(_periods(unique)):
+        upper = index.rolling_max("high", p)
+        out[:, j] = np.where(np.isnan(upper), np.nan, index.rolling_min("low", p))
+    return out
+
+
+_BUILDERS = {
+    "rsi": _bank_rsi,
+    "ma": _bank_ma,
+    "atr": _bank_atr,
+    "adx": _bank_adx,
+    "macd": _bank_macd,
+    "stochrsi": _bank_stochrsi,
+    "williams": _bank_williams,
+    "donchian": _bank_donchian,
+    "bbands": _bank_bbands,
+}
+
+
+def _generic_bank(df, type, unique, line):
+    # one kernel call per distinct parameter set, aligned on the input rows
+    layout = BANK_PARAMS[type]
+    n = len(df)
+    values = np.full((n, len(unique)), np.nan)
+    valid = np.zeros((n, len(unique)), dtype=bool)
+    for j, p in enumerate(unique):
+        kwargs = {name: (list(v) if isinstance(v, tuple) else v) for (name, _), v in zip(layout, p)}
+        if line is not None:
+            kwargs["line"] = line
+        frame = _calculate_indicator_kernel(df, type, **kwargs)
+        col = line if line in frame.columns else get_indicator(type).line(kwargs)
+        rows = df.index.get_indexer(frame.index)
+        values[rows, j] = frame[col].to_numpy(dtype=np.float64)
+        valid[rows, j] = True
+    return values, valid, col if unique else (line or _default_line(type))
@@ -0,0 +1,213 @@
+# === External libraries ===
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+
+import numpy as np
+import pandas as pd
+
+
+# Process-local, byte-bounded LRU cache for calculate_indicator results.
+#
+# Keys are (dataset fingerprint, indicator type, canonical kwargs, backend), so
+# a threshold sweep that only changes thr / lower / upper / min_candles reuses
+# one indicator frame. Every joblib (loky) worker is its own process and gets
+# its own cache; a lock makes it safe for thread pools (optuna n_jobs), and the
+# lock is re-created after fork so a child never inherits a held lock.
+
+_FINGERPRINT_COLUMNS = ("Date", "open", "high", "low", "close", "volume")
+DEFAULT_CACHE_BYTES = int(float(os.environ.get("TA_INDICATOR_CACHE_MB", 256)) * 1024 * 1024)
+_known = threading.local()
+
+
+# ============================================================
+# Keys
+# ============================================================
+def dataset_fingerprint(df: pd.DataFrame) -> str:
+    """Fast content hash of the price columns, 'Date' and the index (memoized on OHLCV)."""
+    known = getattr(_known, "frame", None)
+    if known is not None and known[0] is df:
+        return known[1]
+    fingerprint = getattr(df, "fingerprint", None)
+    if isinstance(fingerprint, str):
+        return fingerprint
+    return content_hash(df)
+
+
+@contextmanager
+def known_fingerprint(df, fingerprint: str):
+    """Reuse an already computed fingerprint for this exact frame (per thread) inside the block."""
+    previous = getattr(_known, "frame", None)
+    _known.frame = (df, fingerprint)
+    try:
+        yield
+    finally:
+        _known.frame = previous
+
+
+def content_hash(df) -> str:
+    h = hashlib.blake2b(digest_size=16)
+    h.update(str(len(df)).encode())
+    for col in _FINGERPRINT_COLUMNS:
+        if col in df.columns:
+            h.update(col.encode())
+            h.update(_column_bytes(df[col]))
+    h.update(_column_bytes(df.index))
+    return h.hexdigest()
+
+
+def _column_bytes(values) -> bytes:
+    arr = np.asarray(values)
+    if arr.dtype == object:
+        return repr(arr.tolist()).encode()
+    if arr.dtype.kind == "M":
+        arr = arr.view(np.int64)
+    return np.ascontiguousarray(arr).tobytes()
+
+
+def canonical_kwargs(kwargs: dict) -> tuple:
+    """Hashable, order-independent form of indicator kwargs (lists -> tuples, numpy -> python)."""
+    return tuple(sorted((k, _canonical(v)) for k, v in kwargs.items()))
+
+
+def _canonical(v):
+    if isinstance(v, dict):
+        return canonical_kwargs(v)
+    if isinstance(v, (list, tuple, set, np.ndarray)):
+        return tuple(_canonical(x) for x in v)
+    if isinstance(v, np.generic):
+        return v.item()
+    return v
+
+
+# ============================================================
+# Cache
+# ============================================================
+class IndicatorCache:
+    """LRU mapping key -> DataFrame, evicting least recently used entries over max_bytes."""
+
+    def __init__(self, max_bytes: int = DEFAULT_CACHE_BYTES):
+        self.max_bytes = int(max_bytes)
+        self.enabled = True
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, frame: pd.DataFrame) -> None:
+        size = int(frame.memory_usage(index=True, deep=False).sum())
+        with self._lock:
+            if size > self.max_bytes:
+                return
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= old[1]
+            self._entries[key] = (frame, size)
+            self._bytes += size
+            self._evict()
+
+    def resize(self, max_bytes: int) -> None:
+        with self._lock:
+            self.max_bytes = int(max_bytes)
+            self._evict()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+            self.hits = self.misses = self.evictions = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+            }
+
+    def _evict(self):
+        while self._bytes > self.max_bytes and self._entries:
+            _, (_, size) = self._entries.popitem(last=False)
+            self._bytes -= size
+            self.evictions += 1
+
+    def _reset_lock(self):
+        self._lock = threading.Lock()
+
+
+class DatasetRegistry:
+    """Keeps one derived object per dataset (by fingerprint) for the last few datasets."""
+
+    def __init__(self, factory, max_datasets: int = 8):
+        self.factory = factory
+        self.max_datasets = max_datasets
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, df, *key):
+        key = (dataset_fingerprint(df),) + key
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                return entry
+        entry = self.factory(df, *key[1:])
+        with self._lock:
+            entry = self._entries.setdefault(key, entry)
+            while len(self._entries) > self.max_datasets:
+                self._entries.popitem(last=False)
+        return entry
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def _reset_lock(self):
+        self._lock = threading.Lock()
+
+
+_cache = IndicatorCache()
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_cache._reset_lock)
+
+
+# ============================================================
+# Module-level API
+# ============================================================
+def get_indicator_cache() -> IndicatorCache:
+    return _cache
+
+
+def set_indicator_cache(enabled: bool = True, max_bytes: int = None) -> None:
+    """Turn the calculate_indicator cache on/off and optionally change its memory budget."""
+    _cache.enabled = enabled
+    if max_bytes is not None:
+        _cache.resize(max_bytes)
+    if not enabled:
+        _cache.clear()
+
+
+def indicator_cache_stats() -> dict:
+    """hits / misses / evictions / entries / bytes / max_bytes of this process' cache."""
+    return _cache.stats()
+
+
+def clear_indicator_cache() -> None:
+    _cache.clear()
@@ -0,0 +1,781 @@
+# === External libraries ===
+import numpy as np
+from numba import njit
+
+
+# Array-in / array-out indicator kernels.
+#
+# Every kernel takes contiguous float64 arrays and returns float64 arrays of the
+# same length, with NaN where the pandas/finta reference would be NaN. The
+# recurrences below mirror the reference implementations bar for bar
+# (pandas ``ewm``/``rolling`` and finta's RSI/ATR/ADX) so results agree to
+# floating point round-off; ``calculate_indicator`` wraps them back into the
+# usual ['Date', <cols>] DataFrames.
+
+
+# ============================================================
+# Building blocks
+# ============================================================
+@njit(cache=True, error_model="numpy")
+def ewm_mean(x, alpha, adjust):
+    """
+    Exponentially weighted mean, identical to
+    ``pd.Series(x).ewm(alpha=alpha, adjust=adjust).mean()`` (ignore_na=False).
+    """
+    n = x.shape[0]
+    out = np.empty(n)
+    if n == 0:
+        return out
+
+    old_wt_factor = 1.0 - alpha
+    new_wt = 1.0 if adjust else alpha
+
+    weighted = x[0]
+    is_observation = weighted == weighted
+    nobs = 1 if is_observation else 0
+    out[0] = weighted if nobs > 0 else np.nan
+    old_wt = 1.0
+
+    for i in range(1, n):
+        cur = x[i]
+        is_observation = cur == cur
+        if is_observation:
+            nobs += 1
+        if weighted == weighted:
+            old_wt *= old_wt_factor
+            if is_observation:
+                if weighted != cur:
+                    weighted = ((old_wt * weighted) + (new_wt * cur)) / (old_wt + new_wt)
+                if adjust:
+                    old_wt += new_wt
+                else:
+                    old_wt = 1.0
+        elif is_observation:
+            weighted = cur
+        out[i] = weighted if nobs > 0 else np.nan
+    return out
+
+
+@njit(cache=True, error_model="numpy")
+def ewm_state(x, alpha, adjust):
+    """
+    Final (weighted, old_wt, nobs) of the ewm_mean recursion over x, so a
+    streaming state can continue exactly where the batch pass stopped.
+    """
+    old_wt_factor = 1.0 - alpha
+    new_wt = 1.0 if adjust else alpha
+    weighted = np.nan
+    old_wt = 1.0
+    nobs = 0
+    for i in range(x.shape[0]):
+        cur = x[i]
+        is_observation = cur == cur
+        if is_observation:
+            nobs += 1
+        if weighted == weighted:
+            old_wt *= old_wt_factor
+            if is_observation:
+                if weighted != cur:
+                    weighted = ((old_wt * weighted) + (new_wt * cur)) / (old_wt + new_wt)
+                if adjust:
+                    old_wt += new_wt
+                else:
+                    old_wt = 1.0
+        elif is_observation:
+            weighted = cur
+    return weighted, old_wt, nobs
+
+
+@njit(cache=True, error_model="numpy")
+def ewm_bank(x, alphas, adjust):
+    """``ewm_mean`` for every alpha in one fused pass over x -> (n, len(alphas))."""
+    n = x.shape[0]
+    k = alphas.shape[0]
+    out = np.empty((n, k))
+    weighted = np.full(k, np.nan)
+    old_wt = np.ones(k)
+    nobs = 0
+    for i in range(n):
+        cur = x[i]
+        is_observation = cur == cur
+        if is_observation:
+            nobs += 1
+        for j in range(k):
+            w = weighted[j]
+            if w == w:
+                alpha = alphas[j]
+                old_wt[j] *= 1.0 - alpha
+                if is_observation:
+                    new_wt = 1.0 if adjust else alpha
+                    if w != cur:
+                        weighted[j] = ((old_wt[j] * w) + (new_wt * cur)) / (old_wt[j] + new_wt)
+                    if adjust:
+                        old_wt[j] += new_wt
+                    else:
+                        old_wt[j] = 1.0
+            elif is_observation:
+                weighted[j] = cur
+            out[i, j] = weighted[j] if nobs > 0 else np.nan
+    return out
+
+
+@njit(cache=True)
+def span_alpha(span):
+    """``ewm(span=...)`` smoothing factor."""
+    return 2.0 / (span + 1.0)
+
+
+@njit(cache=True, error_model="numpy")
+def rolling_mean(x, window):
+    """``rolling(window).mean()``: NaN until ``window`` valid values are in view."""
+    n = x.shape[0]
+    out = np.full(n, np.nan)
+    total = 0.0
+    comp = 0.0
+    nan_count = 0
+    for i in range(n):
+        v = x[i]
+        if v == v:
+            # Kahan-compensated running sum
+            y = v - comp
+            t = total + y
+            comp = (t - total) - y
+            total = t
+        else:
+            nan_count += 1
+        if i >= window:
+            old = x[i - window]
+            if old == old:
+                y = -old - comp
+                t = total + y
+                comp = (t - total) - y
+                total = t
+            else:
+                nan_count -= 1
+        if i >= window - 1 and nan_count == 0:
+            out[i] = total / window
+    return out
+
+
+@njit(cache=True)
+def _rolling_extreme(x, window, is_max):
+    # Monotonic deque: indices whose values are strictly better than everything after them.
+    n = x.shape[0]
+    out = np.full(n, np.nan)
+    dq = np.empty(n, dtype=np.int64)
+    head = 0
+    tail = 0
+    last_nan = -1
+    for i in range(n):
+        v = x[i]
+        if v != v:
+            last_nan = i
+        else:
+            if is_max:
+                while tail > head and x[dq[tail - 1]] <= v:
+                    tail -= 1
+            else:
+                while tail > head and x[dq[tail - 1]] >= v:
+                    tail -= 1
+            dq[tail] = i
+            tail += 1
+        while tail > head and dq[head] <= i - window:
+            head += 1
+        if i >= window - 1 and i - last_nan >= window and tail > head:
+            out[i] = x[dq[head]]
+    return out
+
+
+@njit(cache=True)
+def rolling_max(x, window):
+    """``rolling(window).max()`` in O(n)."""
+    return _rolling_extreme(x, window, True)
+
+
+@njit(cache=True)
+def rolling_min(x, window):
+    """``rolling(window).min()`` in O(n)."""
+    return _rolling_extreme(x, window, False)
+
+
+@njit(cache=True)
+def shift(x, periods):
+    """``Series.shift(periods)`` for positive or negative ``periods``."""
+    n = x.shape[0]
+    out = np.full(n, np.nan)
+    if periods >= 0:
+        for i in range(periods, n):
+            out[i] = x[i - periods]
+    else:
+        for i in range(0, n + periods):
+            out[i] = x[i - periods]
+    return out
+
+
+@njit(cache=True)
+def true_range(high, low, close):
+    """finta ``TR``: max(|H-L|, |H-C[-1]|, |C[-1]-L|), NaN terms skipped."""
+    n = high.shape[0]
+    out = np.empty(n)
+    for i in range(n):
+        tr = abs(high[i] - low[i])
+        if i > 0:
+            prev = close[i - 1]
+            a = abs(high[i] - prev)
+            b = abs(prev - low[i])
+            if a > tr:
+                tr = a
+            if b > tr:
+                tr = b
+        out[i] = tr
+    return out
+
+
+# ============================================================
+# Range-extremum index (sparse table)
+# ============================================================
+@njit(cache=True)
+def sparse_table(x, is_max):
+    """
+    Level k holds the max (or min) of x[i : i + 2**k]; NaNs are ignored here and
+    tracked separately by ``nan_prefix_count``. Built once in O(n log n), any
+    window is then answered with two lookups per bar.
+    """
+    n = x.shape[0]
+    levels = 1
+    while (1 << levels) <= n:
+        levels += 1
+    fill = -np.inf if is_max else np.inf
+    table = np.empty((levels, n))
+    for i in range(n):
+        v = x[i]
+        table[0, i] = v if v == v else fill
+    for k in range(1, levels):
+        half = 1 << (k - 1)
+        for i in range(n - (1 << k) + 1):
+            a = table[k - 1, i]
+            b = table[k - 1, i + half]
+            if is_max:
+                table[k, i] = a if a >= b else b
+            else:
+                table[k, i] = a if a <= b else b
+        for i in range(max(n - (1 << k) + 1, 0), n):
+            table[k, i] = fill
+    return table
+
+
+@njit(cache=True)
+def nan_prefix_count(x):
+    """Number of NaNs in x[:i], with a leading zero."""
+    n = x.shape[0]
+    cs = np.zeros(n + 1, dtype=np.int64)
+    for i in range(n):
+        cs[i + 1] = cs[i] + (1 if x[i] != x[i] else 0)
+    return cs
+
+
+@njit(cache=True)
+def sparse_query(table, nan_cs, window, is_max):
+    """``rolling(window).max()/min()`` from a sparse table: NaN if the window is short or holds a NaN."""
+    n = table.shape[1]
+    out = np.full(n, np.nan)
+    if window < 1:
+        return out
+    k = 0
+    while (1 << (k + 1)) <= window:
+        k += 1
+    span = 1 << k
+    for i in range(window - 1, n):
+        if nan_cs[i + 1] - nan_cs[i + 1 - window] != 0:
+            continue
+        a = table[k, i + 1 - window]
+        b = table[k, i + 1 - span]
+        if is_max:
+            out[i] = a if a >= b else b
+        else:
+            out[i] = a if a <= b else b
+    return out
+
+
+# ============================================================
+# Moment index (compensated prefix sums)
+# ============================================================
+@njit(cache=True)
+def moment_prefix(x, center):
+    """
+    Kahan prefix sums of (x - center) and (x - center)**2, NaN counted as 0.
+
+    Rows: sum, its compensation, sum of squares, its compensation, NaN count.
+    Keeping the compensation terms makes window sums ``(s[b] - s[a]) - (c[b] - c[a])``
+    accurate to round-off of the window itself, not of the whole history.
+    """
+    n = x.shape[0]
+    out = np.zeros((5, n + 1))
+    s = 0.0
+    cs = 0.0
+    q = 0.0
+    cq = 0.0
+    nans = 0
+    for i in range(n):
+        v = x[i] - center
+        if v == v:
+            y = v - cs
+            t = s + y
+            cs = (t - s) - y
+            s = t
+            y = v * v - cq
+            t = q + y
+            cq = (t - q) - y
+            q = t
+        else:
+            nans += 1
+        out[0, i + 1] = s
+        out[1, i + 1] = cs
+        out[2, i + 1] = q
+        out[3, i + 1] = cq
+        out[4, i + 1] = nans
+    return out
+
+
+@njit(cache=True, error_model="numpy")
+def moment_bank(x, prefix, center, periods, ddof):
+    """
+    Rolling mean and std for every period from one ``moment_prefix``.
+
+    Windows whose variance is lost in cancellation (tiny relative to the centred
+    second moment, e.g. flat prices) are recomputed directly in two passes.
+    """
+    n = prefix.shape[1] - 1
+    k = periods.shape[0]
+    mean = np.full((n, k), np.nan)
+    std = np.full((n, k), np.nan)
+    for j in range(k):
+        p = periods[j]
+        if p < 1:
+            continue
+        for i in range(p - 1, n):
+            a = i + 1 - p
+            b = i + 1
+            if prefix[4, b] - prefix[4, a] != 0.0:
+                continue
+            s1 = (prefix[0, b] - prefix[0, a]) - (prefix[1, b] - prefix[1, a])
+            s2 = (prefix[2, b] - prefix[2, a]) - (prefix[3, b] - prefix[3, a])
+            m = s1 / p
+            mean[i, j] = center + m
+            if p <= ddof:
+                continue
+            ss = s2 - s1 * m
+            if ss <= 1e-7 * s2:
+                mu = 0.0
+                for t in range(a, b):
+                    mu += x[t]
+                mu /= p
+                ss = 0.0
+                for t in range(a, b):
+                    d = x[t] - mu
+                    ss += d * d
+            var = ss / (p - ddof)
+            std[i, j] = np.sqrt(var) if var > 0.0 else 0.0
+    return mean, std
+
+
+@njit(cache=True)
+def power_prefix(x, center):
+    """
+    Kahan prefix sums of (x - center)**k for k = 1..4, NaN counted as 0.
+
+    Rows 2k-2 / 2k-1: sum of the k-th power and its compensation; row 8: NaN count.
+    """
+    n = x.shape[0]
+    out = np.zeros((9, n + 1))
+    sums = np.zeros(4)
+    comp = np.zeros(4)
+    nans = 0
+    for i in range(n):
+        v = x[i] - center
+        if v == v:
+            p = 1.0
+            for k in range(4):
+                p *= v
+                y = p - comp[k]
+                t = sums[k] + y
+                comp[k] = (t - sums[k]) - y
+                sums[k] = t
+        else:
+            nans += 1
+        for k in range(4):
+            out[2 * k, i + 1] = sums[k]
+            out[2 * k + 1, i + 1] = comp[k]
+        out[8, i + 1] = nans
+    return out
+
+
+@njit(cache=True)
+def same_value_runs(x):
+    """Length of the run of equal consecutive values ending at each bar."""
+    n = x.shape[0]
+    out = np.zeros(n, dtype=np.int64)
+    for i in range(n):
+        out[i] = out[i - 1] + 1 if i > 0 and x[i] == x[i - 1] else 1
+    return out
+
+
+@njit(cache=True, error_model="numpy")
+def moment4_bank(x, prefix, runs, center, periods):
+    """
+    Rolling mean, variance (ddof=1), skew and excess kurtosis for every period
+    from one ``power_prefix``, with pandas' rolling().skew() / .kurt() conventions
+    (bias-corrected; constant windows give 0 and -3; NaN when the variance is ~0).
+
+    Higher moments amplify cancellation, so windows whose mean dominates their
+    spread (after centring on the series mean) are recomputed directly.
+    """
+    n = prefix.shape[1] - 1
+    k = periods.shape[0]
+    mean = np.full((n, k), np.nan)
+    var = np.full((n, k), np.nan)
+    skew = np.full((n, k), np.nan)
+    kurt = np.full((n, k), np.nan)
+    for j in range(k):
+        p = periods[j]
+        if p < 1:
+            continue
+        for i in range(p - 1, n):
+            a = i + 1 - p
+            b = i + 1
+            if prefix[8, b] - prefix[8, a] != 0.0:
+                continue
+            s1 = ((prefix[0, b] - prefix[0, a]) - (prefix[1, b] - prefix[1, a])) / p
+            s2 = ((prefix[2, b] - prefix[2, a]) - (prefix[3, b] - prefix[3, a])) / p
+            s3 = ((prefix[4, b] - prefix[4, a]) - (prefix[5, b] - prefix[5, a])) / p
+            s4 = ((prefix[6, b] - prefix[6, a]) - (prefix[7, b] - prefix[7, a])) / p
+            m = s1
+            c2 = s2 - m * m
+            if c2 <= 1e-3 * s2:
+                mu = 0.0
+                for t in range(a, b):
+                    mu += x[t]
+                mu /= p
+                c2 = 0.0
+                c3 = 0.0
+                c4 = 0.0
+                for t in range(a, b):
+                    d = x[t] - mu
+                    d2 = d * d
+                    c2 += d2
+                    c3 += d2 * d
+                    c4 += d2 * d2
+                c2 /= p
+                c3 /= p
+                c4 /= p
+                mean[i, j] = mu
+            else:
+                c3 = s3 - 3.0 * m * s2 + 2.0 * m * m * m
+                c4 = s4 - 4.0 * m * s3 + 6.0 * m * m * s2 - 3.0 * m * m * m * m
+                mean[i, j] = center + m
+            if c2 < 0.0:
+                c2 = 0.0
+            if p > 1:
+                var[i, j] = c2 * p / (p - 1)
+            constant = runs[i] >= p
+            if p >= 3:
+                if constant:
+                    skew[i, j] = 0.0
+                elif c2 > 1e-14:
+                    skew[i, j] = np.sqrt(p * (p - 1.0)) * c3 / ((p - 2.0) * c2 * np.sqrt(c2))
+            if p >= 4:
+                if constant:
+                    kurt[i, j] = -3.0
+                elif c2 > 1e-14:
+                    kurt[i, j] = ((p * p - 1.0) * c4 / (c2 * c2) - 3.0 * (p - 1.0) ** 2) / ((p - 2.0) * (p - 3.0))
+    return mean, var, skew, kurt
+
+
+# ============================================================
+# Momentum
+# ============================================================
+@njit(cache=True, error_model="numpy")
+def rsi_from_moves(up, down, period):
+    """RSI from precomputed gain/loss series (finta: Wilder alpha, adjust=True)."""
+    alpha = 1.0 / period
+    gain = ewm_mean(up, alpha, True)
+    loss = ewm_mean(down, alpha, True)
+    return 100.0 - (100.0 / (1.0 + gain / loss))
+
+
+@njit(cache=True)
+def price_moves(close):
+    """Split ``close.diff()`` into gains and absolute losses (NaN on the first bar)."""
+    n = close.shape[0]
+    up = np.empty(n)
+    down = np.empty(n)
+    if n > 0:
+        up[0] = np.nan
+        down[0] = np.nan
+    for i in range(1, n):
+        d = close[i] - close[i - 1]
+        up[i] = d if d > 0.0 else 0.0
+        down[i] = -d if d < 0.0 else 0.0
+    return up, down
+
+
+@njit(cache=True, error_model="numpy")
+def rsi(close, period):
+    """finta ``TA.RSI`` (no warm-up masking)."""
+    up, down = price_moves(close)
+    return rsi_from_moves(up, down, period)
+
+
+@njit(cache=True, error_model="numpy")
+def roc(close, period):
+    """Rate of change in percent."""
+    prev = shift(close, period)
+    return (close - prev) / prev * 100.0
+
+
+# ============================================================
+# Trend
+# ============================================================
+@njit(cache=True)
+def macd(close, fast, slow, signal):
+    """MACD line, signal line and the two underlying EMAs."""
+    ema_fast = ewm_mean(close, span_alpha(fast), False)
+    ema_slow = ewm_mean(close, span_alpha(slow), False)
+    line = ema_fast - ema_slow
+    sig = ewm_mean(line, span_alpha(signal), False)
+    return line, sig, ema_fast, ema_slow
+
+
+@njit(cache=True)
+def directional_moves(high, low):
+    """finta DMI +DM / -DM (zero on the first bar)."""
+    n = high.shape[0]
+    plus = np.zeros(n)
+    minus = np.zeros(n)
+    for i in range(1, n):
+        up_move = high[i] - high[i - 1]
+        down_move = low[i - 1] - low[i]
+        if up_move > down_move and up_move > 0.0:
+            plus[i] = up_move
+        if down_move > up_move and down_move > 0.0:
+            minus[i] = down_move
+    return plus, minus
+
+
+@njit(cache=True, error_model="numpy")
+def adx_from_parts(plus, minus, atr_values, period):
+    """finta ``TA.ADX`` given +DM, -DM and ATR for the same period."""
+    alpha = 1.0 / period
+    di_plus = 100.0 * ewm_mean(plus / atr_values, alpha, True)
+    di_minus = 100.0 * ewm_mean(minus / atr_values, alpha, True)
+    dx = np.abs(di_plus - di_minus) / (di_plus + di_minus)
+    return 100.0 * ewm_mean(dx, alpha, True)
+
+
+@njit(cache=True, error_model="numpy")
+def adx(high, low, close, period):
+    """finta ``TA.ADX`` (no warm-up masking)."""
+    plus, minus = directional_moves(high, low)
+    atr_values = rolling_mean(true_range(high, low, close), period)
+    return adx_from_parts(plus, minus, atr_values, period)
+
+
+# ============================================================
+# Volatility
+# ============================================================
+@njit(cache=True)
+def atr(high, low, close, period):
+    """finta ``TA.ATR``: simple moving average of the true range."""
+    return rolling_mean(true_range(high, low, close), period)
+
+
+# ============================================================
+# Multi-period banks (one pass over shared intermediates)
+# ============================================================
+@njit(cache=True)
+def prefix_sum(x):
+    """Cumulative sum with a leading zero: window sums are ``cs[i + 1] - cs[i + 1 - p]``."""
+    n = x.shape[0]
+    cs = np.empty(n + 1)
+    cs[0] = 0.0
+    total = 0.0
+    comp = 0.0
+    for i in range(n):
+        y = x[i] - comp
+        t = total + y
+        comp = (t - total) - y
+        total = t
+        cs[i + 1] = total
+    return cs
+
+
+@njit(cache=True)
+def sma_bank(x, periods):
+    """Simple moving averages for every period from one prefix sum (``x`` must be NaN-free)."""
+    n = x.shape[0]
+    cs = prefix_sum(x)
+    out = np.full((n, periods.shape[0]), np.nan)
+    for j in range(periods.shape[0]):
+        p = periods[j]
+        for i in range(p - 1, n):
+            out[i, j] = (cs[i + 1] - cs[i + 1 - p]) / p
+    return out
+
+
+@njit(cache=True, error_model="numpy")
+def rsi_bank(close, periods):
+    """RSI for every period, sharing the gain/loss split."""
+    up, down = price_moves(close)
+    out = np.empty((close.shape[0], periods.shape[0]))
+    for j in range(periods.shape[0]):
+        out[:, j] = rsi_from_moves(up, down, periods[j])
+    return out
+
+
+@njit(cache=True, error_model="numpy")
+def adx_bank(high, low, close, periods):
+    """ADX for every period, sharing true range, directional moves and the TR prefix sum."""
+    plus, minus = directional_moves(high, low)
+    atr_values = sma_bank(true_range(high, low, close), periods)
+    out = np.empty((close.shape[0], periods.shape[0]))
+    for j in range(periods.shape[0]):
+        out[:, j] = adx_from_parts(plus, minus, atr_values[:, j], periods[j])
+    return out
+
+
+# ============================================================
+# Signal filters
+# ============================================================
+@njit(cache=True)
+def min_gap_keep(t, offsets, min_gaps):
+    """
+    Greedy min-gap filter over many signal sets at once.
+
+    t holds the sorted ticks (bar positions or int64 timestamps) of every set,
+    set s being t[offsets[s]:offsets[s + 1]]. A signal is kept when it comes at
+    least min_gaps[s, k] ticks after the last kept signal of its set; column k
+    of the result is the keep mask for the k-th gap, all gaps in one pass.
+    """
+    n_gaps = min_gaps.shape[1]
+    keep = np.zeros((t.shape[0], n_gaps), dtype=np.bool_)
+    last = np.empty(n_gaps, dtype=np.int64)
+    for s in range(offsets.shape[0] - 1):
+        start, end = offsets[s], offsets[s + 1]
+        if start == end:
+            continue
+        for k in range(n_gaps):
+            keep[start, k] = True
+            last[k] = t[start]
+        for i in range(start + 1, end):
+            for k in range(n_gaps):
+                if t[i] - last[k] >= min_gaps[s, k]:
+                    keep[i, k] = True
+                    last[k] = t[i]
+    return keep
+
+
+# ============================================================
+# Bitsets (bar i is bit i % 64 of uint64 word i // 64)
+# ============================================================
+@njit(cache=True)
+def _popcount64(x):
+    x = x - ((x >> np.uint64(1)) & np.uint64(0x5555555555555555))
+    x = (x & np.uint64(0x3333333333333333)) + ((x >> np.uint64(2)) & np.uint64(0x3333333333333333))
+    x = (x + (x >> np.uint64(4))) & np.uint64(0x0F0F0F0F0F0F0F0F)
+    return (x * np.uint64(0x0101010101010101)) >> np.uint64(56)
+
+
+@njit(cache=True)
+def popcount(words):
+    """Number of set bits of a word array."""
+    total = 0
+    for w in range(words.shape[0]):
+        total += _popcount64(words[w])
+    return total
+
+
+@njit(cache=True)
+def pack_positions(positions, n_words):
+    """Bitset with the bits of the given (in-range) positions set."""
+    words = np.zeros(n_words, dtype=np.uint64)
+    for p in positions:
+        words[p >> 6] |= np.uint64(1) << np.uint64(p & 63)
+    return words
+
+
+@njit(cache=True)
+def unpack_words(words, count):
+    """Sorted int32 positions of the count set bits."""
+    out = np.empty(count, dtype=np.int32)
+    k = 0
+    for w in range(words.shape[0]):
+        x = words[w]
+        while x != 0:
+            low = x & (~x + np.uint64(1))
+            out[k] = w * 64 + _popcount64(low - np.uint64(1))
+            k += 1
+            x ^= low
+    return out
+
+
+@njit(cache=True)
+def at_least(stack, k):
+    """
+    Bits set in at least k of the rows of stack (n_sets x n_words), 1 <= k.
+
+    Every word keeps a bit-sliced vote counter (one plane per bit of the
+    count) and compares it with k plane by plane, so the cost is
+    O(n_words * n_sets * log n_sets) word operations.
+    """
+    n_sets, n_words = stack.shape
+    n_planes = 1
+    while (1 << n_planes) <= n_sets:
+        n_planes += 1
+    planes = np.zeros(n_planes, dtype=np.uint64)
+    out = np.zeros(n_words, dtype=np.uint64)
+    for w in range(n_words):
+        planes[:] = 0
+        for s in range(n_sets):
+            carry = stack[s, w]
+            for p in range(n_planes):
+                if carry == 0:
+                    break
+                overflow = planes[p] & carry
+                planes[p] ^= carry
+                carry = overflow
+        greater = np.uint64(0)
+        equal = ~np.uint64(0)
+        for p in range(n_planes - 1, -1, -1):
+            if (k >> p) & 1:
+                equal &= planes[p]
+            else:
+                greater |= equal & planes[p]
+                equal &= ~planes[p]
+        out[w] = greater | equal
+    return out
+
+
+@njit(cache=True)
+def shift_words(words, s):
+    """Bitset moved s bars later (bit i -> bit i + s); bits shifted past the last word drop."""
+    n_words = words.shape[0]
+    out = np.zeros(n_words, dtype=np.uint64)
+    ws, bs = s >> 6, s & 63
+    for w in range(ws, n_words):
+        x = words[w - ws] << np.uint64(bs)
+        if bs > 0 and w - ws - 1 >= 0:
+            x |= words[w - ws - 1] >> np.uint64(64 - bs)
+        out[w] = x
+    return out
+
+
+@njit(cache=True)
+def spread_words(words, radius):
+    """Forward dilation: bit i is set when any of bits i - radius .. i is (log2(radius) shifts)."""
+    out = words.copy()
+    covered = 1
+    while covered < radius + 1:
+        step = min(covered, radius + 1 - covered)
+        out |= shift_words(out, step)
+        covered += step
+    return out
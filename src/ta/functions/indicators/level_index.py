@@ -0,0 +1,61 @@
+# === External libraries ===
+import numpy as np
+
+
+# How many bars of an indicator line lie inside [lower, upper], for any bounds.
+#
+# The line is sorted once; a (lower, upper) pair is then two binary searches,
+# and a whole lower x upper grid is one broadcasted difference of them:
+#
+#     index = LevelIndex(rsi_values, rows)
+#     counts = index.counts(lowers, uppers)      # (len(lowers) x len(uppers))
+#     hits = index.positions(30, 45)             # only for the pairs worth keeping
+#
+# NaN bars are never inside a range (as with value >= lower & value <= upper).
+
+
+# ============================================================
+# Index
+# ============================================================
+class LevelIndex:
+    """
+    Sorted view of one indicator line answering in-range counts and positions.
+
+    Parameters:
+        values (np.ndarray): Indicator line
+        rows (np.ndarray): Row position (in df) of each value (default: 0..n-1)
+    """
+
+    def __init__(self, values, rows=None):
+        values = np.asarray(values, dtype=np.float64)
+        self.rows = np.arange(len(values)) if rows is None else np.asarray(rows)
+        order = np.argsort(values, kind="stable")
+        self.order = order[~np.isnan(values[order])]
+        self.sorted = values[self.order]
+
+    def __len__(self):
+        return len(self.sorted)
+
+    def _bounds(self, lower, upper):
+        lower = np.asarray(lower, dtype=np.float64)
+        upper = np.asarray(upper, dtype=np.float64)
+        lo = np.searchsorted(self.sorted, lower, "left")
+        hi = np.searchsorted(self.sorted, upper, "right")
+        return lo, np.where(np.isnan(lower) | np.isnan(upper), lo, np.maximum(hi, lo))
+
+    def count(self, lower, upper) -> int:
+        """Number of bars with lower <= value <= upper."""
+        lo, hi = self._bounds(lower, upper)
+        return int(hi - lo)
+
+    def counts(self, lowers, uppers) -> np.ndarray:
+        """(len(lowers) x len(uppers)) matrix of in-range counts."""
+        lowers = np.atleast_1d(np.asarray(lowers, dtype=np.float64))[:, None]
+        uppers = np.atleast_1d(np.asarray(uppers, dtype=np.float64))[None, :]
+        lo, hi = self._bounds(lowers, uppers)
+        return hi - lo
+
+    def positions(self, lower, upper) -> np.ndarray:
+        """Sorted df row positions of the bars with lower <= value <= upper."""
+        lo, hi = self._bounds(lower, upper)
+        return self.rows[np.sort(self.order[int(lo):int(hi)])]
@@ -0,0 +1,141 @@
+# === External libraries ===
+import os
+
+import numpy as np
+import pandas as pd
+
+from . import kernels
+from .indicator_cache import DatasetRegistry
+
+
+# Rolling mean / std for any period from one pair of prefix sums.
+#
+# MA and Bollinger Bands need window sums of the same close series for many
+# periods. The series gets one compensated prefix of sum and sum of squares;
+# every period (and every std multiplier on top of it) is then a vectorized
+# difference:
+#
+#     index = moment_index(df)
+#     ma20 = index.mean(20)
+#     lower, mid, upper = index.bands([(20, 2.0), (20, 2.5), (50, 2.0)])
+#
+# Values are centred on the series mean before accumulating, which keeps the
+# sum-of-squares cancellation small; windows where it still dominates (flat
+# prices) fall back to a direct two-pass variance inside the kernel.
+#
+# Skew and kurtosis come from a second, lazily built prefix of the 3rd and 4th
+# powers. The dynamic thresholds read them off the log returns of the close:
+#
+#     returns = moment_index(df, returns="log")
+#     mean, var, skew, kurt = returns.higher_moments([20, 50])
+
+
+# ============================================================
+# Index
+# ============================================================
+class MomentIndex:
+    """Compensated prefix sums of one series, answering rolling moments for any period."""
+
+    def __init__(self, x):
+        self.x = np.array(x, dtype=np.float64, order="C")
+        self.x.flags.writeable = False
+        finite = self.x[~np.isnan(self.x)]
+        self.center = float(finite.mean()) if len(finite) else 0.0
+        self.prefix = kernels.moment_prefix(self.x, self.center)
+        self._powers = None
+        self._runs = None
+
+    def __len__(self):
+        return len(self.x)
+
+    def moments(self, periods, ddof: int = 1):
+        """(mean, std) matrices with one column per period (NaN where rolling() would be)."""
+        periods = np.atleast_1d(np.asarray(periods, dtype=np.int64))
+        return kernels.moment_bank(self.x, self.prefix, self.center, periods, ddof)
+
+    def mean(self, period: int) -> np.ndarray:
+        """``rolling(period).mean()``."""
+        return self.moments([period])[0][:, 0]
+
+    def std(self, period: int, ddof: int = 1) -> np.ndarray:
+        """``rolling(period).std(ddof)``."""
+        return self.moments([period], ddof)[1][:, 0]
+
+    def higher_moments(self, periods):
+        """
+        (mean, var, skew, kurt) matrices with one column per period.
+
+        Same conventions as pandas rolling(period).var() / .skew() / .kurt():
+        ddof=1 variance, bias-corrected skew and excess kurtosis.
+        """
+        if self._powers is None:
+            self._runs = kernels.same_value_runs(self.x)
+            self._powers = kernels.power_prefix(self.x, self.center)
+        periods = np.atleast_1d(np.asarray(periods, dtype=np.int64))
+        return kernels.moment4_bank(self.x, self._powers, self._runs, self.center, periods)
+
+    def skew(self, period: int) -> np.ndarray:
+        """``rolling(period).skew()``."""
+        return self.higher_moments([period])[2][:, 0]
+
+    def kurt(self, period: int) -> np.ndarray:
+        """``rolling(period).kurt()``."""
+        return self.higher_moments([period])[3][:, 0]
+
+    def bands(self, params, ddof: int = 1):
+        """
+        Bollinger lower / mid / upper for many (period, std multiplier) pairs at once.
+
+        Parameters:
+            params (list): (period, std) pairs
+            ddof (int): Degrees of freedom of the std (1 = pandas default)
+
+        Returns:
+            (lower, mid, upper), each an (n_bars x len(params)) matrix
+        """
+        params = [(int(p), float(k)) for p, k in params]
+        periods = sorted({p for p, _ in params})
+        mean, std = self.moments(periods, ddof)
+        cols = np.array([periods.index(p) for p, _ in params], dtype=np.int64)
+        mult = np.array([k for _, k in params])
+        mid = mean[:, cols]
+        dev = std[:, cols] * mult[None, :]
+        return mid - dev, mid, mid + dev
+
+
+# ============================================================
+# Per-dataset registry
+# ============================================================
+def _series(df, col, returns):
+    x = df[col].to_numpy(dtype=np.float64)
+    if returns is None:
+        return x
+    if returns != "log":
+        raise ValueError(f"Unsupported returns: {returns}")
+    out = np.full(len(x), np.nan)
+    out[1:] = np.log(x[1:] / x[:-1])
+    return out
+
+
+_indexes = DatasetRegistry(lambda df, col, returns: MomentIndex(_series(df, col, returns)), max_datasets=8)
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_indexes._reset_lock)
+
+
+def moment_index(df: pd.DataFrame, col: str = "close", returns: str = None) -> MomentIndex:
+    """
+    The MomentIndex of one column of a dataset, shared across indicator calls.
+
+    Parameters:
+        df (pd.DataFrame | OHLCV): Price data
+        col (str): Column to index
+        returns (str): None to index the column itself, "log" for log(x / x.shift(1))
+
+    Returns:
+        MomentIndex keyed on (dataset fingerprint, col, returns)
+    """
+    return _indexes.get(df, col, returns)
+
+
+def clear_moment_indexes() -> None:
+    _indexes.clear()
@@ -8,11 +8,8 @@ import numpy as np
 # RSI
 # ============================================================
 def calculate_rsi(df: pd.DataFrame, plot: bool = False, period: int = 14) -> pd.DataFrame:
-    df['rsi'] = TA.RSI(df, period)
-    df['rsi'] = df['rsi'].mask(df.index < period)
-    df = df.dropna(subset=['rsi']).copy()
-
-    result = df[['Date', 'rsi']]
+    rsi = TA.RSI(df, period).mask(df.index < period)
+    result = pd.DataFrame({'Date': df['Date'], 'rsi': rsi}).dropna(subset=['rsi'])
 
     if plot:
         plot_indicator(result, f"RSI ({period})")
@@ -50,16 +47,16 @@ def calculate_stochrsi(
     max_rsi = rsi.rolling(window=stoch_length).max()
     stoch_rsi = (rsi - min_rsi) / (max_rsi - min_rsi)
 
-    df['stochrsi_k'] = stoch_rsi.ewm(span=k, adjust=False).mean()
-    df['stochrsi_d'] = df['stochrsi_k'].ewm(span=d, adjust=False).mean()
+    stochrsi_k = stoch_rsi.ewm(span=k, adjust=False).mean()
+    stochrsi_d = stochrsi_k.ewm(span=d, adjust=False).mean()
 
-    df = df.dropna(subset=['stochrsi_k', 'stochrsi_d']).copy()
+    result = pd.DataFrame({'Date': df['Date'], 'stochrsi_k': stochrsi_k, 'stochrsi_d': stochrsi_d})
+    result = result.dropna(subset=['stochrsi_k', 'stochrsi_d'])
 
     if plot:
-        plot_indicator(df[['Date', 'stochrsi_k', 'stochrsi_d']],
-                       f"StochRSI (RSI={rsi_length}, Stoch={stoch_length}, K={k}, D={d})")
+        plot_indicator(result, f"StochRSI (RSI={rsi_length}, Stoch={stoch_length}, K={k}, D={d})")
 
-    return df[['Date', 'stochrsi_k', 'stochrsi_d']]
+    return result
 
 
 
@@ -67,10 +64,8 @@ def calculate_stochrsi(
 # ROC — Rate of Change
 # ============================================================
 def calculate_roc(df: pd.DataFrame, plot: bool = False, period: int = 14) -> pd.DataFrame:
-    df['roc'] = ((df['close'] - df['close'].shift(period)) / df['close'].shift(period)) * 100
-    df = df.dropna(subset=['roc']).copy()
-
-    result = df[['Date', 'roc']]
+    roc = ((df['close'] - df['close'].shift(period)) / df['close'].shift(period)) * 100
+    result = pd.DataFrame({'Date': df['Date'], 'roc': roc}).dropna(subset=['roc'])
 
     if plot:
         plot_indicator(result, f"ROC ({period})")
@@ -85,12 +80,10 @@ def calculate_williams(df: pd.DataFrame, plot: bool = False, period: int = 14) -
     highest_high = df['high'].rolling(window=period).max()
     lowest_low = df['low'].rolling(window=period).min()
 
-    df['williams'] = -100 * ((highest_high - df['close']) /
-                             (highest_high - lowest_low))
-
-    df = df.dropna(subset=['williams']).copy()
+    williams = -100 * ((highest_high - df['close']) /
+                       (highest_high - lowest_low))
 
-    result = df[['Date', 'williams']]
+    result = pd.DataFrame({'Date': df['Date'], 'williams': williams}).dropna(subset=['williams'])
 
     if plot:
         plot_indicator(result, f"Williams %R ({period})")
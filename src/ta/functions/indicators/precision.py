@@ -0,0 +1,72 @@
+# === External libraries ===
+import os
+
+import numpy as np
+import pandas as pd
+
+
+# Storage precision of indicator outputs, indicator banks and signal frames.
+#
+# "float64" (default) keeps everything in double precision. "float32" halves
+# the memory of what large grids keep alive (cached indicator frames, bank
+# matrices, signals_df price columns). Kernels still run and accumulate in
+# float64 (ewm recursions, prefix sums, sparse tables, EMA memos); only the
+# finished values are rounded, so every output is within half a float32 ulp
+# (relative 6e-8) of its float64 value:
+#
+#   indicator            range      max abs error in float32
+#   ---------            -----      -------------------------
+#   rsi, adx, williams   0..100     4e-6
+#   stochrsi             0..1       6e-8
+#   roc                  percent    6e-8 * |roc|
+#   macd (all lines)     price      6e-8 * |line|      (difference taken in float64)
+#   atr                  price      6e-8 * atr
+#   ma, ema, ema_ribbon, ema_crossover, bbands, donchian, ichimoku
+#                        price      6e-8 * price       (0.004 at a price of 60 000)
+#
+# Signals can differ from float64 only where a value sits within that error of
+# its threshold (crossUp on the bar that touches thr exactly, inRange bounds).
+# Signal prices ('signal' / 'close' columns) are rounded the same way; 'Date'
+# is untouched.
+#
+# Select with set_precision("float32") or the TA_PRECISION environment variable.
+
+PRECISIONS = ("float64", "float32")
+_precision = os.environ.get("TA_PRECISION", "float64").lower()
+if _precision not in PRECISIONS:
+    _precision = "float64"
+
+
+def set_precision(precision: str) -> None:
+    """Select the storage precision of indicator outputs ('float64' or 'float32')."""
+    global _precision
+    precision = str(np.dtype(precision))
+    if precision not in PRECISIONS:
+        raise ValueError(f"Unsupported precision: {precision}")
+    _precision = precision
+
+
+def get_precision() -> str:
+    return _precision
+
+
+def output_dtype() -> np.dtype:
+    return np.dtype(_precision)
+
+
+def as_output(values) -> np.ndarray:
+    """Float array in the output precision (no copy when it already is)."""
+    values = np.asarray(values)
+    if values.dtype.kind != "f":
+        return values
+    return values.astype(_precision, copy=False)
+
+
+def as_output_frame(frame: pd.DataFrame) -> pd.DataFrame:
+    """Cast the float columns of an indicator / signal frame to the output precision."""
+    if _precision == "float64":
+        return frame
+    floats = [c for c, dtype in frame.dtypes.items() if dtype.kind == "f" and dtype != _precision]
+    if not floats:
+        return frame
+    return frame.astype({c: _precision for c in floats})
@@ -0,0 +1,210 @@
+# === External libraries ===
+import os
+import threading
+import weakref
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from . import kernels
+from .indicator_cache import DatasetRegistry
+
+
+# Rolling max/min for any window from one precomputed sparse table per series.
+#
+# Williams %R, Donchian, Ichimoku (three windows) and StochRSI all need rolling
+# extremes of the same few series (high, low, RSI of a given length). Instead
+# of a fresh rolling pass per window, each series gets a sparse table built
+# once per dataset; every later window is two lookups per bar:
+#
+#     index = extremum_index(df)
+#     hh = index.rolling_max('high', 20)
+#     ll = index.rolling_min('low', 20)
+#
+# Derived series are registered under a hashable key:
+#
+#     index.rolling_min(('rsi', 14), 14, lambda: kernels.rsi(close, 14))
+#
+# A table costs 8 * n * log2(n) bytes, so it is only built once a second
+# window is asked of the same series (the first one goes through the O(n)
+# deque kernel), and every table in the process is charged to one byte budget
+# (TA_EXTREMUM_TABLE_MB, default 128) that evicts the least recently used.
+# A series whose table does not fit keeps using the deque kernel.
+
+DEFAULT_TABLE_BYTES = int(float(os.environ.get("TA_EXTREMUM_TABLE_MB", 128)) * 1024 * 1024)
+
+
+# ============================================================
+# Table budget
+# ============================================================
+class TableBudget:
+    """Byte-bounded LRU over the sparse tables of every ExtremumIndex of the process."""
+
+    def __init__(self, max_bytes: int = DEFAULT_TABLE_BYTES):
+        self.max_bytes = int(max_bytes)
+        self._entries = OrderedDict()    # (index id, table key) -> (weakref to index, bytes)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.evictions = 0
+
+    def admit(self, index, key, nbytes: int) -> bool:
+        """Charge a new table (evicting older ones); False if it can never fit."""
+        if nbytes > self.max_bytes:
+            return False
+        with self._lock:
+            self._entries[(id(index), key)] = (weakref.ref(index), nbytes)
+            self._bytes += nbytes
+            self._evict()
+        return True
+
+    def touch(self, index, key) -> None:
+        with self._lock:
+            if (id(index), key) in self._entries:
+                self._entries.move_to_end((id(index), key))
+
+    def forget(self, index_id) -> None:
+        """Uncharge every table of an index that was garbage collected."""
+        with self._lock:
+            for k in [k for k in self._entries if k[0] == index_id]:
+                self._bytes -= self._entries.pop(k)[1]
+
+    def resize(self, max_bytes: int) -> None:
+        with self._lock:
+            self.max_bytes = int(max_bytes)
+            self._evict()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"tables": len(self._entries), "bytes": self._bytes, "max_bytes": self.max_bytes, "evictions": self.evictions}
+
+    def _evict(self):
+        while self._bytes > self.max_bytes and self._entries:
+            (_, key), (ref, nbytes) = self._entries.popitem(last=False)
+            self._bytes -= nbytes
+            self.evictions += 1
+            index = ref()
+            if index is not None:
+                index._tables.pop(key, None)
+
+    def _reset_lock(self):
+        self._lock = threading.Lock()
+
+
+_budget = TableBudget()
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_budget._reset_lock)
+
+
+# ============================================================
+# Index
+# ============================================================
+class ExtremumIndex:
+    """Lazily built sparse tables (one per series and direction) over one dataset."""
+
+    def __init__(self, df):
+        self.n = len(df)
+        # private (or already read-only) copies: the index outlives the caller's frame
+        self._series = {col: _frozen(df[col]) for col in ("high", "low", "close") if col in df.columns}
+        self._nan_counts = {}
+        self._tables = {}
+        self._windows = {}       # (key, is_max) -> first window asked (no table yet)
+        self._lock = threading.Lock()
+        weakref.finalize(self, _budget.forget, id(self))
+
+    def series(self, key, compute=None) -> np.ndarray:
+        """The float64 array behind key: a column name, or a derived series computed once."""
+        x = self._series.get(key)
+        if x is None:
+            if compute is None:
+                raise KeyError(f"No series '{key}' in the index; pass compute= for derived series")
+            x = self._series[key] = _frozen(compute())
+        return x
+
+    def rolling_max(self, key, window: int, compute=None) -> np.ndarray:
+        """``rolling(window).max()`` of the series under key."""
+        return self._query(key, int(window), True, compute)
+
+    def rolling_min(self, key, window: int, compute=None) -> np.ndarray:
+        """``rolling(window).min()`` of the series under key."""
+        return self._query(key, int(window), False, compute)
+
+    def _query(self, key, window, is_max, compute):
+        entry = self._table(key, window, is_max, compute)
+        if entry is None:
+            x = self.series(key, compute)
+            return kernels.rolling_max(x, window) if is_max else kernels.rolling_min(x, window)
+        table, nan_cs = entry
+        return kernels.sparse_query(table, nan_cs, window, is_max)
+
+    def _table(self, key, window, is_max, compute):
+        """The (table, NaN counts) of a series, or None while the deque kernel is the better deal."""
+        entry = self._tables.get((key, is_max))
+        if entry is not None:
+            _budget.touch(self, (key, is_max))
+            return entry
+        with self._lock:
+            entry = self._tables.get((key, is_max))
+            if entry is not None:
+                return entry
+            first = self._windows.setdefault((key, is_max), window)
+            if first == window:
+                return None    # only one window asked so far
+            x = self.series(key, compute)
+            if not _budget.admit(self, (key, is_max), _table_bytes(len(x))):
+                return None
+            nan_cs = self._nan_counts.get(key)
+            if nan_cs is None:
+                nan_cs = self._nan_counts[key] = kernels.nan_prefix_count(x)
+            entry = self._tables[(key, is_max)] = (kernels.sparse_table(x, is_max), nan_cs)
+        return entry
+
+    def __repr__(self):
+        return f"ExtremumIndex(rows={self.n}, tables={list(self._tables)})"
+
+
+def _table_bytes(n: int) -> int:
+    return 8 * n * max(int(n).bit_length(), 1)
+
+
+def _frozen(values) -> np.ndarray:
+    x = np.asarray(values, dtype=np.float64)
+    if x.flags.writeable or not x.flags.c_contiguous:
+        x = np.array(x, dtype=np.float64, order="C")
+        x.flags.writeable = False
+    return x
+
+
+# ============================================================
+# Per-dataset registry
+# ============================================================
+_indexes = DatasetRegistry(ExtremumIndex, max_datasets=8)
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_indexes._reset_lock)
+
+
+def extremum_index(df: pd.DataFrame) -> ExtremumIndex:
+    """
+    The ExtremumIndex of a dataset, shared by every indicator call on the same data.
+
+    Parameters:
+        df (pd.DataFrame | OHLCV): OHLCV with 'high' / 'low'
+
+    Returns:
+        ExtremumIndex keyed on the dataset fingerprint (last few datasets kept)
+    """
+    return _indexes.get(df)
+
+
+def clear_extremum_indexes() -> None:
+    _indexes.clear()
+
+
+def set_extremum_table_budget(max_bytes: int) -> None:
+    """Change the byte budget shared by every sparse table of the process (evicts at once)."""
+    _budget.resize(max_bytes)
+
+
+def extremum_table_stats() -> dict:
+    """tables / bytes / max_bytes / evictions of the sparse-table budget."""
+    return _budget.stats()
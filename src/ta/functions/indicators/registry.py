@@ -0,0 +1,119 @@
+# === External libraries ===
+from dataclasses import dataclass, field
+from typing import Callable
+
+import numpy as np
+import pandas as pd
+
+
+# Every indicator declares what the rest of the library used to guess:
+#
+#   params   ordered (name, default) schema; kwargs outside it do not change the result
+#   outputs  the frame's indicator lines; the first one is what thresholds act on
+#   warmup   leading bars without output, as a function of the params
+#   lookback bars of history one output depends on (None: recursive, needs all of it)
+#
+# calculate_indicator, INDICATOR_MAP and the indicator bank are generated from
+# this table, and spec.key(kwargs) tells when two configs are the same computation.
+
+
+# ============================================================
+# Spec
+# ============================================================
+@dataclass(frozen=True)
+class IndicatorSpec:
+    name: str
+    category: str
+    func: Callable                    # pandas/finta reference: calculate_<name>
+    kernel: Callable                  # numba path: (df, **params) -> full frame
+    params: tuple                     # (("period", 14), ...)
+    outputs: object                   # tuple of lines, or params -> tuple
+    warmup: Callable                  # params -> int
+    lookback: Callable = None         # params -> int | None
+    masked: bool = False              # frame masks df.index < warmup
+    select_line: bool = False         # returns ['Date', line] with line=kwargs['line']
+    func_kwargs: dict = field(default_factory=dict)   # param -> reference kwarg rename
+
+    @property
+    def names(self) -> tuple:
+        return tuple(name for name, _ in self.params)
+
+    def resolve(self, kwargs: dict) -> dict:
+        """The full parameter dict this indicator is computed with (defaults filled in)."""
+        return {name: _canonical(kwargs.get(name, default)) for name, default in self.params}
+
+    def key(self, kwargs: dict) -> tuple:
+        """Hashable identity of the computation: equal keys give identical frames."""
+        return tuple(_hashable(v) for v in self.resolve(kwargs).values())
+
+    def lines(self, params: dict) -> tuple:
+        return tuple(self.outputs(params) if callable(self.outputs) else self.outputs)
+
+    def line(self, kwargs: dict) -> str:
+        """The output line a threshold reads: kwargs['line'] where selectable, else the first line."""
+        lines = self.lines(self.resolve(kwargs))
+        line = kwargs.get("line") if self.select_line else None
+        return line if line is not None else lines[0]
+
+    def warmup_bars(self, kwargs: dict) -> int:
+        return int(self.warmup(self.resolve(kwargs)))
+
+    def lookback_bars(self, kwargs: dict):
+        if self.lookback is None:
+            return None
+        return int(self.lookback(self.resolve(kwargs)))
+
+    def reference(self, df: pd.DataFrame, plot: bool, params: dict) -> pd.DataFrame:
+        kwargs = {self.func_kwargs.get(name, name): value for name, value in params.items()}
+        return self.func(df, plot=plot, **kwargs)
+
+    def select(self, frame: pd.DataFrame, kwargs: dict) -> pd.DataFrame:
+        if self.select_line:
+            return frame[["Date", self.line(kwargs)]]
+        # frame may be the cached one: without copy-on-write a shallow copy would let callers write into it
+        return frame.copy(deep=not _copy_on_write())
+
+
+def _copy_on_write() -> bool:
+    return int(pd.__version__.split(".")[0]) >= 3 or pd.options.mode.copy_on_write is True
+
+
+def _canonical(v):
+    if isinstance(v, np.generic):
+        return v.item()
+    return v
+
+
+def _hashable(v):
+    if isinstance(v, (list, tuple, set, np.ndarray)):
+        return tuple(_hashable(x) for x in v)
+    return _canonical(v)
+
+
+# ============================================================
+# Registry
+# ============================================================
+_REGISTRY = {}
+
+
+def register_indicator(spec: IndicatorSpec) -> IndicatorSpec:
+    """Add (or replace) an indicator; calculate_indicator picks it up immediately."""
+    _REGISTRY[spec.name.lower()] = spec
+    return spec
+
+
+def get_indicator(type: str) -> IndicatorSpec:
+    spec = _REGISTRY.get(str(type).lower())
+    if spec is None:
+        raise ValueError(f"Unsupported indicator type: {type}")
+    return spec
+
+
+def indicator_registry() -> dict:
+    """name -> IndicatorSpec, in registration order."""
+    return dict(_REGISTRY)
+
+
+def indicator_line(type: str, **kwargs) -> str:
+    """Output column of calculate_indicator(df, type, **kwargs) that thresholds act on."""
+    return get_indicator(type).line(kwargs)
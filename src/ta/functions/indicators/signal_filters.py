@@ -0,0 +1,119 @@
+# === External libraries ===
+import numpy as np
+
+from . import kernels
+from .signal_set import SignalSet
+
+
+# The wd parameter of the threshold rules, in one place.
+#
+#   min gap   a signal survives when it comes MORE than wd units after the last
+#             signal that survived (greedy, so a long run of signals thins out
+#             to one every wd+1 units instead of collapsing to its first bar).
+#             Units are bars, or whole time units of the bars' Date ("D", "h",
+#             "m", "s"), counted like Timedelta.days.
+#   dilation  every signal is widened to ±radius bars (timeThreshold's expand).
+#
+# Both take many signal sets and several wd values per call, so wd is a cheap
+# search dimension:
+#
+#     thinned = min_gap_filter(signal_sets, wd=[0, 1, 3, 7], unit="D")
+#     thinned[2][j]        # set j filtered with wd=3
+
+TIME_UNITS = {"D": 86_400, "h": 3_600, "m": 60, "s": 1}
+
+
+# ============================================================
+# Min gap
+# ============================================================
+def min_gap_ticks(wd, unit: str = "bars") -> int:
+    """Smallest kept distance, in ticks (bars or nanoseconds), for "more than wd whole units"."""
+    whole = int(np.floor(wd)) + 1
+    if unit == "bars":
+        return whole
+    if unit not in TIME_UNITS:
+        raise ValueError(f"Unsupported gap unit: {unit}")
+    return whole * TIME_UNITS[unit] * 1_000_000_000
+
+
+def min_gap_positions(ticks, wd, unit: str = "bars") -> np.ndarray:
+    """
+    Keep mask of one sorted signal array under the min-gap rule.
+
+    Parameters:
+        ticks (np.ndarray): Bar positions (unit="bars") or datetime64 signal dates
+        wd (float): Minimum gap
+        unit (str): "bars" or a time unit
+
+    Returns:
+        boolean keep mask
+    """
+    ticks = _as_ticks(ticks, unit)
+    offsets = np.array([0, len(ticks)], dtype=np.int64)
+    gaps = np.array([[min_gap_ticks(wd, unit)]], dtype=np.int64)
+    return kernels.min_gap_keep(ticks, offsets, gaps)[:, 0]
+
+
+def min_gap_filter(signals, wd, unit: str = "bars"):
+    """
+    Min-gap filter for one SignalSet or a list of them, for one wd or several.
+
+    Parameters:
+        signals (SignalSet | list): Signal sets (each bound to its dataset for time units)
+        wd (float | sequence): Minimum gap; a sequence filters every set once per value
+        unit (str): "bars" or a time unit ("D", "h", "m", "s")
+
+    Returns:
+        same layout as signals; a list over wd values when wd is a sequence
+    """
+    single = isinstance(signals, SignalSet)
+    sets = [signals] if single else list(signals)
+    several = np.ndim(wd) > 0
+    wds = list(np.atleast_1d(wd))
+
+    ticks = [s.positions if unit == "bars" else s.dates for s in sets]
+    offsets = np.zeros(len(sets) + 1, dtype=np.int64)
+    offsets[1:] = np.cumsum([len(s) for s in sets])
+    flat = np.concatenate([_as_ticks(t, unit) for t in ticks]) if sets else np.empty(0, dtype=np.int64)
+    gaps = np.tile(np.array([min_gap_ticks(w, unit) for w in wds], dtype=np.int64), (len(sets), 1))
+    keep = kernels.min_gap_keep(flat, offsets, gaps)
+
+    out = []
+    for k in range(len(wds)):
+        filtered = [s.select(keep[offsets[j]:offsets[j + 1], k]) for j, s in enumerate(sets)]
+        out.append(filtered[0] if single else filtered)
+    return out if several else out[0]
+
+
+def _as_ticks(ticks, unit):
+    ticks = np.asarray(ticks)
+    if unit == "bars":
+        return ticks.astype(np.int64)
+    return ticks.astype("datetime64[ns]").view(np.int64)
+
+
+# ============================================================
+# Dilation
+# ============================================================
+def dilate(mask, radius: int) -> np.ndarray:
+    """
+    Widen every True of a boolean mask to ±radius bars, in O(n).
+
+    Parameters:
+        mask (np.ndarray): (n_bars,) or (n_bars x n_sets) boolean mask; columns are dilated independently
+        radius (int): Bars added on each side
+
+    Returns:
+        dilated mask of the same shape
+    """
+    mask = np.asarray(mask, dtype=bool)
+    radius = int(radius)
+    if radius <= 0 or len(mask) == 0:
+        return mask.copy()
+    n = len(mask)
+    counts = np.zeros((n + 1,) + mask.shape[1:], dtype=np.int64)
+    np.cumsum(mask, axis=0, out=counts[1:])
+    i = np.arange(n)
+    hi = np.minimum(i + radius + 1, n)
+    lo = np.maximum(i - radius, 0)
+    return counts[hi] - counts[lo] > 0
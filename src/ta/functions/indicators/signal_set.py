@@ -0,0 +1,264 @@
+# === External libraries ===
+import numpy as np
+import pandas as pd
+
+from .bitset import bits_and, bits_andnot, bits_k_of_n, bits_or, bits_spread, popcount, to_positions, to_words
+from .precision import output_dtype
+
+
+# ============================================================
+# SignalSet — compact threshold output
+# ============================================================
+class SignalSet:
+    """
+    Signals of one threshold rule as sorted, unique int32 bar positions.
+
+    Positions index the dataset the rule ran on (row i of df). The set keeps a
+    reference to that dataset (`base`, never copied) and only turns into the
+    familiar ['Date', 'signal'] DataFrame when something asks for it:
+    to_frame(), signals['Date'], signals.to_dict(...), printing. len(),
+    .empty, set algebra (&, |, -) and .mask / .bits work on the positions alone.
+
+    Set algebra runs on the packed uint64 form (.words, see bitset.py); its
+    results keep only the words and count their signals by popcount, the
+    positions are unpacked on first use. A deferred set (range sweeps) knows
+    its count up front and builds its positions only when they are read.
+
+    Parameters:
+        positions: bar positions (any int array-like; sorted and de-duplicated here)
+        base (pd.DataFrame | OHLCV): dataset the positions refer to
+        n (int): number of bars (default: len(base))
+        column (str): name of the value column in the frame form
+        label (str): constant value of that column (None: the bar's close price)
+        extra (dict): extra frame columns, one value per position
+    """
+
+    __slots__ = ("_positions", "_words", "_count", "_build", "n", "column", "label", "extra", "dtype", "_base", "_frame")
+
+    def __init__(self, positions, base=None, n=None, column="signal", label=None, extra=None):
+        positions = np.asarray(positions, dtype=np.int64).ravel()
+        if len(positions) > 1 and not (np.diff(positions) > 0).all():
+            positions, first = np.unique(positions, return_index=True)
+            extra = {k: np.asarray(v)[first] for k, v in (extra or {}).items()}
+        self._positions = positions.astype(np.int32)
+        self._words = None
+        self._count = None
+        self._build = None
+        self.n = int(n if n is not None else (len(base) if base is not None else (positions[-1] + 1 if len(positions) else 0)))
+        self.column = column
+        self.label = label
+        self.extra = dict(extra or {})
+        self.dtype = output_dtype()     # precision of the price column, fixed when the rule ran
+        self._base = base
+        self._frame = None
+
+    # --- constructors ---
+    @classmethod
+    def from_mask(cls, mask, base=None, **kwargs) -> "SignalSet":
+        mask = np.asarray(mask, dtype=bool)
+        return cls(np.flatnonzero(mask), base=base, n=len(mask), **kwargs)
+
+    @classmethod
+    def from_bits(cls, bits, n: int, base=None, **kwargs) -> "SignalSet":
+        mask = np.unpackbits(np.asarray(bits, dtype=np.uint8), count=n).astype(bool)
+        return cls.from_mask(mask, base=base, **kwargs)
+
+    @classmethod
+    def from_words(cls, words, n: int, base=None, column="signal", label=None) -> "SignalSet":
+        """A set given as a packed uint64 bitset (positions unpacked lazily)."""
+        signals = cls((), base=base, n=n, column=column, label=label)
+        signals._positions = None
+        signals._words = np.asarray(words, dtype=np.uint64)
+        return signals
+
+    @classmethod
+    def deferred(cls, count: int, build, n: int, base=None, column="signal", label=None) -> "SignalSet":
+        """A set of known size whose sorted positions come from build() on first use."""
+        signals = cls((), base=base, n=n, column=column, label=label)
+        signals._positions = None
+        signals._count = int(count)
+        signals._build = build
+        return signals
+
+    @classmethod
+    def none(cls, base=None, **kwargs) -> "SignalSet":
+        """An empty set (what a failed or signal-less rule returns)."""
+        return cls(np.empty(0, dtype=np.int32), base=base, **kwargs)
+
+    # --- set views ---
+    @property
+    def positions(self) -> np.ndarray:
+        if self._positions is None:
+            if self._build is not None:
+                self._positions = np.asarray(self._build(), dtype=np.int32)
+                self._build = None
+            else:
+                self._positions = to_positions(self._words, len(self))
+        return self._positions
+
+    @property
+    def words(self) -> np.ndarray:
+        """The mask packed 64 bars per uint64 word (memoized)."""
+        if self._words is None:
+            self._words = to_words(self.positions, self.n)
+        return self._words
+
+    def __len__(self):
+        if self._count is not None:
+            return self._count
+        if self._positions is not None:
+            return len(self._positions)
+        self._count = popcount(self._words)
+        return self._count
+
+    @property
+    def empty(self) -> bool:
+        return len(self) == 0
+
+    @property
+    def mask(self) -> np.ndarray:
+        """Boolean mask over the n bars."""
+        mask = np.zeros(self.n, dtype=bool)
+        mask[self.positions] = True
+        return mask
+
+    @property
+    def bits(self) -> np.ndarray:
+        """The mask packed 8 bars per byte."""
+        return np.packbits(self.mask)
+
+    @property
+    def base(self):
+        return self._base
+
+    def bind(self, base) -> "SignalSet":
+        """Attach the dataset (after a trip through a worker process, which drops it)."""
+        self._base = base
+        self._frame = None
+        return self
+
+    def select(self, keep) -> "SignalSet":
+        """Subset by a boolean mask, index array or slice over the current signals (extras follow)."""
+        if not isinstance(keep, slice):
+            keep = np.asarray(keep)
+        return SignalSet(
+            self.positions[keep], base=self._base, n=self.n, column=self.column, label=self.label,
+            extra={k: np.asarray(v)[keep] for k, v in self.extra.items()},
+        )
+
+    def __and__(self, other: "SignalSet") -> "SignalSet":
+        return self._like(bits_and([self.words, other.words]))
+
+    def __or__(self, other: "SignalSet") -> "SignalSet":
+        return self._like(bits_or([self.words, other.words]))
+
+    def __sub__(self, other: "SignalSet") -> "SignalSet":
+        """AND-NOT: signals of self on bars where other has none."""
+        return self._like(bits_andnot(self.words, other.words))
+
+    def _like(self, words) -> "SignalSet":
+        return SignalSet.from_words(words, self.n, base=self._base, column=self.column, label=self.label)
+
+    # --- frame form (lazy) ---
+    @property
+    def dates(self) -> np.ndarray:
+        base = self._require_base()
+        dates = base["Date"].to_numpy() if "Date" in base.columns else np.asarray(base.index)
+        return dates[self.positions]
+
+    def to_frame(self) -> pd.DataFrame:
+        """['Date', column, *extra] DataFrame indexed like the dataset rows (memoized)."""
+        if self._frame is None:
+            base = self._require_base()
+            if self.label is None:
+                values = base["close"].to_numpy()[self.positions].astype(self.dtype)
+            else:
+                values = np.full(len(self.positions), self.label, dtype=object)
+            frame = pd.DataFrame({"Date": self.dates, self.column: values}, index=base.index[self.positions])
+            for name, values in self.extra.items():
+                frame[name] = values
+            self._frame = frame
+        return self._frame
+
+    def __getitem__(self, key):
+        return self.to_frame()[key]
+
+    def __getattr__(self, name):
+        # display / analysis code written against the old DataFrame return value
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return getattr(self.to_frame(), name)
+
+    def _require_base(self):
+        if self._base is None:
+            raise ValueError("SignalSet is not bound to a dataset; call .bind(df) first")
+        return self._base
+
+    # --- pickling: positions travel, the dataset does not ---
+    def __getstate__(self):
+        return (self.positions, self.n, self.column, self.label, self.extra, self.dtype)
+
+    def __setstate__(self, state):
+        self._positions, self.n, self.column, self.label, self.extra, self.dtype = state
+        self._words = None
+        self._count = None
+        self._build = None
+        self._base = None
+        self._frame = None
+
+    def __repr__(self):
+        if self._base is None or self.empty:
+            return f"SignalSet({len(self)} signals over {self.n} bars)"
+        return f"SignalSet({len(self)} signals over {self.n} bars)\n{self.to_frame()!r}"
+
+
+def k_of_n(signal_sets: list, k: int, base=None, label=None) -> SignalSet:
+    """Bars where at least k of the sets (over the same bars) have a signal."""
+    first = signal_sets[0]
+    words = bits_k_of_n([s.words for s in signal_sets], k, first.n)
+    return SignalSet.from_words(words, first.n, base=base if base is not None else first.base, label=label)
+
+
+def co_occur(signal_sets: list, within: int, base=None, label=None) -> SignalSet:
+    """
+    Bars where every set has a signal in the last `within` bars, on a bar where one of them fires.
+
+    Each bitset is dilated forward by `within` bars and the dilations are
+    ANDed; keeping only bars of the raw union turns the resulting runs into
+    entries (within=0 is the plain AND).
+    """
+    first = signal_sets[0]
+    words = [s.words for s in signal_sets]
+    active = bits_and([bits_spread(w, within, first.n) for w in words])
+    entries = bits_and([active, bits_or(words)])
+    return SignalSet.from_words(entries, first.n, base=base if base is not None else first.base, label=label)
+
+
+def in_sequence(signal_sets: list, within: int, base=None, label=None) -> SignalSet:
+    """
+    Bars completing "A then B (then C ...)" with each step 1..`within` bars after the previous one.
+
+    Every signal of a step is followed to the next signal of the following set
+    (one searchsorted over all of them); the bars reached within the window are
+    the next step's starts, the bars of the last step are the entries.
+    """
+    if within < 1:
+        raise ValueError(f"in_sequence needs within >= 1 (each step is 1..within bars later), got {within!r}")
+    first = signal_sets[0]
+    reached = first.positions
+    for following in signal_sets[1:]:
+        later = following.positions
+        nxt = np.searchsorted(later, reached, side="right")
+        found = nxt < len(later)
+        step = later[nxt[found]]
+        reached = np.unique(step[step - reached[found] <= within])
+    return SignalSet(reached, base=base if base is not None else first.base, n=first.n, label=label)
+
+
+def bind_signals(results: list, base) -> list:
+    """Re-attach the dataset to the SignalSets of search results returned by worker processes."""
+    for r in results:
+        signals = r.get("signals_df") if isinstance(r, dict) else None
+        if isinstance(signals, SignalSet) and signals.base is None:
+            signals.bind(base)
+    return results
@@ -0,0 +1,476 @@
+# === External libraries ===
+import math
+from collections import deque
+
+import numpy as np
+import pandas as pd
+
+from . import kernels
+from .registry import get_indicator
+from .universal_indicator_dispatcher import _price_array
+
+
+# Incremental indicator states: O(1) work per new bar instead of recomputing the
+# whole history. Each state reproduces the batch output of calculate_indicator
+# bar for bar (same recurrences, same warm-up masking), so
+#
+#     state = RSIState.from_history(df, period=14)   # seeded from the batch pass
+#     state.update(new_bar)                           # -> {'rsi': ...}
+#
+# continues exactly where calculate_indicator(df, 'rsi') left off.
+#
+# A bar is anything indexable by 'close' / 'high' / 'low' (dict, pd.Series row,
+# namedtuple from itertuples); close-only states also accept a plain float.
+
+
+# ============================================================
+# Building blocks
+# ============================================================
+def _field(bar, key):
+    if isinstance(bar, (int, float, np.number)):
+        if key != "close":
+            raise ValueError(f"bar needs a '{key}' value")
+        return float(bar)
+    if hasattr(bar, key) and not isinstance(bar, (dict, pd.Series)):
+        return float(getattr(bar, key))
+    return float(bar[key])
+
+
+def _div(a, b):
+    # numpy semantics: x/0 -> ±inf, 0/0 -> nan
+    try:
+        return a / b
+    except ZeroDivisionError:
+        if a != a or a == 0.0:
+            return math.nan
+        return math.copysign(math.inf, a)
+
+
+class _EWM:
+    """One step of pandas ewm(alpha, adjust).mean() (ignore_na=False)."""
+
+    __slots__ = ("alpha", "adjust", "weighted", "old_wt", "nobs")
+
+    def __init__(self, alpha, adjust):
+        self.alpha = alpha
+        self.adjust = adjust
+        self.weighted = math.nan
+        self.old_wt = 1.0
+        self.nobs = 0
+
+    @classmethod
+    def from_series(cls, x, alpha, adjust):
+        ewm = cls(alpha, adjust)
+        ewm.weighted, ewm.old_wt, ewm.nobs = kernels.ewm_state(np.ascontiguousarray(x, dtype=np.float64), alpha, adjust)
+        return ewm
+
+    @property
+    def value(self):
+        return self.weighted if self.nobs else math.nan
+
+    def update(self, x):
+        is_observation = x == x
+        if is_observation:
+            self.nobs += 1
+        if self.weighted == self.weighted:
+            self.old_wt *= 1.0 - self.alpha
+            if is_observation:
+                new_wt = 1.0 if self.adjust else self.alpha
+                if self.weighted != x:
+                    self.weighted = (self.old_wt * self.weighted + new_wt * x) / (self.old_wt + new_wt)
+                self.old_wt = self.old_wt + new_wt if self.adjust else 1.0
+        elif is_observation:
+            self.weighted = x
+        return self.value
+
+
+class _RollingSum:
+    """Kahan-compensated sum over the last `window` values (NaN-free input)."""
+
+    __slots__ = ("window", "values", "total", "comp")
+
+    def __init__(self, window):
+        self.window = window
+        self.values = deque()
+        self.total = 0.0
+        self.comp = 0.0
+
+    def _add(self, v):
+        y = v - self.comp
+        t = self.total + y
+        self.comp = (t - self.total) - y
+        self.total = t
+
+    def push(self, v):
+        self.values.append(v)
+        self._add(v)
+        if len(self.values) > self.window:
+            self._add(-self.values.popleft())
+
+    @property
+    def full(self):
+        return len(self.values) == self.window
+
+
+class _RollingExtreme:
+    """Monotonic deque rolling max/min over the last `window` bars."""
+
+    __slots__ = ("window", "is_max", "items", "i")
+
+    def __init__(self, window, is_max):
+        self.window = window
+        self.is_max = is_max
+        self.items = deque()
+        self.i = -1
+
+    def push(self, v):
+        self.i += 1
+        items = self.items
+        if self.is_max:
+            while items and items[-1][1] <= v:
+                items.pop()
+        else:
+            while items and items[-1][1] >= v:
+                items.pop()
+        items.append((self.i, v))
+        while items[0][0] <= self.i - self.window:
+            items.popleft()
+
+    @property
+    def value(self):
+        return self.items[0][1] if self.i >= self.window - 1 else math.nan
+
+
+class _StreamingState:
+    """Base: bar counter and the (column -> value) snapshot of the latest bar."""
+
+    columns = ()
+    type = None         # registry name; window states replay its lookback in from_history
+
+    def __init__(self):
+        self.n = 0          # bars seen; the latest bar has index n - 1
+        self._last = {c: math.nan for c in self.columns}
+
+    def _masked(self, value, period):
+        # batch path: df['x'].mask(df.index < period)
+        return value if self.n - 1 >= period else math.nan
+
+    def snapshot(self) -> dict:
+        """Latest indicator value(s), keyed like the calculate_indicator columns (NaN during warm-up)."""
+        return dict(self._last)
+
+    def update(self, bar) -> dict:
+        self.n += 1
+        self._last = dict(zip(self.columns, self._step(bar)))
+        return self.snapshot()
+
+    def _step(self, bar):
+        raise NotImplementedError
+
+    @classmethod
+    def from_history(cls, df, **params):
+        """State after the last bar of df; replays only the bars a window needs."""
+        state = cls(**params)
+        # the registry's lookback: bars one output depends on, plus the bar itself
+        tail = get_indicator(cls.type).lookback_bars(params) + 1
+        cols = [c for c in ("close", "high", "low") if c in df.columns]
+        arrays = {c: _price_array(df, c)[-tail:] for c in cols}
+        for i in range(len(arrays["close"])):
+            state.update({c: arrays[c][i] for c in cols})
+        state.n = len(df)
+        return state
+
+
+# ============================================================
+# Trend
+# ============================================================
+class EMAState(_StreamingState):
+    columns = ("ema",)
+
+    def __init__(self, period: int = 14):
+        super().__init__()
+        self.period = period
+        self.ema = _EWM(kernels.span_alpha(period), False)
+
+    def _step(self, bar):
+        return (self._masked(self.ema.update(_field(bar, "close")), self.period),)
+
+    @classmethod
+    def from_history(cls, df, period: int = 14):
+        state = cls(period)
+        state.ema = _EWM.from_series(_price_array(df, "close"), state.ema.alpha, False)
+        state.n = len(df)
+        state._last = {"ema": state._masked(state.ema.value, period)}
+        return state
+
+
+class MAState(_StreamingState):
+    type = "ma"
+    columns = ("ma",)
+
+    def __init__(self, period: int = 14):
+        super().__init__()
+        self.period = period
+        self.sum = _RollingSum(period)
+
+    def _step(self, bar):
+        self.sum.push(_field(bar, "close"))
+        value = self.sum.total / self.period if self.sum.full else math.nan
+        return (self._masked(value, self.period),)
+
+
+class MACDState(_StreamingState):
+    columns = ("macd", "signal", "ema_fast", "ema_slow")
+
+    def __init__(self, fast: int = 12, slow: int = 26, signal: int = 9):
+        super().__init__()
+        self.fast = _EWM(kernels.span_alpha(fast), False)
+        self.slow = _EWM(kernels.span_alpha(slow), False)
+        self.signal = _EWM(kernels.span_alpha(signal), False)
+
+    def _step(self, bar):
+        close = _field(bar, "close")
+        ema_fast, ema_slow = self.fast.update(close), self.slow.update(close)
+        line = ema_fast - ema_slow
+        return line, self.signal.update(line), ema_fast, ema_slow
+
+    @classmethod
+    def from_history(cls, df, fast: int = 12, slow: int = 26, signal: int = 9):
+        state = cls(fast, slow, signal)
+        close = _price_array(df, "close")
+        line, _, ema_fast, ema_slow = kernels.macd(close, fast, slow, signal)
+        state.fast = _EWM.from_series(close, state.fast.alpha, False)
+        state.slow = _EWM.from_series(close, state.slow.alpha, False)
+        state.signal = _EWM.from_series(line, state.signal.alpha, False)
+        state.n = len(df)
+        if len(df):
+            state._last = dict(zip(cls.columns, (line[-1], state.signal.value, ema_fast[-1], ema_slow[-1])))
+        return state
+
+
+class ADXState(_StreamingState):
+    columns = ("adx",)
+
+    def __init__(self, period: int = 14):
+        super().__init__()
+        self.period = period
+        alpha = 1.0 / period
+        self.tr = _RollingSum(period)
+        self.di_plus = _EWM(alpha, True)
+        self.di_minus = _EWM(alpha, True)
+        self.dx = _EWM(alpha, True)
+        self.prev = None  # (high, low, close)
+
+    def _step(self, bar):
+        high, low, close = _field(bar, "high"), _field(bar, "low"), _field(bar, "close")
+        plus = minus = 0.0
+        tr = abs(high - low)
+        if self.prev is not None:
+            prev_high, prev_low, prev_close = self.prev
+            up_move, down_move = high - prev_high, prev_low - low
+            if up_move > down_move and up_move > 0.0:
+                plus = up_move
+            if down_move > up_move and down_move > 0.0:
+                minus = down_move
+            tr = max(tr, abs(high - prev_close), abs(prev_close - low))
+        self.prev = (high, low, close)
+
+        self.tr.push(tr)
+        atr = self.tr.total / self.period if self.tr.full else math.nan
+        dp = 100.0 * self.di_plus.update(_div(plus, atr))
+        dm = 100.0 * self.di_minus.update(_div(minus, atr))
+        adx = 100.0 * self.dx.update(_div(abs(dp - dm), dp + dm))
+        return (self._masked(adx, self.period),)
+
+    @classmethod
+    def from_history(cls, df, period: int = 14):
+        state = cls(period)
+        high, low, close = _price_array(df, "high"), _price_array(df, "low"), _price_array(df, "close")
+        if len(close) == 0:
+            return state
+        alpha = 1.0 / period
+        plus, minus = kernels.directional_moves(high, low)
+        tr = kernels.true_range(high, low, close)
+        atr = kernels.rolling_mean(tr, period)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            dp = 100.0 * kernels.ewm_mean(plus / atr, alpha, True)
+            dm = 100.0 * kernels.ewm_mean(minus / atr, alpha, True)
+            state.di_plus = _EWM.from_series(plus / atr, alpha, True)
+            state.di_minus = _EWM.from_series(minus / atr, alpha, True)
+            state.dx = _EWM.from_series(np.abs(dp - dm) / (dp + dm), alpha, True)
+        for v in tr[-period:]:
+            state.tr.push(float(v))
+        state.prev = (high[-1], low[-1], close[-1])
+        state.n = len(close)
+        state._last = {"adx": state._masked(100.0 * state.dx.value, period)}
+        return state
+
+
+# ============================================================
+# Momentum
+# ============================================================
+class RSIState(_StreamingState):
+    columns = ("rsi",)
+
+    def __init__(self, period: int = 14):
+        super().__init__()
+        self.period = period
+        self.gain = _EWM(1.0 / period, True)
+        self.loss = _EWM(1.0 / period, True)
+        self.prev_close = None
+
+    @staticmethod
+    def _rsi(gain, loss):
+        return 100.0 - _div(100.0, 1.0 + _div(gain, loss))
+
+    def _step(self, bar):
+        close = _field(bar, "close")
+        if self.prev_close is None:
+            up = down = math.nan
+        else:
+            d = close - self.prev_close
+            up, down = max(d, 0.0), max(-d, 0.0)
+        self.prev_close = close
+        value = self._rsi(self.gain.update(up), self.loss.update(down))
+        return (self._masked(value, self.period),)
+
+    @classmethod
+    def from_history(cls, df, period: int = 14):
+        state = cls(period)
+        close = _price_array(df, "close")
+        up, down = kernels.price_moves(close)
+        state.gain = _EWM.from_series(up, 1.0 / period, True)
+        state.loss = _EWM.from_series(down, 1.0 / period, True)
+        state.prev_close = float(close[-1]) if len(close) else None
+        state.n = len(close)
+        state._last = {"rsi": state._masked(cls._rsi(state.gain.value, state.loss.value), period)}
+        return state
+
+
+class ROCState(_StreamingState):
+    type = "roc"
+    columns = ("roc",)
+
+    def __init__(self, period: int = 14):
+        super().__init__()
+        self.period = period
+        self.closes = deque(maxlen=period + 1)
+
+    def _step(self, bar):
+        self.closes.append(_field(bar, "close"))
+        if len(self.closes) <= self.period:
+            return (math.nan,)
+        prev = self.closes[0]
+        return (_div(self.closes[-1] - prev, prev) * 100.0,)
+
+
+class WilliamsState(_StreamingState):
+    type = "williams"
+    columns = ("williams",)
+
+    def __init__(self, period: int = 14):
+        super().__init__()
+        self.period = period
+        self.highs = _RollingExtreme(period, True)
+        self.lows = _RollingExtreme(period, False)
+
+    def _step(self, bar):
+        self.highs.push(_field(bar, "high"))
+        self.lows.push(_field(bar, "low"))
+        hh, ll = self.highs.value, self.lows.value
+        return (-100.0 * _div(hh - _field(bar, "close"), hh - ll),)
+
+
+# ============================================================
+# Volatility
+# ============================================================
+class ATRState(_StreamingState):
+    type = "atr"
+    columns = ("atr",)
+
+    def __init__(self, period: int = 14):
+        super().__init__()
+        self.period = period
+        self.tr = _RollingSum(period)
+        self.prev_close = None
+
+    def _step(self, bar):
+        high, low, close = _field(bar, "high"), _field(bar, "low"), _field(bar, "close")
+        tr = abs(high - low)
+        if self.prev_close is not None:
+            tr = max(tr, abs(high - self.prev_close), abs(self.prev_close - low))
+        self.prev_close = close
+        self.tr.push(tr)
+        value = self.tr.total / self.period if self.tr.full else math.nan
+        return (self._masked(value, self.period),)
+
+
+class BBandsState(_StreamingState):
+    type = "bbands"
+    columns = ("bb_lower", "bb_mid", "bb_upper")
+
+    def __init__(self, period: int = 20, std_dev: float = 2.0):
+        super().__init__()
+        self.period = period
+        self.std = std_dev
+        self.sum = _RollingSum(period)
+        self.sum_sq = _RollingSum(period)
+        self.shift = None  # values are centred on the first close to keep sum of squares well conditioned
+
+    def _step(self, bar):
+        close = _field(bar, "close")
+        if self.shift is None:
+            self.shift = close
+        x = close - self.shift
+        self.sum.push(x)
+        self.sum_sq.push(x * x)
+        if not self.sum.full:
+            return math.nan, math.nan, math.nan
+        p = self.period
+        mean = self.sum.total / p
+        var = (self.sum_sq.total - p * mean * mean) / (p - 1) if p > 1 else math.nan
+        dev = math.sqrt(var) if var > 0.0 else 0.0
+        mid = mean + self.shift
+        return mid - self.std * dev, mid, mid + self.std * dev
+
+
+class DonchianState(_StreamingState):
+    type = "donchian"
+    columns = ("donchian_lower", "donchian_mid", "donchian_upper")
+
+    def __init__(self, period: int = 20):
+        super().__init__()
+        self.period = period
+        self.highs = _RollingExtreme(period, True)
+        self.lows = _RollingExtreme(period, False)
+
+    def _step(self, bar):
+        self.highs.push(_field(bar, "high"))
+        self.lows.push(_field(bar, "low"))
+        upper, lower = self.highs.value, self.lows.value
+        return lower, (upper + lower) / 2.0, upper
+
+
+# ============================================================
+# Lookup
+# ============================================================
+STREAMING_STATES = {
+    "ema": EMAState,
+    "ma": MAState,
+    "macd": MACDState,
+    "adx": ADXState,
+    "rsi": RSIState,
+    "roc": ROCState,
+    "williams": WilliamsState,
+    "atr": ATRState,
+    "bbands": BBandsState,
+    "donchian": DonchianState,
+}
+
+
+def streaming_state(type: str, df: pd.DataFrame = None, **params):
+    """New streaming state for an indicator type, seeded from df's history when given."""
+    cls = STREAMING_STATES.get(type.lower())
+    if cls is None:
+        raise ValueError(f"Unsupported streaming indicator type: {type}")
+    return cls.from_history(df, **params) if df is not None else cls(**params)
@@ -1,10 +1,19 @@
 # === External libraries ===
+import functools
+
+import numpy as np
 import pandas as pd
 
 from src.ta.functions.indicators.trend_indicators import *
 from src.ta.functions.indicators.momentum_indicators import *
 from src.ta.functions.indicators.volatility_indicators  import *
 from src.ta.functions.indicators.universal_indicator_dispatcher import *
+from src.ta.functions.indicators.ema_provider import ema_provider
+from src.ta.functions.indicators.registry import indicator_line
+from src.ta.functions.indicators.signal_set import SignalSet
+from src.ta.functions.indicators.level_index import LevelIndex
+from src.ta.functions.indicators.moment_index import MomentIndex, moment_index
+from src.ta.functions.indicators.signal_filters import dilate, min_gap_filter, min_gap_positions
 
 
 
@@ -24,33 +33,126 @@ def crossUpThreshold(df, type, thr, period, wd=0, sell=False, **kwargs):
     """
 
     # compute indicator with user-provided params
-    ind_df = calculate_indicator(df.copy(), type=type, period=period, plot=False, **kwargs)
+    ind_df = calculate_indicator(df, type=type, period=period, plot=False, **kwargs)
+
+    # the indicator's declared threshold line
+    col = indicator_line(type, period=period, **kwargs)
+
+    rows = df.index.get_indexer(ind_df.index)
+    return _cross_signals(df, rows, ind_df[col].to_numpy(dtype=float), thr, wd=wd, sell=sell)
+
 
-    # find the indicator column (everything except Date)
-    col = [c for c in ind_df.columns if c != 'Date'][0]
+def _cross_signals(df, rows, values, thr, wd=0, sell=False):
+    """
+    crossUpThreshold core on plain arrays.
 
-    prev = ind_df[col].shift(1)
-    curr = ind_df[col]
+    rows are the positions (in df) of the indicator frame rows and values the
+    indicator line on those rows, so an IndicatorBank column can be fed in
+    directly without building the intermediate frame.
+    """
+    prev = np.empty_like(values)
+    prev[:1] = np.nan
+    prev[1:] = values[:-1]
 
     # BUY: cross up through threshold
     if not sell:
-        cross = (prev < thr) & (curr >= thr)
+        cross = (prev < thr) & (values >= thr)
 
     # SELL: cross down through threshold
     else:
-        cross = (prev > thr) & (curr <= thr)
+        cross = (prev > thr) & (values <= thr)
 
-    # Create signal column
-    ind_df["signal"] = df["close"].where(cross, "")
+    # cluster filtering: remove signals too close to each other
+    hit = _drop_clustered(df, rows[cross], wd)
+    return SignalSet(hit, base=df)
 
-    # Filter only signal rows
-    signals = ind_df[ind_df["signal"] != ""][["Date", "signal"]].copy()
 
-    # cluster filtering: remove signals too close to each other
-    signals["diff"] = signals["Date"].diff().dt.days
-    signals = signals[(signals["diff"].isna()) | (signals["diff"] > wd)]
+#----------------
+#crossUpThresholds   1 indicator, a whole vector of static levels
+#----------------
+def crossUpThresholds(df, type, thr, period, wd=0, sell=False, matrix=False, **kwargs):
+    """
+    crossUpThreshold for many thresholds from a single indicator computation.
 
-    return signals.drop(columns="diff")
+    Parameters:
+        df (pd.DataFrame): OHLCV with 'Date'
+        type (str): Indicator type
+        thr (array-like): Threshold levels
+        period (int): Indicator period
+        wd (int): Minimum gap (in days) between valid signals
+        sell (bool | str): False = cross up, True = cross down, "both" = both directions
+        matrix (bool): Return (n_bars x n_thr) boolean crossing matrices instead of SignalSets
+        kwargs: Extra indicator params
+
+    Returns:
+        list of SignalSet (one per level), or (buy, sell) lists when sell="both";
+        with matrix=True the matching crossing matrix (pair of matrices for "both")
+    """
+    rows, values = _indicator_rows(df, type, period, kwargs)
+    directions = (False, True) if isinstance(sell, str) and sell == "both" else (bool(sell),)
+
+    out = []
+    for direction in directions:
+        raw = [SignalSet(hit, base=df) for hit in _cross_hits(rows, values, thr, sell=direction)]
+        sets = min_gap_filter(raw, wd, unit="D")
+        if matrix:
+            cross = np.zeros((len(df), len(sets)), dtype=bool)
+            for j, signals in enumerate(sets):
+                cross[signals.positions, j] = True
+            out.append(cross)
+        else:
+            out.append(sets)
+    return tuple(out) if len(out) == 2 else out[0]
+
+
+def _cross_hits(rows, values, thrs, sell=False):
+    """
+    Crossing positions of every level in thrs over one indicator line.
+
+    The line crosses up through every level in (prev, curr] (down: [curr, prev)),
+    so each bar contributes one contiguous range of the sorted levels; the work
+    is O(n_bars log n_thr + n_signals) instead of one full pass per level.
+
+    Returns:
+        list with one sorted array of df row positions per level (wd not applied)
+    """
+    thrs = np.asarray(thrs)
+    if thrs.dtype.kind not in "iuf":
+        raise TypeError("thresholds must be numeric")
+    thrs = thrs.astype(values.dtype).ravel()
+    order = np.argsort(thrs, kind="stable")
+    levels = thrs[order]
+    prev, curr = values[:-1], values[1:]
+
+    # BUY: levels in (prev, curr]   SELL: levels in [curr, prev)
+    if not sell:
+        lo, hi = np.searchsorted(levels, prev, "right"), np.searchsorted(levels, curr, "right")
+    else:
+        lo, hi = np.searchsorted(levels, curr, "left"), np.searchsorted(levels, prev, "left")
+    counts = np.where(np.isnan(prev) | np.isnan(curr), 0, np.maximum(hi - lo, 0))
+
+    # expand to (bar, level) pairs, then group by level keeping bar order
+    bars = np.repeat(np.arange(1, len(values)), counts)
+    offsets = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+    level = order[np.repeat(lo, counts) + offsets]
+    by_level = np.argsort(level, kind="stable")
+    hits = np.asarray(rows)[bars[by_level]]
+    return np.split(hits, np.searchsorted(level[by_level], np.arange(1, len(thrs))))
+
+
+def _drop_clustered(df, hit, wd, unit="D"):
+    """Keep signals more than wd units (whole days by default) after the last kept one."""
+    if len(hit) < 2:
+        return hit
+    ticks = hit if unit == "bars" else df["Date"].to_numpy()[hit]
+    return hit[min_gap_positions(ticks, wd, unit)]
+
+
+def _indicator_rows(df, type, period, kwargs):
+    """(row positions in df, threshold line values) of one indicator frame."""
+    ind = calculate_indicator(df, type=type, period=period, plot=False, **kwargs)
+    col = indicator_line(type, period=period, **kwargs)
+    return df.index.get_indexer(ind.index), ind[col].to_numpy(dtype=float)
 
 
 
@@ -71,40 +173,38 @@ def crossUpLineThreshold(df,type1, period1,type2, period2,wd=1,kwargs1={},kwargs
         type2 (str): Second indicator type
         period2 (int): Period for indicator 2
         wd (int): Minimum gap (in days) between valid signals
-        kwargs1 (dict): Extra arguments for indicator 1
-        kwargs2 (dict): Extra arguments for indicator 2
+        kwargs1 (dict): Extra arguments for indicator 1 (line= picks one line of a multi-line indicator)
+        kwargs2 (dict): Extra arguments for indicator 2 (line= as for kwargs1)
 
     Returns:
-        pd.DataFrame: ['Date', 'signal'] with clean cross-up entries
+        SignalSet: clean cross-up entries (frame form ['Date', 'signal'] = 'entry')
     """
 
-    # === 1. Calculate both indicators
-    ind1_df = calculate_indicator(df.copy(), type=type1, period=period1, plot=False, **kwargs1)
-    ind2_df = calculate_indicator(df.copy(), type=type2, period=period2, plot=False, **kwargs2)
+    # === 1. Calculate both indicators (one line each, as df row positions)
+    rows1, values1 = _cross_line_rows(df, type1, period1, kwargs1)
+    rows2, values2 = _cross_line_rows(df, type2, period2, kwargs2)
 
-    # === 2. Standardize column names to 'value'
-    ind1_df = ind1_df.rename(columns={col: 'value' for col in ind1_df.columns if col != 'Date'})
-    ind2_df = ind2_df.rename(columns={col: 'value' for col in ind2_df.columns if col != 'Date'})
+    # === 2. Bars where both exist (the old merge on 'Date')
+    rows, i1, i2 = np.intersect1d(rows1, rows2, assume_unique=True, return_indices=True)
+    value_1, value_2 = values1[i1], values2[i2]
 
-    # === 3. Merge with suffixes
-    merged = pd.merge(ind1_df, ind2_df, on='Date', suffixes=('_1', '_2'))
+    # === 3. Detect upward cross (value_1 crosses above value_2)
+    cross_up = np.zeros(len(rows), dtype=bool)
+    cross_up[1:] = (value_1[:-1] < value_2[:-1]) & (value_1[1:] >= value_2[1:])
 
-    # === 4. Detect upward cross (value_1 crosses above value_2)
-    cross_up = (merged['value_1'].shift(1) < merged['value_2'].shift(1)) & \
-               (merged['value_1'] >= merged['value_2'])
+    # === 4. Filter clusters: keep only first signal if multiple are close
+    hit = _drop_clustered(df, rows[cross_up], wd)
+    return SignalSet(hit, base=df, label="entry")
 
-    # === 5. Mark only exact crossing points
-    merged['signal'] = cross_up.apply(lambda x: 'entry' if x else '')
 
-    # === 6. Keep only rows with signals
-    signals = merged[merged['signal'] != ''][['Date', 'signal']].copy()
-
-    # === 7. Filter clusters: keep only first signal if multiple are close
-    signals['diff'] = signals['Date'].diff().dt.days
-    signals = signals[(signals['diff'].isna()) | (signals['diff'] > wd)]
-    signals = signals.drop(columns='diff')
-
-    return signals
+def _cross_line_rows(df, type, period, kwargs):
+    """_indicator_rows for a line-vs-line cross: a multi-line indicator (bbands, donchian, ...) needs line=."""
+    ind = calculate_indicator(df, type=type, period=period, plot=False, **kwargs)
+    lines = [c for c in ind.columns if c != "Date"]
+    col = kwargs.get("line", lines[0] if len(lines) == 1 else None)
+    if col not in lines:
+        raise ValueError(f"{type} has lines {lines}; pick one with line= to cross it")
+    return df.index.get_indexer(ind.index), ind[col].to_numpy(dtype=float)
 
 
 
@@ -113,7 +213,6 @@ def crossUpLineThreshold(df,type1, period1,type2, period2,wd=1,kwargs1={},kwargs
 
 #----------------
 #In Range Threshold
-# TODO: add wd!
 #----------------
 def inRangeThreshold(df,type,period,lower,upper,kwargs={}):
     """
@@ -129,23 +228,47 @@ def inRangeThreshold(df,type,period,lower,upper,kwargs={}):
         kwargs (dict): Extra kwargs for the indicator
 
     Returns:
-        pd.DataFrame: ['Date', 'signal'] rows where value is inside range
+        SignalSet: bars where value is inside range (frame form ['Date', 'signal'] = 'entry')
     """
 
     # === 1. Calculate indicator
-    ind = calculate_indicator(df.copy(), type=type, period=period, plot=False, **kwargs)
-    col = [c for c in ind.columns if c != 'Date'][0]
-    ind = ind.rename(columns={col: 'value'})
+    rows, values = _indicator_rows(df, type, period, kwargs)
 
-    # === 2. Check if inside range
-    in_range = (ind['value'] >= lower) & (ind['value'] <= upper)
+    # === 2. Check if inside range: every in-range candle is a signal
+    in_range = (values >= lower) & (values <= upper)
+    return SignalSet(rows[in_range], base=df, label="entry")
 
-    # === 3. Mark signals for every in-range candle
-    ind['signal'] = in_range.apply(lambda x: 'entry' if x else '')
 
-    # === 4. Return only signal rows
-    result = ind[ind['signal'] != ''][['Date', 'signal']].copy()
-    return result
+#----------------
+#In Range Thresholds (lower x upper grid)
+#----------------
+def inRangeThresholds(df,type,period,lower,upper,kwargs={},counts_only=False):
+    """
+    inRangeThreshold for every (lower, upper) pair from one sorted pass over the indicator.
+
+    Parameters:
+        df (pd.DataFrame): Input OHLCV with 'Date'
+        type (str): Indicator type
+        period (int): Indicator period
+        lower (array-like): Lower thresholds
+        upper (array-like): Upper thresholds
+        kwargs (dict): Extra kwargs for the indicator
+        counts_only (bool): Return only the signal counts (nothing is materialized)
+
+    Returns:
+        (len(lower) x len(upper)) count matrix, or nested list result[i][j] of SignalSets
+    """
+    rows, values = _indicator_rows(df, type, period, kwargs)
+    index = LevelIndex(values, rows)
+    lower, upper = np.atleast_1d(lower), np.atleast_1d(upper)
+    if counts_only:
+        return index.counts(lower, upper)
+    return [[_range_signals(index, lo, up, df) for up in upper] for lo in lower]
+
+
+def _range_signals(index: LevelIndex, lower, upper, base) -> SignalSet:
+    """In-range signals counted from the index; positions are only gathered when read."""
+    return SignalSet.deferred(index.count(lower, upper), functools.partial(index.positions, lower, upper), len(base), base=base, label="entry")
 
 
 
@@ -169,40 +292,100 @@ def timeThreshold(df,type,period,level,direction="above",min_candles=3,wd=0,**kw
         kwargs (dict): Extra params for the indicator
 
     Returns:
-        pd.DataFrame: ['Date', 'signal']
+        SignalSet (frame form ['Date', 'signal'] = 'entry')
     """
 
     # === 1. Calculate indicator
-    ind = calculate_indicator(df.copy(), type=type, period=period, plot=False, **kwargs)
-    col = [c for c in ind.columns if c != "Date"][0]
-    ind = ind.rename(columns={col: "value"})
+    rows, values = _indicator_rows(df, type, period, kwargs)
 
-    # === 2. Boolean mask above/below threshold
-    if direction == "above":
-        cond = ind["value"] > level
-    elif direction == "below":
-        cond = ind["value"] < level
-    else:
-        raise ValueError("direction must be 'above' or 'below'")
+    # === 2-6. Streaks of the above/below mask, valid from the min_candles-th bar, expanded by wd
+    return _time_signals(df, rows, values, [level], direction, [min_candles], wd=wd)[0][0]
+
+
+#----------------
+# Time Thresholds (every level x min_candles at once)
+#----------------
+def timeThresholds(df, type, period, level, direction="above", min_candles=3, wd=0, **kwargs):
+    """
+    timeThreshold for every (level, min_candles) pair from one indicator computation.
+
+    Parameters:
+        df (pd.DataFrame): OHLCV DataFrame
+        type (str): Indicator type
+        period (int): Indicator period
+        level (array-like): Threshold values
+        direction (str): "above" or "below"
+        min_candles (array-like): Required streak lengths
+        wd (int): Expand signals (as timeThreshold)
+        kwargs (dict): Extra params for the indicator
+
+    Returns:
+        nested list: result[i][j] is the SignalSet of level[i], min_candles[j]
+    """
+    rows, values = _indicator_rows(df, type, period, kwargs)
+    return _time_signals(df, rows, values, np.atleast_1d(level), direction, np.atleast_1d(min_candles), wd=wd)
 
-    # === 3. Count consecutive streaks
-    streak = (cond != cond.shift()).cumsum()
-    streak_count = cond.groupby(streak).cumsum()
 
-    # === 4. Valid if streak length ≥ min_candles
-    valid = streak_count >= min_candles
+def _time_signals(df, rows, values, levels, direction, min_candles, wd=0):
+    """[level][min_candles] SignalSets of timeThreshold on one indicator line."""
+    hits = _streak_hits(values, levels, direction, min_candles)
 
-    # === 5. Expand by window if needed
+    # (the expansion has always widened step i = 1..wd by i bars on the already
+    # widened mask, i.e. ±wd*(wd+1)/2 bars in total)
     if wd > 0:
-        for i in range(1, wd + 1):
-            valid |= valid.shift(i)
-            valid |= valid.shift(-i)
+        valid = np.zeros((len(values), len(levels) * len(min_candles)), dtype=bool)
+        for k, hit in enumerate(h for per_level in hits for h in per_level):
+            valid[hit, k] = True
+        valid = dilate(valid, wd * (wd + 1) // 2)
+        flat = [np.flatnonzero(valid[:, k]) for k in range(valid.shape[1])]
+        hits = [flat[i * len(min_candles):(i + 1) * len(min_candles)] for i in range(len(levels))]
 
-    # === 6. Build result
-    signals = ind.loc[valid, ["Date"]].copy()
-    signals["signal"] = "entry"
+    return [[SignalSet(rows[hit], base=df, label="entry") for hit in per_level] for per_level in hits]
 
-    return signals
+
+def _streak_hits(values, levels, direction, min_candles):
+    """
+    Run-length encoded streak detection for many levels and streak lengths.
+
+    The above/below mask of every level is encoded once as runs (start, end);
+    a run of length L holds a valid signal on its bars min_candles-1 .. L-1, so
+    each min_candles value is a slice of the same runs.
+
+    Returns:
+        hits[i][j]: positions (into values) valid for levels[i], min_candles[j]
+    """
+    levels = np.asarray(levels, dtype=float).ravel()
+    n = len(values)
+
+    # === Boolean mask above/below every threshold
+    if direction == "above":
+        cond = values[:, None] > levels[None, :]
+    elif direction == "below":
+        cond = values[:, None] < levels[None, :]
+    else:
+        raise ValueError("direction must be 'above' or 'below'")
+
+    # === Runs: per level (column-major), starts and ends pair up in order
+    edges = np.diff(np.pad(cond.astype(np.int8), ((1, 1), (0, 0))), axis=0).T
+    run_level, starts = np.nonzero(edges == 1)
+    _, ends = np.nonzero(edges == -1)
+    lengths = ends - starts
+
+    hits = [[None] * len(min_candles) for _ in levels]
+    for j, mc in enumerate(min_candles):
+        # streak count >= mc, counting from the run start (every bar when mc <= 0)
+        m = int(np.ceil(mc))
+        if m <= 0:
+            for i in range(len(levels)):
+                hits[i][j] = np.arange(n)
+            continue
+        counts = np.maximum(lengths - m + 1, 0)
+        offsets = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+        positions = np.repeat(starts + m - 1, counts) + offsets
+        split = np.searchsorted(np.repeat(run_level, counts), np.arange(1, len(levels)))
+        for i, hit in enumerate(np.split(positions, split)):
+            hits[i][j] = hit
+    return hits
 
 
 
@@ -215,11 +398,16 @@ def timeThreshold(df,type,period,level,direction="above",min_candles=3,wd=0,**kw
 #? ==========================================================================================================
 
 
+def _signal_rows(df, mask, **extra):
+    """SignalSet of the bars where mask holds; frame form ['Date', 'close', *extra]."""
+    mask = np.asarray(mask, dtype=bool)
+    extra = {name: np.asarray(values)[mask] for name, values in extra.items()}
+    return SignalSet.from_mask(mask, base=df, column="close", extra=extra)
+
+
 #-----------------------
 # Stdv Bands Threshold 
 #-----------------------
-import numpy as np
-import pandas as pd
 def stdvBandsThreshold(df, ema_period=10, window=50, sigma=0.8, wd=0):
     """
     Detects when an indicator is above/below a stdv Band Threshold
@@ -231,41 +419,58 @@ def stdvBandsThreshold(df, ema_period=10, window=50, sigma=0.8, wd=0):
     Returns:
         s_above, s_below
     """
-        
-    df_temp = df.copy()
-    
-    # 1. Calculate the Baseline (EMA)
-    df_temp['ema'] = df_temp['close'].ewm(span=ema_period, adjust=False).mean()
-    print(df_temp['ema'])
+    s_above, s_below = stdvBandsThresholds(df, ema_period=ema_period, window=window, sigma=[sigma], wd=wd)
+    return s_above[0], s_below[0]
+
+
+def stdvBandsThresholds(df, ema_period=10, window=50, sigma=(0.8,), wd=0):
+    """
+    stdvBandsThreshold for a whole sweep of sigma values.
+
+    Parameters:
+        df (pd.DataFrame): OHLCV with 'Date'
+        ema_period (int): Baseline EMA span
+        window (int): Rolling window of the distance std
+        sigma (array-like): Band widths, in stds of the distance
+        wd (int): Minimum gap (in bars) between kept signals
+
+    Returns:
+        s_above, s_below: lists with one SignalSet per sigma
+    """
+    close = df['close'].to_numpy(dtype=float)
+
+    # 1. Calculate the Baseline (EMA), shared with the EMA/MACD indicators of this dataset
+    ema = ema_provider(df).ema(ema_period)
+
     # 2. Calculate RAW distance (not absolute) for the std() calculation
     # We use raw distance so the standard deviation captures the true variance
-    df_temp['dist_raw'] = df_temp['close'] - df_temp['ema']
-    
+    dist_raw = close - ema
+
     # 3. Calculate Rolling Standard Deviation of the distance
     # This represents the "volatility unit"
-    df_temp['rolling_std'] = df_temp['dist_raw'].rolling(window=window).std()
-    
-    # 4. Create Symmetrical Bands centered on the EMA
+    rolling_std = MomentIndex(dist_raw).std(window)
+
+    # 4. Create Symmetrical Bands centered on the EMA, one column per sigma
     # Distance from EMA = (sigma * std)
     # No rolling_mean is added here to ensure perfect symmetry
-    df_temp['upper_band_price'] = df_temp['ema'] + (sigma * df_temp['rolling_std'])
-    df_temp['lower_band_price'] = df_temp['ema'] - (sigma * df_temp['rolling_std'])
-    
-    # 5. Signal Detection
+    sigma = np.atleast_1d(np.asarray(sigma, dtype=float))
+    dev = sigma[None, :] * rolling_std[:, None]
+    upper_band_price = ema[:, None] + dev
+    lower_band_price = ema[:, None] - dev
+
+    # 5. Signal Detection (one broadcasted comparison for every sigma)
     # Logic: Is the current close price touching or outside the bands?
-    above = (df_temp['close'] >= df_temp['upper_band_price'])
-    below = (df_temp['close'] <= df_temp['lower_band_price'])
-    
-    s_above = df_temp.loc[above, ["Date", "close"]].copy()
-    s_below = df_temp.loc[below, ["Date", "close"]].copy()
+    above = (close[:, None] >= upper_band_price)
+    below = (close[:, None] <= lower_band_price)
+
+    s_above = [_signal_rows(df, above[:, k]) for k in range(len(sigma))]
+    s_below = [_signal_rows(df, below[:, k]) for k in range(len(sigma))]
 
     # 6. Clustering (Filter consecutive signals)
+    # Keep signals more than 'wd' bars after the last kept one
     if wd > 0:
-        for sig_df in [s_above, s_below]:
-            if not sig_df.empty:
-                sig_df['idx'] = range(len(sig_df))
-                # Remove signals within 'wd' bars of each other
-                sig_df.drop(sig_df[sig_df['idx'].diff() <= wd].index, inplace=True)
+        s_above = min_gap_filter(s_above, wd, unit="bars")
+        s_below = min_gap_filter(s_below, wd, unit="bars")
 
     return s_above, s_below
 
@@ -286,32 +491,37 @@ def kurtosisThreshold(df, window=20, k_range=(-2.0, 1.0), label="trigger_active"
     Calculates kurtosis for each day individually using a rolling window 
     and returns dates falling within the specified range of price calculated.
     """
-    # 1. Prepare the data
-    df_temp = df.copy()
-    # Handle the capitalization inconsistency often found in yfinance
-    if 'close' in df_temp.columns:
-        df_temp['close'] = df_temp['close']
-    
-    # 2. Calculation Logic (Individual daily calculation)
-    # This generates a unique value for every row
-    
-    df_temp['returns'] = np.log(df_temp['close'] / df_temp['close'].shift(1))
-    
-    df_temp['kurt'] = df_temp['returns'].rolling(window=window).kurt()
-    
-    # 3. Apply the Range Filter
-    # This captures the specified k_range.
-    is_in_range = (df_temp['kurt'] >= k_range[0]) & (df_temp['kurt'] <= k_range[1])
-    
-    # 4. Extract results
-    # We ensure "Date" is available (resetting index if necessary)
-    if 'Date' not in df_temp.columns:
-        df_temp = df_temp.reset_index()
-        
-    signals = df_temp.loc[is_in_range, ["Date", "close", "kurt"]].copy()
-    signals["signal"] = label
-    
-    return signals
+    return kurtosisThresholds(df, window=window, k_range=[k_range], label=label)[0]
+
+
+def kurtosisThresholds(df, window=20, k_range=((-2.0, 1.0),), label="trigger_active"):
+    """
+    kurtosisThreshold for many k_range values over one rolling kurtosis.
+
+    Parameters:
+        df (pd.DataFrame): OHLCV with 'Date'
+        window (int): Rolling window of the kurtosis
+        k_range (list): (lower, upper) ranges
+        label (str): Value of the 'signal' column
+
+    Returns:
+        list with one SignalSet per range
+    """
+    # 1. Calculation Logic (Individual daily calculation)
+    # Rolling kurtosis of the log returns, from the dataset's shared moments engine
+    kurt = moment_index(df, returns="log").kurt(window)
+
+    # 2-3. Apply the Range Filter and extract results for every range
+    return _moment_range_signals(df, kurt, "kurt", k_range, label)
+
+
+def _moment_range_signals(df, values, name, ranges, label):
+    signal = np.full(len(df), label, dtype=object)
+    out = []
+    for lower, upper in ranges:
+        is_in_range = (values >= lower) & (values <= upper)
+        out.append(_signal_rows(df, is_in_range, **{name: values}, signal=signal))
+    return out
 
 
 
@@ -329,31 +539,28 @@ def skewThreshold(df, window=20, s_range=(-2.0, 1.0), label="trigger_active"):
     Calculates Skew for each day individually using a rolling window 
     and returns dates falling within the specified range.
     """
-    # 1. Prepare the data
-    df_temp = df.copy()
-    # Handle the capitalization inconsistency often found in yfinance
-    if 'close' in df_temp.columns:
-        df_temp['close'] = df_temp['close']
-    
-    # 2. Calculation Logic (Individual daily calculation)
-    # This generates a unique value for every row
-    
-    df_temp['returns'] = np.log(df_temp['close'] / df_temp['close'].shift(1))
-    
-    df_temp['skew'] = df_temp['returns'].rolling(window=window).skew()
-    
-    # 3. Apply the Range Filter
-    is_in_range = (df_temp['skew'] >= s_range[0]) & (df_temp['skew'] <= s_range[1])
-    
-    # 4. Extract results
-    # We ensure "Date" is available (resetting index if necessary)
-    if 'Date' not in df_temp.columns:
-        df_temp = df_temp.reset_index()
-        
-    signals = df_temp.loc[is_in_range, ["Date", "close", "skew"]].copy()
-    signals["signal"] = label
-    
-    return signals
+    return skewThresholds(df, window=window, s_range=[s_range], label=label)[0]
+
+
+def skewThresholds(df, window=20, s_range=((-2.0, 1.0),), label="trigger_active"):
+    """
+    skewThreshold for many s_range values over one rolling skew.
+
+    Parameters:
+        df (pd.DataFrame): OHLCV with 'Date'
+        window (int): Rolling window of the skew
+        s_range (list): (lower, upper) ranges
+        label (str): Value of the 'signal' column
+
+    Returns:
+        list with one SignalSet per range
+    """
+    # 1. Calculation Logic (Individual daily calculation)
+    # Rolling skew of the log returns, from the dataset's shared moments engine
+    skew = moment_index(df, returns="log").skew(window)
+
+    # 2-3. Apply the Range Filter and extract results for every range
+    return _moment_range_signals(df, skew, "skew", s_range, label)
 
 
 
@@ -378,29 +585,52 @@ def stdvKurtosisThreshold(df, ema_p=20, window=20, sig=1.5, k_win=50, delta_k=0.
     specifiedrange and also if it is cooling down(the rate of drop) 
     returns dates of those specific signals.
     """
-   
-    # 1. Use your existing stdvThresholdEMA for the bands
+    return stdvKurtosisThresholds(df, ema_p=ema_p, window=window, k_win=k_win, params=[(sig, delta_k, n)])[0]
+
+
+def stdvKurtosisThresholds(df, ema_p=20, window=20, k_win=50, params=((1.5, 0.5, 5),)):
+    """
+    stdvKurtosisThreshold for many (sig, delta_k, n) sets sharing one EMA,
+    one distance std and one rolling kurtosis.
+
+    Parameters:
+        df (pd.DataFrame): OHLCV with 'Date'
+        ema_p (int): Baseline EMA span
+        window (int): Rolling window of the distance std
+        k_win (int): Rolling window of the kurtosis
+        params (list): (sig, delta_k, n) tuples
+
+    Returns:
+        list with one (final_buys, final_sells) pair per params entry
+    """
+    # 1. Use your existing stdvThresholdEMA for the bands, every sigma at once
     # This gives us the price 'stretches'
-    s_above, s_below = stdvBandsThreshold(df, ema_period=ema_p, window=window, sigma=sig)
+    sigmas = sorted({sig for sig, _, _ in params})
+    s_above, s_below = stdvBandsThresholds(df, ema_period=ema_p, window=window, sigma=sigmas)
 
     # 2. Use your existing kurtosisThreshold for the raw kurtosis data
     # We set a wide range so we get all the data points for calculation
     k_data = kurtosisThreshold(df, window=k_win, k_range=(-10, 10))  #get all Kurtosis prices
+    kurt = k_data.extra['kurt']
 
-    # 3. Apply the Image Logic (Delta K)
-    # K(t) < K(t-1)
-    #WE SAW WE MIGHT NOT NEED IT FOR NOW
-    
-    # K(t-n) - K(t) > ΔK (using n=5)
-    k_data['drop'] = (k_data['kurt'].shift(n) - k_data['kurt']) > delta_k
+    out = []
+    for sig, delta_k, n in params:
+        # 3. Apply the Image Logic (Delta K)
+        # K(t) < K(t-1)
+        #WE SAW WE MIGHT NOT NEED IT FOR NOW
 
-    # 4. Filter the Sigma signals by these new Delta conditions
-    valid_kurt_dates = k_data[ k_data['drop']]['Date']
-    
-    final_buys = s_below[s_below['Date'].isin(valid_kurt_dates)]
-    final_sells = s_above[s_above['Date'].isin(valid_kurt_dates)]
+        # K(t-n) - K(t) > ΔK (using n=5)
+        # (shifted over the kurtosis signal rows, as the old frame shift did)
+        drop = np.zeros(len(kurt), dtype=bool)
+        if n > 0:
+            drop[n:] = (kurt[:-n] - kurt[n:]) > delta_k
+
+        # 4. Filter the Sigma signals by these new Delta conditions
+        valid_kurt = k_data.select(drop)
 
-    return final_buys, final_sells
+        k = sigmas.index(sig)
+        out.append((s_below[k] & valid_kurt, s_above[k] & valid_kurt))
+    return out
 
 
 
@@ -423,48 +653,64 @@ def derivativeThreshold(df,k=40,alpha=1.0,derivatives="first",lower=-0.001,upper
     Detects when derivative values are inside given bounds.
     """
 
-    # === 1. Compute derivatives
+    bounds = [(lower, upper, lower2, upper2)]
+    return derivativeThresholds(df, k=k, alpha=alpha, derivatives=derivatives, bounds=bounds, wd=wd, scale=scale)[0]
+
+
+def derivativeThresholds(df,k=40,alpha=1.0,derivatives="first",bounds=((-0.001, 0.001, -0.001, 0.001),),wd=0,scale=True):
+    """
+    derivativeThreshold for many bounds over one rolling derivative computation.
+
+    Parameters:
+        df (pd.DataFrame): OHLCV with 'Date'
+        k, alpha, derivatives, scale: as derivativeThreshold
+        bounds (list): (lower, upper, lower2, upper2) tuples
+        wd (int): Minimum gap between kept signals (hours)
+
+    Returns:
+        list with one SignalSet per bounds entry
+    """
+
+    # === 1. Compute derivatives (once for every bounds entry)
     ind_df = rolling_derivative(df=df,k=k,alpha=alpha,scale=scale,derivative= derivatives)
 
     cols = [c for c in ind_df.columns if c != "Date"]
+    rows = df.index.get_indexer(ind_df.index)
+    priced = ~np.isnan(df["close"].to_numpy(dtype=float)[rows])
 
-    # === 2. Build condition
-    if derivatives == "first":
-        col = cols[0]
-        cond = (ind_df[col] >= lower) & (ind_df[col] <= upper)
+    out = []
+    for lower, upper, lower2, upper2 in bounds:
+        # === 2. Build condition
+        if derivatives == "first":
+            col = cols[0]
+            cond = (ind_df[col] >= lower) & (ind_df[col] <= upper)
 
-    elif derivatives == "second":
-        col = cols[0]
-        cond = (ind_df[col] >= lower) & (ind_df[col] <= upper)
+        elif derivatives == "second":
+            col = cols[0]
+            cond = (ind_df[col] >= lower) & (ind_df[col] <= upper)
 
-    elif derivatives == "both":
-        first_col = [c for c in cols if "First" in c][0]
-        second_col = [c for c in cols if "Second" in c][0]
+        elif derivatives == "both":
+            first_col = [c for c in cols if "First" in c][0]
+            second_col = [c for c in cols if "Second" in c][0]
 
-        cond1 = (ind_df[first_col] >= lower) & (ind_df[first_col] <= upper)
-        cond2 = (ind_df[second_col] >= lower2) & (ind_df[second_col] <= upper2)
+            cond1 = (ind_df[first_col] >= lower) & (ind_df[first_col] <= upper)
+            cond2 = (ind_df[second_col] >= lower2) & (ind_df[second_col] <= upper2)
 
-        cond = cond1 & cond2
-
-    else:
-        raise ValueError("derivative must be 'first', 'second', or 'both'")
+            cond = cond1 & cond2
 
-    # === 3. Create signal (Χρησιμοποίησε np.nan αντί για "")
-    ind_df["signal"] = np.nan
-    ind_df.loc[cond, "signal"] = df.loc[cond, "close"]
+        else:
+            raise ValueError("derivative must be 'first', 'second', or 'both'")
 
-    # Κράτα μόνο τις σειρές που έχουν σήμα
-    signals = ind_df.dropna(subset=["signal"])[["Date", "signal"]].copy()
+        # === 3. Create signal on the bars where the condition holds (signal = close price)
+        hit = rows[cond.to_numpy(dtype=bool) & priced]
 
-    # === 4. Cluster filtering (Διόρθωση για ενδοημερήσια δεδομένα)
-    if wd > 0 and not signals.empty:
-        # Αντί για days, υπολόγισε τη διαφορά σε δευτερόλεπτα ή απλά σε θέσεις (index)
-        signals["diff"] = signals["Date"].diff().dt.total_seconds() 
-        # wd σε δευτερόλεπτα (π.χ. αν wd=10 και είσαι σε 1h κεριά, βάλε 10*3600)
-        signals = signals[(signals["diff"].isna()) | (signals["diff"] > wd * 3600)]
-        signals = signals.drop(columns="diff")
+        # === 4. Cluster filtering (Διόρθωση για ενδοημερήσια δεδομένα)
+        if wd > 0:
+            # wd σε ώρες (π.χ. αν wd=10 και είσαι σε 1h κεριά, 10 κεριά)
+            hit = _drop_clustered(df, hit, wd * 3600, unit="s")
 
-    return signals
+        out.append(SignalSet(hit, base=df))
+    return out
 
 
 
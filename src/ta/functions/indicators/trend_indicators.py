@@ -8,11 +8,9 @@ from src.ta.functions.plots.plot_indicators import plot_indicator
 # ADX
 # ============================================================
 def calculate_adx(df: pd.DataFrame, plot: bool = False, period: int = 14) -> pd.DataFrame:
-    df['adx'] = TA.ADX(df, period)
-    df['adx'] = df['adx'].mask(df.index < period)
-    df = df.dropna(subset=['adx']).copy()
-
-    result = df[['Date', 'adx']]
+    # finta's DMI writes helper columns into its input, so give it its own frame
+    adx = TA.ADX(df[['open', 'high', 'low', 'close']].copy(), period).mask(df.index < period)
+    result = pd.DataFrame({'Date': df['Date'], 'adx': adx}).dropna(subset=['adx'])
 
     if plot:
         plot_indicator(result, f"ADX ({period})")
@@ -24,12 +22,17 @@ def calculate_adx(df: pd.DataFrame, plot: bool = False, period: int = 14) -> pd.
 # MACD
 # ============================================================
 def calculate_macd(df: pd.DataFrame, plot: bool = False, fast: int = 12, slow: int = 26, signal: int = 9) -> pd.DataFrame:
-    df['ema_fast'] = df['close'].ewm(span=fast, adjust=False).mean()
-    df['ema_slow'] = df['close'].ewm(span=slow, adjust=False).mean()
-    df['macd'] = df['ema_fast'] - df['ema_slow']
-    df['signal'] = df['macd'].ewm(span=signal, adjust=False).mean()
-
-    result = df[['Date', 'macd', 'signal', 'ema_fast', 'ema_slow']]
+    ema_fast = df['close'].ewm(span=fast, adjust=False).mean()
+    ema_slow = df['close'].ewm(span=slow, adjust=False).mean()
+    macd = ema_fast - ema_slow
+
+    result = pd.DataFrame({
+        'Date': df['Date'],
+        'macd': macd,
+        'signal': macd.ewm(span=signal, adjust=False).mean(),
+        'ema_fast': ema_fast,
+        'ema_slow': ema_slow,
+    })
 
     if plot:
         plot_indicator(result, f"MACD ({fast}-{slow}-{signal})")
@@ -41,11 +44,8 @@ def calculate_macd(df: pd.DataFrame, plot: bool = False, fast: int = 12, slow: i
 # MA
 # ============================================================
 def calculate_ma(df: pd.DataFrame, plot: bool = False, period: int = 14) -> pd.DataFrame:
-    df['ma'] = df['close'].rolling(window=period).mean()
-    df['ma'] = df['ma'].mask(df.index < period)
-    df = df.dropna(subset=['ma']).copy()
-
-    result = df[['Date', 'ma']]
+    ma = df['close'].rolling(window=period).mean().mask(df.index < period)
+    result = pd.DataFrame({'Date': df['Date'], 'ma': ma}).dropna(subset=['ma'])
 
     if plot:
         plot_indicator(result, f"MA ({period})")
@@ -57,11 +57,8 @@ def calculate_ma(df: pd.DataFrame, plot: bool = False, period: int = 14) -> pd.D
 # EMA
 # ============================================================
 def calculate_ema(df: pd.DataFrame, plot: bool = False, period: int = 14) -> pd.DataFrame:
-    df['ema'] = df['close'].ewm(span=period, adjust=False).mean()
-    df['ema'] = df['ema'].mask(df.index < period)
-    df = df.dropna(subset=['ema']).copy()
-
-    result = df[['Date', 'ema']]
+    ema = df['close'].ewm(span=period, adjust=False).mean().mask(df.index < period)
+    result = pd.DataFrame({'Date': df['Date'], 'ema': ema}).dropna(subset=['ema'])
 
     if plot:
         plot_indicator(result, f"EMA ({period})")
@@ -73,12 +70,11 @@ def calculate_ema(df: pd.DataFrame, plot: bool = False, period: int = 14) -> pd.
 # EMA Ribbon
 # ============================================================
 def calculate_ema_ribbon(df: pd.DataFrame, plot: bool = False, periods: list = [8, 13, 21, 34, 55, 89, 144, 233]) -> pd.DataFrame:
+    result = pd.DataFrame({'Date': df['Date']})
     for p in periods:
-        df[f'ema_{p}'] = df['close'].ewm(span=p, adjust=False).mean()
-
-    df = df.dropna(subset=[f'ema_{max(periods)}']).copy()
+        result[f'ema_{p}'] = df['close'].ewm(span=p, adjust=False).mean()
 
-    result = df[['Date'] + [f'ema_{p}' for p in periods]]
+    result = result.dropna(subset=[f'ema_{max(periods)}'])
 
     if plot:
         plot_indicator(result, f"EMA Ribbon {periods}")
@@ -90,16 +86,17 @@ def calculate_ema_ribbon(df: pd.DataFrame, plot: bool = False, periods: list = [
 # EMA Crossover
 # ============================================================
 def calculate_ema_crossover(df: pd.DataFrame, plot: bool = False, fast: int = 9, slow: int = 21) -> pd.DataFrame:
-    df['ema_fast'] = df['close'].ewm(span=fast, adjust=False).mean()
-    df['ema_slow'] = df['close'].ewm(span=slow, adjust=False).mean()
-
-    df['ema_signal'] = 0
-    df.loc[df['ema_fast'] > df['ema_slow'], 'ema_signal'] = 1
-    df.loc[df['ema_fast'] < df['ema_slow'], 'ema_signal'] = -1
+    result = pd.DataFrame({
+        'Date': df['Date'],
+        'ema_fast': df['close'].ewm(span=fast, adjust=False).mean(),
+        'ema_slow': df['close'].ewm(span=slow, adjust=False).mean(),
+    })
 
-    df = df.dropna(subset=['ema_fast', 'ema_slow']).copy()
+    result['ema_signal'] = 0
+    result.loc[result['ema_fast'] > result['ema_slow'], 'ema_signal'] = 1
+    result.loc[result['ema_fast'] < result['ema_slow'], 'ema_signal'] = -1
 
-    result = df[['Date', 'ema_fast', 'ema_slow', 'ema_signal']]
+    result = result.dropna(subset=['ema_fast', 'ema_slow'])
 
     if plot:
         plot_indicator(result, f"EMA Crossover ({fast}-{slow})")
@@ -116,16 +113,19 @@ def calculate_ichimoku(df: pd.DataFrame, plot: bool = False, tenkan: int = 9, ki
     low = df['low']
     close = df['close']
 
-    df['tenkan_sen'] = (high.rolling(tenkan).max() + low.rolling(tenkan).min()) / 2
-    df['kijun_sen'] = (high.rolling(kijun).max() + low.rolling(kijun).min()) / 2
-    df['senkou_span_a'] = ((df['tenkan_sen'] + df['kijun_sen']) / 2).shift(kijun)
-    df['senkou_span_b'] = ((high.rolling(senkou).max() + low.rolling(senkou).min()) / 2).shift(kijun)
-    df['chikou_span'] = close.shift(-kijun)
+    tenkan_sen = (high.rolling(tenkan).max() + low.rolling(tenkan).min()) / 2
+    kijun_sen = (high.rolling(kijun).max() + low.rolling(kijun).min()) / 2
 
-    df = df.dropna(subset=['tenkan_sen', 'kijun_sen', 'senkou_span_a', 'senkou_span_b']).copy()
+    result = pd.DataFrame({
+        'Date': df['Date'],
+        'tenkan_sen': tenkan_sen,
+        'kijun_sen': kijun_sen,
+        'senkou_span_a': ((tenkan_sen + kijun_sen) / 2).shift(kijun),
+        'senkou_span_b': ((high.rolling(senkou).max() + low.rolling(senkou).min()) / 2).shift(kijun),
+        'chikou_span': close.shift(-kijun),
+    })
 
-    result = df[['Date', 'tenkan_sen', 'kijun_sen',
-                 'senkou_span_a', 'senkou_span_b', 'chikou_span']]
+    result = result.dropna(subset=['tenkan_sen', 'kijun_sen', 'senkou_span_a', 'senkou_span_b'])
 
     if plot:
         plot_indicator(result, f"Ichimoku ({tenkan}-{kijun}-{senkou})")
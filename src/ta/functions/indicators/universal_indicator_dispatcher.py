@@ -1,60 +1,327 @@
 # === External libraries ===
+import numpy as np
 import pandas as pd
 
 from .trend_indicators import *
 from .momentum_indicators import *
 from .volatility_indicators import *
+from . import kernels
+from .indicator_cache import canonical_kwargs, dataset_fingerprint, get_indicator_cache, known_fingerprint
+from .range_index import extremum_index
+from .moment_index import moment_index
+from .ema_provider import ema_provider
+from .precision import as_output, as_output_frame, get_precision
+from .registry import IndicatorSpec, get_indicator, register_indicator
+from src.ta.data.ohlcv import as_frame
 
 
-#df here is from corresponding indicator. eg: df = Date, adx 
-def calculate_indicator(df: pd.DataFrame, type: str, plot: bool = False, **kwargs) -> pd.DataFrame:
-    type = type.lower()
+# ============================================================
+# Backend selection
+# ============================================================
+# "numba"  -> compiled array kernels (kernels.py), input frame is never touched
+# "pandas" -> the original finta/pandas calculate_* functions (reference path)
+INDICATOR_BACKENDS = ("numba", "pandas")
+_indicator_backend = "numba"
 
-    if type == 'rsi':
-        return calculate_rsi(df, plot=plot, period=kwargs.get('period', 14))
 
-    elif type == 'williams':
-        return calculate_williams(df, plot=plot, period=kwargs.get('period', 14))
+def set_indicator_backend(backend: str) -> None:
+    """Select the default backend used by calculate_indicator ('numba' or 'pandas')."""
+    global _indicator_backend
+    backend = backend.lower()
+    if backend not in INDICATOR_BACKENDS:
+        raise ValueError(f"Unsupported indicator backend: {backend}")
+    _indicator_backend = backend
 
-    elif type == 'ma':
-        return calculate_ma(df, plot=plot, period=kwargs.get('period', 14))
 
-    elif type == 'ema':
-        return calculate_ema(df, plot=plot, period=kwargs.get('period', 14))
+def get_indicator_backend() -> str:
+    return _indicator_backend
 
-    elif type == 'ema_ribbon':
-        return calculate_ema_ribbon(df,plot=plot,periods=kwargs.get('periods', [8, 13, 21, 34, 55, 89, 144, 233]))
 
-    elif type == 'ema_crossover':
-        return calculate_ema_crossover(df,plot=plot,fast=kwargs.get('fast', 9),slow=kwargs.get('slow', 21))
+#df here is from corresponding indicator. eg: df = Date, adx
+def calculate_indicator(df: pd.DataFrame, type: str, plot: bool = False, backend: str = None, **kwargs) -> pd.DataFrame:
+    spec = get_indicator(type)
+    backend = (backend or _indicator_backend).lower()
+    if backend not in INDICATOR_BACKENDS:
+        raise ValueError(f"Unsupported indicator backend: {backend}")
+    params = spec.resolve(kwargs)
 
-    elif type == 'macd':
-        return calculate_macd(df,plot=plot,fast=kwargs.get('fast', 12),slow=kwargs.get('slow', 26),signal=kwargs.get('signal', 9))
+    cache = get_indicator_cache()
+    if plot or not cache.enabled:
+        return spec.select(as_output_frame(_calculate_indicator(df, spec, params, plot, backend)), kwargs)
 
-    elif type == 'roc':
-        return calculate_roc(df, plot=plot, period=kwargs.get('period', 14))
-    
-    #why result = .... ????
-    elif type == 'stochrsi':
-        result = calculate_stochrsi(df,plot=plot,rsi_length=kwargs.get('rsi_length', 14),stoch_length=kwargs.get('stoch_length', 14),k=kwargs.get('k', 3),d=kwargs.get('d', 3))
-        line = kwargs.get('line', 'stochrsi_k')  # 'stochrsi_k' or 'stochrsi_d'
-        return result[['Date', line]]
+    # kwargs outside the indicator's schema (e.g. period= for macd) and the selected
+    # line of a multi-output indicator do not change the computation, so not the key
+    try:
+        key = (dataset_fingerprint(df), spec.name, canonical_kwargs(params), backend, get_precision())
+        hash(key)
+    except TypeError:
+        return spec.select(as_output_frame(_calculate_indicator(df, spec, params, plot, backend)), kwargs)
 
-    elif type == 'adx':
-        result = calculate_adx(df, plot=plot, period=kwargs.get('period', 14))
-        return result[['Date', 'adx']]
+    result = cache.get(key)
+    if result is None:
+        # the dataset registries (extremum / moment / EMA) key on the same fingerprint: hash the frame once
+        with known_fingerprint(df, key[0]):
+            result = as_output_frame(_calculate_indicator(df, spec, params, plot, backend))
+        cache.put(key, result)
 
-    elif type == 'ichimoku':
-        return calculate_ichimoku(df,plot=plot,tenkan=kwargs.get('tenkan', 9),kijun=kwargs.get('kijun', 26),senkou=kwargs.get('senkou', 52))
+    # shallow copy / line selection: callers may add or rename columns without touching the cached frame
+    return spec.select(result, kwargs)
 
-    elif type == 'bbands':
-        return calculate_bbands(df,plot=plot,period=kwargs.get('period', 20),std=kwargs.get('std_dev', 2))
 
-    elif type == 'atr':
-        return calculate_atr(df, plot=plot, period=kwargs.get('period', 14))
+def _calculate_indicator(df: pd.DataFrame, spec: IndicatorSpec, params: dict, plot: bool, backend: str) -> pd.DataFrame:
+    # plotting stays on the reference path, which owns the chart titles
+    if backend == "numba" and not plot:
+        return spec.kernel(df, **params)
 
-    elif type == 'donchian':
-        return calculate_donchian(df, plot=plot, period=kwargs.get('period', 20))
+    # finta needs a real DataFrame; an OHLCV container is unwrapped into a private copy
+    return spec.reference(as_frame(df), plot, params)
 
-    else:
-        raise ValueError(f"Unsupported indicator type: {type}")
+
+# ============================================================
+# Kernel path
+# ============================================================
+def _price_array(df: pd.DataFrame, col: str) -> np.ndarray:
+    return np.ascontiguousarray(df[col].to_numpy(dtype=np.float64))
+
+
+def _scalar(x):
+    # same list-tolerance as calculate_stochrsi
+    if isinstance(x, (list, tuple, set)):
+        return list(x)[0]
+    return x
+
+
+def _kernel_frame(df: pd.DataFrame, columns: dict, valid: np.ndarray) -> pd.DataFrame:
+    """Wrap kernel outputs into the ['Date', <cols>] frame the pandas path returns."""
+    result = pd.DataFrame({"Date": df["Date"].to_numpy()[valid]}, index=df.index[valid])
+    for name, values in columns.items():
+        result[name] = as_output(values[valid])
+    return result
+
+
+def _after_warmup(n: int, period: int) -> np.ndarray:
+    # the pandas path masks df.index < period (RangeIndex frames from fetch_asset)
+    return np.arange(n) >= period
+
+
+def _line_frame(df, name, values, masked_below=None):
+    valid = ~np.isnan(values)
+    if masked_below is not None:
+        valid &= _after_warmup(len(values), masked_below)
+    return _kernel_frame(df, {name: values}, valid)
+
+
+def _calculate_indicator_kernel(df: pd.DataFrame, type: str, **kwargs) -> pd.DataFrame:
+    """Kernel-path frame of one indicator, with the same line selection as calculate_indicator."""
+    spec = get_indicator(type)
+    return spec.select(spec.kernel(df, **spec.resolve(kwargs)), kwargs)
+
+
+def _rsi_kernel(df, period):
+    return _line_frame(df, "rsi", kernels.rsi(_price_array(df, "close"), int(period)), int(period))
+
+
+def _williams_kernel(df, period):
+    return _line_frame(df, "williams", _williams(extremum_index(df), _price_array(df, "close"), int(period)))
+
+
+def _roc_kernel(df, period):
+    return _line_frame(df, "roc", kernels.roc(_price_array(df, "close"), int(period)))
+
+
+def _stochrsi_kernel(df, rsi_length, stoch_length, k, d):
+    k_line, d_line = _stochrsi(
+        extremum_index(df),
+        _price_array(df, "close"),
+        int(_scalar(rsi_length)),
+        int(_scalar(stoch_length)),
+        _scalar(k),
+        _scalar(d),
+    )
+    valid = ~(np.isnan(k_line) | np.isnan(d_line))
+    return _kernel_frame(df, {"stochrsi_k": k_line, "stochrsi_d": d_line}, valid)
+
+
+def _ma_kernel(df, period):
+    return _line_frame(df, "ma", moment_index(df).mean(int(period)), int(period))
+
+
+def _ema_kernel(df, period):
+    return _line_frame(df, "ema", ema_provider(df).ema(period), int(period))
+
+
+def _ema_ribbon_kernel(df, periods):
+    ribbon = ema_provider(df).emas(periods)
+    columns = {f'ema_{p}': ribbon[:, j] for j, p in enumerate(periods)}
+    valid = ~np.isnan(columns[f'ema_{max(periods)}'])
+    return _kernel_frame(df, columns, valid)
+
+
+def _ema_crossover_kernel(df, fast, slow):
+    ema_fast, ema_slow = ema_provider(df).ema(fast), ema_provider(df).ema(slow)
+    ema_signal = np.where(ema_fast > ema_slow, 1, np.where(ema_fast < ema_slow, -1, 0))
+    valid = ~(np.isnan(ema_fast) | np.isnan(ema_slow))
+    return _kernel_frame(df, {'ema_fast': ema_fast, 'ema_slow': ema_slow, 'ema_signal': ema_signal}, valid)
+
+
+def _macd_kernel(df, fast, slow, signal):
+    emas = ema_provider(df)
+    ema_fast, ema_slow = emas.ema(fast), emas.ema(slow)
+    line = ema_fast - ema_slow
+    sig = kernels.ewm_mean(line, kernels.span_alpha(signal), False)
+    return _kernel_frame(df, {'macd': line, 'signal': sig, 'ema_fast': ema_fast, 'ema_slow': ema_slow}, np.ones(len(line), dtype=bool))
+
+
+def _adx_kernel(df, period):
+    values = kernels.adx(_price_array(df, "high"), _price_array(df, "low"), _price_array(df, "close"), int(period))
+    return _line_frame(df, "adx", values, int(period))
+
+
+def _ichimoku_kernel(df, tenkan, kijun, senkou):
+    parts = _ichimoku(extremum_index(df), _price_array(df, "close"), tenkan, kijun, senkou)
+    names = ['tenkan_sen', 'kijun_sen', 'senkou_span_a', 'senkou_span_b', 'chikou_span']
+    valid = ~(np.isnan(parts[0]) | np.isnan(parts[1]) | np.isnan(parts[2]) | np.isnan(parts[3]))
+    return _kernel_frame(df, dict(zip(names, parts)), valid)
+
+
+def _bbands_kernel(df, period, std_dev):
+    lower, mid, upper = (band[:, 0] for band in moment_index(df).bands([(period, std_dev)]))
+    valid = ~(np.isnan(lower) | np.isnan(mid) | np.isnan(upper))
+    return _kernel_frame(df, {'bb_lower': lower, 'bb_mid': mid, 'bb_upper': upper}, valid)
+
+
+def _atr_kernel(df, period):
+    values = kernels.atr(_price_array(df, "high"), _price_array(df, "low"), _price_array(df, "close"), int(period))
+    return _line_frame(df, "atr", values, int(period))
+
+
+def _donchian_kernel(df, period):
+    lower, mid, upper = _donchian(extremum_index(df), period)
+    return _kernel_frame(df, {'donchian_lower': lower, 'donchian_mid': mid, 'donchian_upper': upper}, ~np.isnan(upper))
+
+
+# ============================================================
+# Range-extremum indicators (windows drawn from the dataset's ExtremumIndex)
+# ============================================================
+def _midpoint(index, window):
+    return (index.rolling_max("high", window) + index.rolling_min("low", window)) / 2.0
+
+
+def _williams(index, close, period):
+    hh, ll = index.rolling_max("high", period), index.rolling_min("low", period)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return -100.0 * ((hh - close) / (hh - ll))
+
+
+def _donchian(index, period):
+    upper, lower = index.rolling_max("high", period), index.rolling_min("low", period)
+    return lower, (upper + lower) / 2.0, upper
+
+
+def _ichimoku(index, close, tenkan, kijun, senkou):
+    tenkan_sen = _midpoint(index, tenkan)
+    kijun_sen = _midpoint(index, kijun)
+    span_a = kernels.shift((tenkan_sen + kijun_sen) / 2.0, kijun)
+    span_b = kernels.shift(_midpoint(index, senkou), kijun)
+    return tenkan_sen, kijun_sen, span_a, span_b, kernels.shift(close, -kijun)
+
+
+def _stochrsi_k(index, close, rsi_length, stoch_length, k):
+    key = ("rsi", rsi_length)
+    r = index.series(key, lambda: kernels.rsi(close, rsi_length))
+    lo, hi = index.rolling_min(key, stoch_length), index.rolling_max(key, stoch_length)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return kernels.ewm_mean((r - lo) / (hi - lo), kernels.span_alpha(k), False)
+
+
+def _stochrsi(index, close, rsi_length, stoch_length, k, d):
+    k_line = _stochrsi_k(index, close, rsi_length, stoch_length, k)
+    return k_line, kernels.ewm_mean(k_line, kernels.span_alpha(d), False)
+
+
+# ============================================================
+# Indicator registry
+# ============================================================
+# warmup: leading bars without output on a clean series (first frame row)
+# lookback: bars one output depends on; None for ewm-based (recursive) indicators
+
+# --- Momentum ---
+register_indicator(IndicatorSpec(
+    "rsi", "momentum", calculate_rsi, _rsi_kernel,
+    params=(("period", 14),), outputs=("rsi",),
+    warmup=lambda p: max(p["period"], 1), masked=True,
+))
+register_indicator(IndicatorSpec(
+    "williams", "momentum", calculate_williams, _williams_kernel,
+    params=(("period", 14),), outputs=("williams",),
+    warmup=lambda p: p["period"] - 1, lookback=lambda p: p["period"] - 1,
+))
+register_indicator(IndicatorSpec(
+    "roc", "momentum", calculate_roc, _roc_kernel,
+    params=(("period", 14),), outputs=("roc",),
+    warmup=lambda p: p["period"], lookback=lambda p: p["period"],
+))
+register_indicator(IndicatorSpec(
+    "stochrsi", "momentum", calculate_stochrsi, _stochrsi_kernel,
+    params=(("rsi_length", 14), ("stoch_length", 14), ("k", 3), ("d", 3)),
+    outputs=("stochrsi_k", "stochrsi_d"),
+    warmup=lambda p: _scalar(p["stoch_length"]), select_line=True,
+))
+
+# --- Trend ---
+register_indicator(IndicatorSpec(
+    "ma", "trend", calculate_ma, _ma_kernel,
+    params=(("period", 14),), outputs=("ma",),
+    warmup=lambda p: p["period"], lookback=lambda p: p["period"] - 1, masked=True,
+))
+register_indicator(IndicatorSpec(
+    "ema", "trend", calculate_ema, _ema_kernel,
+    params=(("period", 14),), outputs=("ema",),
+    warmup=lambda p: p["period"], masked=True,
+))
+register_indicator(IndicatorSpec(
+    "ema_ribbon", "trend", calculate_ema_ribbon, _ema_ribbon_kernel,
+    params=(("periods", (8, 13, 21, 34, 55, 89, 144, 233)),),
+    outputs=lambda p: tuple(f"ema_{x}" for x in p["periods"]),
+    warmup=lambda p: 0,
+))
+register_indicator(IndicatorSpec(
+    "ema_crossover", "trend", calculate_ema_crossover, _ema_crossover_kernel,
+    params=(("fast", 9), ("slow", 21)), outputs=("ema_fast", "ema_slow", "ema_signal"),
+    warmup=lambda p: 0,
+))
+register_indicator(IndicatorSpec(
+    "macd", "trend", calculate_macd, _macd_kernel,
+    params=(("fast", 12), ("slow", 26), ("signal", 9)), outputs=("macd", "signal", "ema_fast", "ema_slow"),
+    warmup=lambda p: 0,
+))
+register_indicator(IndicatorSpec(
+    "adx", "trend", calculate_adx, _adx_kernel,
+    params=(("period", 14),), outputs=("adx",),
+    warmup=lambda p: p["period"], masked=True,
+))
+register_indicator(IndicatorSpec(
+    "ichimoku", "trend", calculate_ichimoku, _ichimoku_kernel,
+    params=(("tenkan", 9), ("kijun", 26), ("senkou", 52)),
+    outputs=("tenkan_sen", "kijun_sen", "senkou_span_a", "senkou_span_b", "chikou_span"),
+    warmup=lambda p: max(p["tenkan"], p["kijun"], p["senkou"]) - 1 + p["kijun"],
+    lookback=lambda p: max(p["tenkan"], p["kijun"], p["senkou"]) - 1 + p["kijun"],
+))
+
+# --- Volatility ---
+register_indicator(IndicatorSpec(
+    "bbands", "volatility", calculate_bbands, _bbands_kernel,
+    params=(("period", 20), ("std_dev", 2)), outputs=("bb_lower", "bb_mid", "bb_upper"),
+    warmup=lambda p: p["period"] - 1, lookback=lambda p: p["period"] - 1,
+    func_kwargs={"std_dev": "std"},
+))
+register_indicator(IndicatorSpec(
+    "atr", "volatility", calculate_atr, _atr_kernel,
+    params=(("period", 14),), outputs=("atr",),
+    warmup=lambda p: p["period"], lookback=lambda p: p["period"], masked=True,
+))
+register_indicator(IndicatorSpec(
+    "donchian", "volatility", calculate_donchian, _donchian_kernel,
+    params=(("period", 20),), outputs=("donchian_lower", "donchian_mid", "donchian_upper"),
+    warmup=lambda p: p["period"] - 1, lookback=lambda p: p["period"] - 1,
+))
@@ -1,7 +1,100 @@
+import json
+from dataclasses import dataclass, field
+from typing import Callable
+
 import pandas as pd
 from src.ta.functions.indicators.threshold_functions import *
 from src.ta.functions.indicators.universal_indicator_dispatcher import *
 
+
+# ======================================================
+# Dynamic thresholds — searchable types
+# ======================================================
+# Each dynamic threshold declares its tunable parameters (the keys of a search
+# space / config, with defaults), which of them fix its expensive state
+# (shared: EMA, rolling std, rolling moments, derivatives), and a batched
+# evaluator that runs every config of one shared state together.
+@dataclass(frozen=True)
+class ThresholdSpec:
+    name: str
+    func: Callable                    # (df, **kwargs) -> SignalSet | (a, b)
+    params: tuple                     # (("window", 20), ...)
+    shared: tuple                     # params every config of a batch has in common
+    batch: Callable                   # (df, shared kwargs, [kwargs]) -> [func outputs]
+    wd: bool = False                  # func takes wd (then part of the shared state)
+    sides: tuple = None               # (buy, sell) index into a pair output
+    names: tuple = field(init=False)
+
+    def __post_init__(self):
+        object.__setattr__(self, "names", tuple(n for n, _ in self.params))
+
+    def kwargs(self, cfg: dict) -> dict:
+        kwargs = {name: cfg.get(name, default) for name, default in self.params}
+        if self.wd:
+            kwargs["wd"] = cfg.get("wd", 0)
+        return kwargs
+
+    def key(self, cfg: dict) -> str:
+        """Identity of the shared state of a config."""
+        kwargs = self.kwargs(cfg)
+        shared = [kwargs[n] for n in self.shared] + ([kwargs["wd"]] if self.wd else [])
+        return json.dumps(shared, sort_keys=True, default=str)
+
+    def side(self, out, cfg: dict):
+        if self.sides is None:
+            return out
+        return out[self.sides[bool(cfg.get("sell", False))]]
+
+    def run(self, df, cfg: dict):
+        return self.side(self.func(df, **self.kwargs(cfg)), cfg)
+
+    def run_batch(self, df, cfgs: list) -> list:
+        """Signals of every config (all with the same key), sharing their expensive state."""
+        kwargs = [self.kwargs(c) for c in cfgs]
+        shared = {n: kwargs[0][n] for n in self.shared}
+        if self.wd:
+            shared["wd"] = kwargs[0]["wd"]
+        return [self.side(out, c) for out, c in zip(self.batch(df, shared, kwargs), cfgs)]
+
+
+def _batch_stdv_bands(df, shared, kwargs):
+    sigmas = [kw["sigma"] for kw in kwargs]
+    s_above, s_below = stdvBandsThresholds(df, sigma=sigmas, **shared)
+    return list(zip(s_above, s_below))
+
+def _batch_kurtosis(df, shared, kwargs):
+    return kurtosisThresholds(df, k_range=[kw["k_range"] for kw in kwargs], **shared)
+
+def _batch_skew(df, shared, kwargs):
+    return skewThresholds(df, s_range=[kw["s_range"] for kw in kwargs], **shared)
+
+def _batch_stdv_kurtosis(df, shared, kwargs):
+    return stdvKurtosisThresholds(df, params=[(kw["sig"], kw["delta_k"], kw["n"]) for kw in kwargs], **shared)
+
+def _batch_derivative(df, shared, kwargs):
+    bounds = [(kw["lower"], kw["upper"], kw["lower2"], kw["upper2"]) for kw in kwargs]
+    return derivativeThresholds(df, bounds=bounds, **shared)
+
+
+DYNAMIC_THRESHOLDS = {spec.name: spec for spec in (
+    ThresholdSpec("stdvBandsThreshold", stdvBandsThreshold,
+                  params=(("ema_period", 10), ("window", 50), ("sigma", 0.8)),
+                  shared=("ema_period", "window"), batch=_batch_stdv_bands, wd=True, sides=(1, 0)),
+    ThresholdSpec("kurtosisThreshold", kurtosisThreshold,
+                  params=(("window", 20), ("k_range", (-2.0, 1.0)), ("label", "trigger_active")),
+                  shared=("window", "label"), batch=_batch_kurtosis),
+    ThresholdSpec("skewThreshold", skewThreshold,
+                  params=(("window", 20), ("s_range", (-2.0, 1.0)), ("label", "trigger_active")),
+                  shared=("window", "label"), batch=_batch_skew),
+    ThresholdSpec("stdvKurtosisThreshold", stdvKurtosisThreshold,
+                  params=(("ema_p", 20), ("window", 20), ("sig", 1.5), ("k_win", 50), ("delta_k", 0.5), ("n", 5)),
+                  shared=("ema_p", "window", "k_win"), batch=_batch_stdv_kurtosis, sides=(0, 1)),
+    ThresholdSpec("derivativeThreshold", derivativeThreshold,
+                  params=(("k", 40), ("alpha", 1.0), ("derivatives", "first"), ("lower", -0.001), ("upper", 0.001),
+                          ("lower2", -0.001), ("upper2", 0.001), ("scale", True)),
+                  shared=("k", "alpha", "derivatives", "scale"), batch=_batch_derivative, wd=True),
+)}
+
 # === (Keep existing run_threshold and helper functions) ===
 def run_threshold(df, cfg):
     # ... (Same as previous version) ...
@@ -15,19 +108,35 @@ def run_threshold(df, cfg):
         return inRangeThreshold(df, type=cfg["indicator"], period=cfg["period"][0] if isinstance(cfg["period"], list) else cfg["period"], lower=cfg["lower"][0] if isinstance(cfg["lower"], list) else cfg["lower"], upper=cfg["upper"][0] if isinstance(cfg["upper"], list) else cfg["upper"], **cfg.get("indicator_params", {}))
     elif t == "timeThreshold":
         return timeThreshold(df, type=cfg["indicator"], period=cfg["period"][0] if isinstance(cfg["period"], list) else cfg["period"], level=cfg["threshold"][0] if isinstance(cfg["threshold"], list) else cfg["threshold"], direction=cfg["direction"][0] if isinstance(cfg["direction"], list) else cfg["direction"], min_candles=cfg["min_candles"][0] if isinstance(cfg["min_candles"], list) else cfg["min_candles"], wd=cfg.get("wd", 0), **cfg.get("indicator_params", {}))
+    elif t in DYNAMIC_THRESHOLDS:
+        # stdvBands / stdvKurtosis: buy on the lower-band side, sell (cfg["sell"]) on the upper one
+        return DYNAMIC_THRESHOLDS[t].run(df, cfg)
     else: raise ValueError(f"Unknown: {t}")
 
 # ======================================================
 # mixThresholds — MASTER DISPATCHER
 # ======================================================
-def mixThresholds(df, configs, mode="and", search="grid"):
+def mixThresholds(df, configs, mode="and", search="grid", within=0, top_k=None, min_signals=1, sampler="uniform", seed=None,
+                  n_iter=300, n_jobs=-1, batch_size=8):
     """
     Routes to the correct Combinatorial Search engine.
+
+    mode: "and", "or", "and_not" (first block minus the others), an int k
+    (signals of at least k blocks), "within" (every block fired in the last
+    `within` bars) or "then" (blocks fire in order, each 1..`within` bars
+    after the previous; needs within >= 1). A list of `within` values is
+    searched over.
+    top_k (grid only) streams the combinations and keeps the best top_k.
+    search="branch_and_bound" (AND only) prunes combinations under min_signals.
+    sampler picks the random search's sampler ("uniform", "sobol", "halton", "lhs").
+    n_iter / seed go to the random and bayesian searches; n_jobs / batch_size
+    to the bayesian one.
     """
     from src.ta.ml.optimizers.search import (
         combinatorialGridSearch,
         combinatorialRandomSearch,
-        combinatorialBayesianSearch
+        combinatorialBayesianSearch,
+        combinatorialBranchAndBound
     )
 
     # If it's a list of blocks, we assume Combinatorial Logic is desired.
@@ -35,15 +144,22 @@ def mixThresholds(df, configs, mode="and", search="grid"):
     
     if search == "grid":
         print("🚀 Dispatching to Combinatorial GRID Search...")
-        return combinatorialGridSearch(df, configs, mode=mode)
+        return combinatorialGridSearch(df, configs, mode=mode, within=within, top_k=top_k)
     
     elif search == "random":
         print("🚀 Dispatching to Combinatorial RANDOM Search...")
-        return combinatorialRandomSearch(df, configs, n_iter=300, mode=mode)
+        return combinatorialRandomSearch(df, configs, n_iter=n_iter, mode=mode, within=within, sampler=sampler, seed=seed)
         
     elif search == "bayesian":
         print("🚀 Dispatching to Combinatorial BAYESIAN Search...")
-        return combinatorialBayesianSearch(df, configs, n_iter=300, mode=mode)
+        return combinatorialBayesianSearch(df, configs, n_iter=n_iter, mode=mode, within=within,
+                                           n_jobs=n_jobs, batch_size=batch_size, seed=seed)
         
+    elif search == "branch_and_bound":
+        if mode != "and":
+            raise ValueError("branch_and_bound search only supports mode='and'")
+        print("🚀 Dispatching to Combinatorial BRANCH & BOUND Search...")
+        return combinatorialBranchAndBound(df, configs, min_signals=min_signals, top_k=top_k)
+
     else:
         raise ValueError(f"Unknown search type: {search}")
\ No newline at end of file
@@ -11,13 +11,14 @@ def calculate_bbands(df: pd.DataFrame, plot: bool = False, period: int = 20, std
     ma = df['close'].rolling(window=period).mean()
     std_dev = df['close'].rolling(window=period).std()
 
-    df['bb_mid'] = ma
-    df['bb_upper'] = ma + std * std_dev
-    df['bb_lower'] = ma - std * std_dev
+    result = pd.DataFrame({
+        'Date': df['Date'],
+        'bb_lower': ma - std * std_dev,
+        'bb_mid': ma,
+        'bb_upper': ma + std * std_dev,
+    })
 
-    df = df.dropna(subset=['bb_mid', 'bb_upper', 'bb_lower']).copy()
-
-    result = df[['Date', 'bb_lower', 'bb_mid', 'bb_upper']]
+    result = result.dropna(subset=['bb_mid', 'bb_upper', 'bb_lower'])
 
     if plot:
         plot_indicator(result, f"Bollinger Bands (Period={period}, Std={std})")
@@ -29,11 +30,8 @@ def calculate_bbands(df: pd.DataFrame, plot: bool = False, period: int = 20, std
 # ATR — Average True Range
 # ============================================================
 def calculate_atr(df: pd.DataFrame, plot: bool = False, period: int = 14) -> pd.DataFrame:
-    df['atr'] = TA.ATR(df, period)
-    df['atr'] = df['atr'].mask(df.index < period)
-    df = df.dropna(subset=['atr']).copy()
-
-    result = df[['Date', 'atr']]
+    atr = TA.ATR(df, period).mask(df.index < period)
+    result = pd.DataFrame({'Date': df['Date'], 'atr': atr}).dropna(subset=['atr'])
 
     if plot:
         plot_indicator(result, f"ATR ({period})")
@@ -45,13 +43,17 @@ def calculate_atr(df: pd.DataFrame, plot: bool = False, period: int = 14) -> pd.
 # Donchian Channel
 # ============================================================
 def calculate_donchian(df: pd.DataFrame, plot: bool = False, period: int = 20) -> pd.DataFrame:
-    df['donchian_upper'] = df['high'].rolling(window=period).max()
-    df['donchian_lower'] = df['low'].rolling(window=period).min()
-    df['donchian_mid'] = (df['donchian_upper'] + df['donchian_lower']) / 2
+    upper = df['high'].rolling(window=period).max()
+    lower = df['low'].rolling(window=period).min()
 
-    df = df.dropna(subset=['donchian_upper']).copy()
+    result = pd.DataFrame({
+        'Date': df['Date'],
+        'donchian_lower': lower,
+        'donchian_mid': (upper + lower) / 2,
+        'donchian_upper': upper,
+    })
 
-    result = df[['Date', 'donchian_lower', 'donchian_mid', 'donchian_upper']]
+    result = result.dropna(subset=['donchian_upper'])
 
     if plot:
         plot_indicator(result, f"Donchian Channel ({period})")
@@ -3,6 +3,7 @@ import pandas as pd
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 from src.ta.functions.indicators.threshold_functions import skewThreshold,kurtosisThreshold
+from src.ta.functions.indicators.moment_index import moment_index
 
 def plot_price_skew_kurt(df,window=20,skew_range=(-2.0, 1.0),kurt_range=(6.0, 6.0),use_log=True,log_returns=True):
 
@@ -20,18 +21,17 @@ def plot_price_skew_kurt(df,window=20,skew_range=(-2.0, 1.0),kurt_range=(6.0, 6.
     # ---------------------------------
     # USE YOUR THRESHOLD FUNCTIONS
     # ---------------------------------
-    skew_df = skewThreshold(df.copy(),window=window,s_range=skew_range)
+    skew_df = skewThreshold(df,window=window,s_range=skew_range)
 
-    kurt_df = kurtosisThreshold(df.copy(),window=window,k_range=kurt_range)
+    kurt_df = kurtosisThreshold(df,window=window,k_range=kurt_range)
 
     # ---------------------------------
-    # Recompute FULL series using SAME logic
+    # FULL series from the same moments engine the thresholds used
     # (needed because threshold returns only filtered rows)
     # ---------------------------------
-    df_temp['returns'] = np.log(df_temp['close'] / df_temp['close'].shift(1))
-
-    df_temp['skew'] = df_temp['returns'].rolling(window=window).skew()
-    df_temp['kurt'] = df_temp['returns'].rolling(window=window).kurt()
+    _, _, skew, kurt = moment_index(df, returns="log").higher_moments([window])
+    df_temp['skew'] = skew[:, 0]
+    df_temp['kurt'] = kurt[:, 0]
 
     price = np.log(df_temp['close']) if use_log else df_temp['close']
 
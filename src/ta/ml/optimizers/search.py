@@ -1,3 +1,4 @@
+import heapq
 import itertools
 import pandas as pd
 import random
@@ -13,13 +14,29 @@ except:
 from matplotlib.backends.backend_pdf import PdfPages
 import matplotlib.pyplot as plt
 import gc
+import functools
 import json
+import math
+import numbers
+import os
+import shutil
+import tempfile
+from collections import Counter
+from dataclasses import dataclass
 
 from tqdm.auto import tqdm # auto-selects notebook or terminal style
 
 
 # === CRITICAL IMPORT ===
-from src.ta.functions.indicators.universal_threshold_dispatcher import run_threshold
+from src.ta.functions.indicators.universal_threshold_dispatcher import DYNAMIC_THRESHOLDS, run_threshold
+from src.ta.functions.indicators.indicator_bank import BANK_PARAMS, indicator_bank
+from src.ta.functions.indicators.threshold_functions import _cross_hits, _cross_signals, _indicator_rows, _range_signals, _time_signals
+from src.ta.functions.indicators.signal_filters import min_gap_filter
+from src.ta.functions.indicators.level_index import LevelIndex
+from src.ta.functions.indicators.signal_set import SignalSet, bind_signals, co_occur, in_sequence, k_of_n
+from src.ta.functions.indicators.bitset import bits_and, bits_andnot, bits_or, popcount
+from src.ta.data.ohlcv import as_ohlcv
+from src.ta.ml.optimizers.search_space import SearchSpace, sample_digits
 
 optuna.logging.set_verbosity(optuna.logging.WARNING)
 
@@ -30,11 +47,356 @@ def evaluate_config(df, cfg):
     try:
         signals = run_threshold(df, cfg)
         if signals.empty:
-            return {"config": cfg, "signals": 0, "score": 0, "signals_df": pd.DataFrame()}
+            return {"config": cfg, "signals": 0, "score": 0, "signals_df": SignalSet.none(df)}
         count = len(signals)
         return {"config": cfg, "signals": count, "score": count, "signals_df": signals}
     except:
-        return {"config": cfg, "signals": 0, "score": 0, "signals_df": pd.DataFrame()}
+        return {"config": cfg, "signals": 0, "score": 0, "signals_df": SignalSet.none(df)}
+
+# ============================================================
+# HELPER: Batched Evaluation (indicator banks)
+# ============================================================
+# kwargs that would collide with crossUpThreshold's own arguments; such configs
+# keep going through run_threshold so they fail (and score 0) exactly as before
+_RESERVED_KWARGS = {"df", "type", "thr", "period", "wd", "sell", "plot", "backend"}
+
+def _bank_key(cfg):
+    """Configs with the same key share one IndicatorBank (they differ only in period/thr/wd/sell)."""
+    if cfg.get("type") != "crossUpThreshold" or "thr" not in cfg or isinstance(cfg.get("period"), list):
+        return None
+    ind_params = cfg.get("indicator_params", {})
+    if str(cfg.get("indicator", "")).lower() not in BANK_PARAMS or set(ind_params) & _RESERVED_KWARGS:
+        return None
+    return (cfg["type"], cfg["indicator"].lower(), json.dumps(ind_params, sort_keys=True, default=str))
+
+# timeThreshold kwargs that collide with its own arguments
+_TIME_RESERVED_KWARGS = {"df", "type", "period", "level", "direction", "min_candles", "wd", "plot", "backend"}
+
+def _time_key(cfg):
+    """timeThreshold configs with the same key share one indicator line (they differ in threshold/min_candles/direction/wd)."""
+    ind_params = cfg.get("indicator_params", {})
+    if not isinstance(cfg.get("indicator"), str) or set(ind_params) & _TIME_RESERVED_KWARGS:
+        return None
+    return (cfg["type"], cfg["indicator"].lower(), json.dumps([cfg.get("period"), ind_params], sort_keys=True, default=str))
+
+def _range_key(cfg):
+    """inRangeThreshold configs with the same key share one sorted indicator line (they differ in lower/upper)."""
+    # run_threshold passes indicator_params as keywords inRangeThreshold does not take: those configs fail alone
+    if not isinstance(cfg.get("indicator"), str) or cfg.get("indicator_params"):
+        return None
+    return (cfg["type"], cfg["indicator"].lower(), json.dumps(cfg.get("period"), default=str))
+
+def _dynamic_key(cfg):
+    """Dynamic-threshold configs with the same key share their EMA / rolling moments / derivatives."""
+    spec = DYNAMIC_THRESHOLDS[cfg["type"]]
+    return (cfg["type"], spec.key(cfg))
+
+_BATCH_KEYS = {"crossUpThreshold": _bank_key, "timeThreshold": _time_key, "inRangeThreshold": _range_key,
+               **{name: _dynamic_key for name in DYNAMIC_THRESHOLDS}}
+
+def _batch_key(cfg):
+    """Configs with the same key are evaluated together by evaluate_config_batch (None: alone)."""
+    key = _BATCH_KEYS.get(cfg.get("type"))
+    return key(cfg) if key is not None else None
+
+def _first(v):
+    # run_threshold's convention: a list parameter means its first value
+    return v[0] if isinstance(v, list) else v
+
+def evaluate_config_batch(df, configs):
+    """
+    Evaluates a group of configs sharing one _batch_key.
+
+    crossUpThreshold: the indicator is computed once for every period in the
+    group, and the crossings of every thr on a column are found in one pass.
+    timeThreshold: one run-length encoding of the indicator answers every
+    threshold / min_candles pair.
+    inRangeThreshold: the indicator is sorted once; every (lower, upper) pair is
+    counted by binary search and only pairs with signals are materialized.
+    Dynamic thresholds: the spec's batched evaluator shares the expensive state.
+    """
+    key = _batch_key(configs[0])
+    if key is None:
+        return [evaluate_config(df, c) for c in configs]
+    if key[0] == "timeThreshold":
+        return _evaluate_time_batch(df, configs)
+    if key[0] == "inRangeThreshold":
+        return _evaluate_range_batch(df, configs)
+    if key[0] in DYNAMIC_THRESHOLDS:
+        try:
+            signals = DYNAMIC_THRESHOLDS[key[0]].run_batch(df, configs)
+        except Exception:
+            return [evaluate_config(df, c) for c in configs]
+        return [_scored(df, c, s) for c, s in zip(configs, signals)]
+    try:
+        indicator = key[1]
+        ind_params = configs[0].get("indicator_params", {})
+        line = ind_params.get("line") if indicator == "stochrsi" else None
+        bank = indicator_bank(df, indicator, [dict(ind_params, period=c["period"]) for c in configs], line=line)
+    except Exception:
+        return [evaluate_config(df, c) for c in configs]
+
+    # configs on the same bank column and direction differ only in thr (and wd):
+    # all their crossings come from one pass over the thr vector
+    columns = {}
+    for j, cfg in enumerate(configs):
+        columns.setdefault((bank.params[j], bool(cfg.get("sell", False))), []).append(j)
+
+    results = [None] * len(configs)
+    raw = {}
+    for (_, sell), js in columns.items():
+        rows, values = bank.column(js[0])
+        try:
+            hits = _cross_hits(rows, values, [configs[j]["thr"] for j in js], sell=sell)
+        except Exception:
+            hits = [None] * len(js)
+        for j, hit in zip(js, hits):
+            if hit is not None:
+                raw[j] = SignalSet(hit, base=df)
+                continue
+            try:  # a thr that does not vectorize: evaluate it alone
+                cfg = configs[j]
+                results[j] = _scored(df, cfg, _cross_signals(df, rows, values, cfg["thr"], wd=cfg.get("wd", 0), sell=sell))
+            except Exception:
+                results[j] = _scored(df, configs[j], None)
+
+    # wd clustering: one batched min-gap pass per distinct wd
+    by_wd = {}
+    for j in raw:
+        try:
+            by_wd.setdefault(float(_real(configs[j].get("wd", 0))), []).append(j)
+        except TypeError:
+            results[j] = _scored(df, configs[j], None)
+    for wd, js in by_wd.items():
+        for j, signals in zip(js, min_gap_filter([raw[j] for j in js], wd, unit="D")):
+            results[j] = _scored(df, configs[j], signals)
+    return results
+
+def _evaluate_time_batch(df, configs):
+    cfg0 = configs[0]
+    try:
+        rows, values = _indicator_rows(df, cfg0["indicator"], _first(cfg0["period"]), cfg0.get("indicator_params", {}))
+    except Exception:
+        return [evaluate_config(df, c) for c in configs]
+
+    # one streak pass per (direction, wd); the levels and min_candles of the group are broadcast
+    groups = {}
+    for j, cfg in enumerate(configs):
+        try:
+            key = (_first(cfg["direction"]), _real(cfg.get("wd", 0)))
+            level, mc = _real(_first(cfg["threshold"])), _real(_first(cfg["min_candles"]))
+        except Exception:
+            key = None
+        groups.setdefault(key, []).append((j, level, mc) if key is not None else (j, None, None))
+
+    results = [None] * len(configs)
+    for key, members in groups.items():
+        try:
+            if key is None:
+                raise ValueError("config does not batch")
+            levels = sorted({level for _, level, _ in members})
+            mcs = sorted({mc for _, _, mc in members})
+            sets = _time_signals(df, rows, values, levels, key[0], mcs, wd=key[1])
+            for j, level, mc in members:
+                results[j] = _scored(df, configs[j], sets[levels.index(level)][mcs.index(mc)])
+        except Exception:
+            for j, _, _ in members:
+                results[j] = evaluate_config(df, configs[j])
+    return results
+
+def _evaluate_range_batch(df, configs):
+    try:
+        rows, values = _indicator_rows(df, configs[0]["indicator"], _first(configs[0]["period"]), {})
+        index = LevelIndex(values, rows)
+    except Exception:
+        return [evaluate_config(df, c) for c in configs]
+
+    results = []
+    for cfg in configs:
+        try:
+            lower, upper = _real(_first(cfg["lower"])), _real(_first(cfg["upper"]))
+        except Exception:
+            results.append(evaluate_config(df, cfg))
+            continue
+        results.append(_scored(df, cfg, _range_signals(index, lower, upper, df)))
+    return results
+
+def _real(v):
+    if not isinstance(v, numbers.Real):
+        raise TypeError(f"not a number: {v!r}")
+    return v
+
+def _scored(df, cfg, signals):
+    """Result dict of one config (signals=None: the config failed)."""
+    if signals is None or signals.empty:
+        return {"config": cfg, "signals": 0, "score": 0, "signals_df": SignalSet.none(df) if signals is None else signals}
+    count = len(signals)
+    return {"config": cfg, "signals": count, "score": count, "signals_df": signals}
+
+def evaluate_configs(df, configs, n_jobs=-1):
+    """Evaluates configs in parallel, one task per bank group; results keep the input order."""
+    groups = {}
+    for i, c in enumerate(configs):
+        key = _batch_key(c)
+        groups.setdefault(key if key is not None else ("single", i), []).append(i)
+
+    tasks = list(groups.values())
+    batches = Parallel(n_jobs=n_jobs)(delayed(evaluate_config_batch)(df, [configs[i] for i in idx]) for idx in tasks)
+
+    results = [None] * len(configs)
+    for idx, batch in zip(tasks, batches):
+        for i, r in zip(idx, batch):
+            results[i] = r
+    # worker processes return bare positions; point them back at this dataset
+    return bind_signals(results, df)
+
+# ============================================================
+# HELPER: Config DAG (planning)
+# ============================================================
+# A batch of configs is lowered to one DAG
+#
+#     data -> indicator -> comparison -> streak / cluster -> combine
+#
+# whose nodes are keyed by what they compute: configs (and combinations) that
+# ask for the same indicator line, the same crossings or the same min-gap pass
+# share one node, and configs asking the same item of a node (one thr of one
+# crossing pass, one level x min_candles of one streak pass) produce the same
+# signals. The DAG only plans: run() evaluates one config per distinct item
+# through evaluate_configs, whose batch groups already share the bank / line
+# of a group across the loky pool, and combines the signals here. It pays off
+# where configs repeat (combinatorial searches, Optuna batches); a plain grid
+# goes straight to evaluate_configs:
+#
+#     dag = compile_configs(df, configs)
+#     print(dag.summary())            # "120 configs -> 19 unique nodes (...)"
+#     results = dag.run().results()
+
+DAG_STAGES = ("data", "indicator", "comparison", "streak", "cluster", "combine")
+
+_node_key = json.JSONEncoder(sort_keys=True, default=str).encode   # canonical text of node parameters
+
+@dataclass(eq=False)
+class DAGNode:
+    key: tuple
+    stage: str           # one of DAG_STAGES
+    deps: tuple = ()
+    args: tuple = ()
+
+
+class ConfigDAG:
+    """
+    Configs of one dataset lowered to a de-duplicated node graph.
+
+    Parameters:
+        df (pd.DataFrame | OHLCV): Price data the configs run on
+    """
+
+    def __init__(self, df):
+        self.df = df
+        self.nodes = {}          # key -> DAGNode; insertion order is a topological order
+        self.requests = 0        # nodes asked for before de-duplication
+        self.configs = []        # (cfg, (node key, item)) per added config
+        self.combinations = []   # combine node key per added combination
+        self.values = {}         # (node key, item) or combine node key -> SignalSet, filled by run()
+        self._results = {}       # config index -> result dict of the configs run() evaluated
+
+    # --- lowering ---
+    def node(self, stage, key, deps=(), args=()):
+        """Key of the node computing `key`, created on first request."""
+        self.requests += 1
+        if key not in self.nodes:
+            self.nodes[key] = DAGNode(key, stage, tuple(deps), tuple(args))
+        return key
+
+    def add_config(self, cfg) -> int:
+        """Lowers one config; returns its index for signals()."""
+        try:
+            ref = self._lower(cfg)
+        except Exception:
+            ref = None
+        if ref is None:  # not batchable: the config is one opaque node
+            ref = (self.node("comparison", ("config", _node_key(cfg)), (self._data(),)), None)
+        self.configs.append((cfg, ref))
+        return len(self.configs) - 1
+
+    def add_combination(self, ids, mode="and", within=0) -> int:
+        """Combines the signals of added configs (see _combine_signals); returns its index for combination()."""
+        refs = [self.configs[i][1] for i in ids]
+        order = range(len(ids))
+        if mode not in ("and_not", "then"):   # the other modes do not depend on the order of the rules
+            order = sorted(order, key=lambda k: repr(refs[k]))
+        within = within if mode in TEMPORAL_MODES else 0
+        key = ("combine", mode, within, tuple(refs[k] for k in order))
+        deps = tuple(dict.fromkeys(ref[0] for ref in refs))
+        self.combinations.append(self.node("combine", key, deps, args=(mode, within, tuple(ids))))
+        return len(self.combinations) - 1
+
+    def _data(self):
+        return self.node("data", ("data",))
+
+    def _line(self, indicator, period, params):
+        return self.node("indicator", ("indicator", indicator.lower(), _node_key([period, params])), (self._data(),))
+
+    def _lower(self, cfg):
+        key = _batch_key(cfg)
+        if key is None:
+            return None
+        if key[0] == "crossUpThreshold":
+            thr, wd, sell = _real(cfg["thr"]), float(_real(cfg.get("wd", 0))), bool(cfg.get("sell", False))
+            bank = self.node("indicator", ("bank",) + key[1:], (self._data(),))
+            cross = self.node("comparison", ("cross", bank, json.dumps(cfg["period"], default=str), sell), (bank,))
+            return (self.node("cluster", ("cluster", cross, wd), (cross,)), thr)
+        if key[0] == "timeThreshold":
+            direction, wd = _first(cfg["direction"]), _real(cfg.get("wd", 0))
+            level, mc = _real(_first(cfg["threshold"])), _real(_first(cfg["min_candles"]))
+            line = self._line(cfg["indicator"], _first(cfg["period"]), cfg.get("indicator_params", {}))
+            return (self.node("streak", ("streak", line, direction, wd), (line,)), (level, mc))
+        if key[0] == "inRangeThreshold":
+            bounds = (_real(_first(cfg["lower"])), _real(_first(cfg["upper"])))
+            line = self._line(cfg["indicator"], _first(cfg["period"]), {})
+            return (self.node("comparison", ("range", line), (line,)), bounds)
+        spec = DYNAMIC_THRESHOLDS[key[0]]
+        item = _node_key([spec.kwargs(cfg), bool(cfg.get("sell", False))])
+        return (self.node("comparison", ("dynamic",) + key, (self._data(),)), item)
+
+    # --- execution ---
+    def run(self, n_jobs=-1) -> "ConfigDAG":
+        """Evaluates one config per distinct (node, item) with evaluate_configs, then every distinct combination."""
+        first = {}
+        for i, (_, ref) in enumerate(self.configs):
+            first.setdefault(ref, i)
+        results = evaluate_configs(self.df, [self.configs[i][0] for i in first.values()], n_jobs=n_jobs)
+        self._results = dict(zip(first.values(), results))
+        self.values = {ref: r["signals_df"] for ref, r in zip(first, results)}
+        for key in dict.fromkeys(self.combinations):
+            mode, within, ids = self.nodes[key].args
+            self.values[key] = _combine_signals(self.df, [self.signals(i) for i in ids], mode, within)
+        return self
+
+    # --- results ---
+    def signals(self, i) -> SignalSet:
+        return self.values[self.configs[i][1]]
+
+    def results(self) -> list:
+        """Result dict of every added config, in the order they were added."""
+        return [self._results.get(i) or _scored(self.df, cfg, self.signals(i)) for i, (cfg, _) in enumerate(self.configs)]
+
+    def combination(self, j) -> SignalSet:
+        return self.values[self.combinations[j]]
+
+    def summary(self) -> str:
+        stages = Counter(node.stage for node in self.nodes.values())
+        per_stage = ", ".join(f"{s} {stages[s]}" for s in DAG_STAGES if stages[s])
+        what = f"{len(self.configs)} configs" + (f" + {len(self.combinations)} combinations" if self.combinations else "")
+        return f"{what} -> {len(self.nodes)} unique nodes of {self.requests} requested ({per_stage})"
+
+
+def compile_configs(df, configs) -> ConfigDAG:
+    """Lowers a batch of configs (from generate_flat_configs) to one de-duplicated DAG."""
+    dag = ConfigDAG(df)
+    for cfg in configs:
+        dag.add_config(cfg)
+    return dag
 
 # ============================================================
 # HELPER: Deduplicate Results (THE FIX)
@@ -51,8 +413,8 @@ def deduplicate_results(results):
         # We sort keys to ensure {"a":1, "b":2} equals {"b":2, "a":1}
         try:
             if "combination" in r:
-                # Tuple of dicts
-                cfg_str = str(r["combination"]) 
+                # Tuple of dicts (and the tolerance of temporal modes)
+                cfg_str = str((r["combination"], r["within"]) if "within" in r else r["combination"])
             else:
                 # Single dict
                 cfg_str = json.dumps(r["config"], sort_keys=True, default=str)
@@ -73,24 +435,8 @@ def expand_params(param_dict):
     return [dict(zip(keys, c)) for c in itertools.product(*vals)]
 
 def generate_flat_configs(space):
-    """Generates ALL possible configs for a Grid Search."""
-    configs = []
-    ind_param_sets = expand_params(space.get("indicator_params", {}))
-    t, is_sell, wd = space["type"], space.get("sell", False), space.get("wd", 0)
-
-    if t == "crossUpThreshold":
-        for per, thr, ind_kwargs in itertools.product(space["period"], space["threshold"], ind_param_sets):
-            configs.append({"type": t, "indicator": space["indicator"], "period": per, "thr": thr, "wd": wd, "sell": is_sell, "indicator_params": ind_kwargs})
-    elif t == "inRangeThreshold":
-        for per, low, upp, ind_kwargs in itertools.product(space["period"], space["lower"], space["upper"], ind_param_sets):
-            configs.append({"type": t, "indicator": space["indicator"], "period": per, "lower": low, "upper": upp, "wd": wd, "sell": is_sell, "indicator_params": ind_kwargs})
-    elif t == "timeThreshold":
-        for per, thr, d, mc, ind_kwargs in itertools.product(space["period"], space["threshold"], space["direction"], space["min_candles"], ind_param_sets):
-            configs.append({"type": t, "indicator": space["indicator"], "period": per, "threshold": thr, "direction": d, "min_candles": mc, "wd": wd, "sell": is_sell, "indicator_params": ind_kwargs})
-    elif t == "crossUpLineThreshold":
-        for p1, p2 in itertools.product(space["periods"][0], space["periods"][1]):
-            configs.append({"type": t, "ind1": space["indicators"][0], "ind2": space["indicators"][1], "period1": p1, "period2": p2, "wd": wd, "sell": is_sell})
-    return configs
+    """Generates ALL possible configs for a Grid Search (see SearchSpace for the lazy form)."""
+    return list(SearchSpace(space))
 
 def sample_random_config(space):
     """Generates ONE random config from a search space."""
@@ -110,181 +456,420 @@ def sample_random_config(space):
         cfg.update({"indicator": space["indicator"], "period": random.choice(space["period"]), "threshold": random.choice(space["threshold"]), "direction": random.choice(space["direction"]), "min_candles": random.choice(space["min_candles"])})
     elif t == "crossUpLineThreshold":
         cfg.update({"ind1": space["indicators"][0], "ind2": space["indicators"][1], "period1": random.choice(space["periods"][0]), "period2": random.choice(space["periods"][1])})
+    elif t in DYNAMIC_THRESHOLDS:
+        cfg.update({n: random.choice(space.get(n, [d])) for n, d in DYNAMIC_THRESHOLDS[t].params})
     
     return cfg
 
 def get_total_grid_size(search_space):
-    total = 0
-    for s in search_space:
-        total += len(generate_flat_configs(s))
-    return total
+    return len(SearchSpace(search_space))
+
+# ============================================================
+# HELPER: Optuna (parameter mapping + multi-process trials)
+# ============================================================
+# Every swept dimension of a search space becomes one Optuna parameter, so TPE
+# learns from all of them (indicator_params, direction, min_candles, bounds,
+# dynamic ranges):
+#
+#   evenly spaced ints            suggest_int(low, high, step)
+#   other numbers                 suggest_int over the sorted values' ranks
+#   str / bool / None             suggest_categorical
+#   anything else (tuples, ...)   suggest_categorical over list positions
+#
+# With n_jobs > 1, worker processes share one study through a local SQLite
+# storage. Each asks for a batch of trials, evaluates the batch on one
+# ConfigDAG and tells the scores back, so cores stay busy on numba/pandas
+# work instead of contending for one interpreter's GIL.
+
+def _suggest_value(trial, name, values):
+    """One Optuna parameter picking a value of `values` (the value itself is returned)."""
+    if len(values) == 1:
+        return values[0]
+    numeric = all(isinstance(v, numbers.Real) and not isinstance(v, bool) for v in values)
+    if numeric and len(set(values)) == len(values):
+        order = sorted(values)
+        steps = {b - a for a, b in zip(order, order[1:])}
+        if len(steps) == 1 and all(isinstance(v, numbers.Integral) for v in values):
+            by_int = {int(v): v for v in values}
+            return by_int[trial.suggest_int(name, int(order[0]), int(order[-1]), step=int(steps.pop()))]
+        return order[trial.suggest_int(name, 0, len(order) - 1)]
+    if all(v is None or type(v) in (bool, int, float, str) for v in values):
+        return trial.suggest_categorical(name, list(values))
+    return values[trial.suggest_categorical(name, list(range(len(values))))]
+
+def _suggest_config(trial, space, prefix=""):
+    """A config of a SearchSpace chosen by the trial: its block, then every swept parameter."""
+    blocks = [(b, block) for b, block in enumerate(space.blocks) if block.size]
+    b, block = blocks[trial.suggest_int(f"{prefix}strategy_idx", 0, len(blocks) - 1)] if len(blocks) > 1 else blocks[0]
+    t = block.head["type"]
+    values = [_suggest_value(trial, f"{prefix}{t}_{b}_{name}", dim) for name, dim in zip(block.names, block.dims)]
+    return block.build(tuple(values))
+
+def _suggest_combination(trial, spaces, tolerances):
+    combo = tuple(_suggest_config(trial, space, prefix=f"b{i}_") for i, space in enumerate(spaces))
+    return combo, _suggest_value(trial, "within", tolerances)
+
+def _evaluate_trials(df, candidates, mode=None):
+    """Result dicts of a batch of trial candidates (configs, or (combination, within) pairs) on one DAG."""
+    dag = ConfigDAG(df)
+    if mode is None:
+        for cfg in candidates:
+            dag.add_config(cfg)
+        return dag.run(n_jobs=1).results()
+    js = [dag.add_combination([dag.add_config(c) for c in combo], mode, w) for combo, w in candidates]
+    dag.run(n_jobs=1)
+    return [_combo_result(combo, dag.combination(j), mode, w) for (combo, w), j in zip(candidates, js)]
+
+def _run_trials(study, df, suggest, n_trials, batch_size, mode=None):
+    """Batched ask / evaluate / tell loop of one worker."""
+    results = []
+    while len(results) < n_trials:
+        trials = [study.ask() for _ in range(min(batch_size, n_trials - len(results)))]
+        batch = _evaluate_trials(df, [suggest(trial) for trial in trials], mode)
+        for trial, r in zip(trials, batch):
+            study.tell(trial, r["score"])
+        results.extend(batch)
+    return results
+
+def _trial_worker(df, storage, study_name, suggest, n_trials, batch_size, mode=None, seed=None):
+    study = optuna.load_study(study_name=study_name, storage=_sqlite_storage(storage), sampler=_tpe_sampler(seed))
+    return _run_trials(study, df, suggest, n_trials, batch_size, mode)
+
+def _tpe_sampler(seed):
+    # constant_liar: trials still running (the rest of a batch, other workers' trials)
+    # count as bad ones, so concurrent asks do not all land on the same point
+    return optuna.samplers.TPESampler(seed=seed, constant_liar=True)
+
+def _sqlite_storage(url):
+    # concurrent writers wait for the database lock instead of failing
+    return optuna.storages.RDBStorage(url, engine_kwargs={"connect_args": {"timeout": 60}})
+
+def _optimize(df, suggest, n_iter, n_jobs, batch_size, mode=None, seed=None, storage=None):
+    """
+    Runs n_iter trials of a maximizing TPE study and returns their result dicts.
+
+    n_jobs == 1 runs in this process (in-memory study unless storage is given);
+    otherwise each worker process runs its share of the trials against the
+    shared SQLite study at `storage` (a temporary file by default), with its
+    own sampler seeded seed + worker index.
+    """
+    sampler = _tpe_sampler(seed)
+    workers = max(1, (os.cpu_count() or 1) + 1 + n_jobs) if n_jobs < 0 else n_jobs
+    workers = min(workers, -(-n_iter // batch_size))
+    if workers <= 1:
+        study = optuna.create_study(direction="maximize", sampler=sampler, storage=storage and _sqlite_storage(storage))
+        return _run_trials(study, df, suggest, n_iter, batch_size, mode)
+
+    tmpdir = None
+    if storage is None:
+        tmpdir = tempfile.mkdtemp(prefix="ta_optuna_")
+        storage = f"sqlite:///{os.path.join(tmpdir, 'study.db')}"
+    try:
+        study = optuna.create_study(direction="maximize", sampler=sampler, storage=_sqlite_storage(storage))
+        shares = [n_iter // workers + (w < n_iter % workers) for w in range(workers)]
+        batches = Parallel(n_jobs=workers)(
+            delayed(_trial_worker)(df, storage, study.study_name, suggest, n, batch_size, mode, None if seed is None else seed + w)
+            for w, n in enumerate(shares)
+        )
+    finally:
+        if tmpdir is not None:
+            shutil.rmtree(tmpdir, ignore_errors=True)
+    # worker processes return bare positions; point them back at this dataset
+    return bind_signals([r for batch in batches for r in batch], df)
 
 # ============================================================
 # SEARCH ENGINES (Standard)
 # ============================================================
-def gridSearch(df, search_space, n_jobs=-1):
-    all_configs = []
-    for s in search_space: all_configs.extend(generate_flat_configs(s))
-    results = Parallel(n_jobs=n_jobs)(delayed(evaluate_config)(df, c) for c in all_configs)
+def gridSearch(df, search_space, n_jobs=-1, shard=None):
+    """shard=(i, n) evaluates only the i-th of n contiguous shards of the grid (one per worker / machine)."""
+    df = as_ohlcv(df)  # read-only, shared by every evaluation (no per-config copies)
+    space = SearchSpace(search_space)
+    all_configs = list(space.shard(*shard) if shard is not None else space)
+    # grid configs are distinct, so there is nothing for a ConfigDAG to de-duplicate
+    print(f"🧩 Grid Search: {len(all_configs)} configs", flush=True)
+    results = evaluate_configs(df, all_configs, n_jobs=n_jobs)
     return deduplicate_results(results)
 
-def randomSearch(df, search_space, n_iter=100, n_jobs=-1):
-    all_configs = [sample_random_config(random.choice(search_space)) for _ in range(n_iter)]
-    results = Parallel(n_jobs=n_jobs)(delayed(evaluate_config)(df, c) for c in all_configs)
+def randomSearch(df, search_space, n_iter=100, n_jobs=-1, sampler="uniform", seed=None):
+    """
+    n_iter distinct configs drawn over the grid's index space (see SearchSpace.sample).
+
+    sampler: "uniform", "sobol", "halton" or "lhs"; the same seed draws the
+    same configs whatever n_jobs is. A budget covering the whole grid runs
+    gridSearch instead.
+    """
+    df = as_ohlcv(df)
+    space = SearchSpace(search_space)
+    if n_iter >= len(space):
+        print(f"🎲 Random Search: {n_iter} iterations cover all {len(space)} configs -> exhaustive grid", flush=True)
+        return gridSearch(df, search_space, n_jobs=n_jobs)
+    all_configs = space.sample(n_iter, seed=seed if seed is not None else random.getrandbits(63), sampler=sampler)
+    results = evaluate_configs(df, all_configs, n_jobs=n_jobs)
     return deduplicate_results(results)
 
-def bayesianSearch(df, search_space, n_iter=100, n_jobs=-1):
+def bayesianSearch(df, search_space, n_iter=100, n_jobs=-1, batch_size=8, seed=None, storage=None):
+    """
+    TPE search over every swept parameter of the search space.
+
+    n_jobs > 1 (or -1: all cores) runs the trials in worker processes sharing
+    one SQLite study, batch_size trials per ask/tell round; storage is an
+    optional Optuna database URL to keep the study.
+    """
+    df = as_ohlcv(df)
     # This function is used for independent block search
     print(f"🧠 Bayesian Search (Single Block): {n_iter} trials...", flush=True)
-    results = []
-
-    def objective(trial):
-        strat_idx = trial.suggest_int("strategy_idx", 0, len(search_space) - 1)
-        space = search_space[strat_idx]
-        t = space["type"]
-        def pick(n, v): return trial.suggest_categorical(f"{t}_{strat_idx}_{n}", v)
-        
-        cfg = sample_random_config(space) # Fallback structure
-        # Overwrite with Optuna suggestions
-        cfg["type"] = t
-        
-        # (Simplified Optuna mapping for brevity - relies on 'pick' picking from the list)
-        if t == "crossUpThreshold":
-            cfg["period"] = pick("period", space["period"])
-            cfg["thr"] = pick("threshold", space["threshold"])
-        # ... Add other types mapping here if strictly needed for Bayesian optimization logic ...
-        # For small discrete spaces, random sampling often suffices if this mapping is complex.
-        
-        res = evaluate_config(df, cfg)
-        results.append(res)
-        return res["score"]
-
-    study = optuna.create_study(direction="maximize")
-    study.optimize(objective, n_trials=n_iter, n_jobs=n_jobs)
+    space = SearchSpace(search_space)
+    if len(space) == 0:
+        return []
+    suggest = functools.partial(_suggest_config, space=space)
+    results = _optimize(df, suggest, n_iter, n_jobs, batch_size, seed=seed, storage=storage)
     return deduplicate_results(results)
 
 # ============================================================
 # SEARCH ENGINES (Combinatorial)
 # ============================================================
 
-def combinatorialGridSearch(df, search_spaces_list, mode="and"):
+# combine modes that join signals within a tolerance of `within` bars
+TEMPORAL_MODES = ("within", "then")
+
+def _combine_signals(df, signal_sets, mode="and", within=0):
+    """
+    Joins the signals of a combination's rules on their packed bitsets.
+
+    mode: "and" (bars where every rule fired), "or" (any rule; empty if any
+    rule has no signals), "and_not" (the first rule, on bars where none of the
+    others fired), an int k (at least k of the rules), "within" (every rule
+    fired in the last `within` bars, entered on a bar where one fires) or
+    "then" (the rules fire in order, each 1..`within` bars after the previous).
+    Results are counted by popcount; positions are only unpacked when read.
+    """
+    if isinstance(mode, numbers.Integral) and not isinstance(mode, bool):
+        return k_of_n(signal_sets, mode, base=df, label="entry")
+    if mode == "and_not":
+        if signal_sets[0].empty:
+            return SignalSet.none(df, label="entry")
+        return SignalSet.from_words(bits_andnot(signal_sets[0].words, *(s.words for s in signal_sets[1:])), len(df), base=df, label="entry")
+    if any(s.empty for s in signal_sets):
+        return SignalSet.none(df, label="entry")
+    if mode == "within":
+        return co_occur(signal_sets, within, base=df, label="entry")
+    if mode == "then":
+        return in_sequence(signal_sets, within, base=df, label="entry")
+    words = [s.words for s in signal_sets]
+    combined = bits_and(words) if mode == "and" else bits_or(words)
+    return SignalSet.from_words(combined, len(df), base=df, label="entry")
+
+def _tolerances(mode, within):
+    """The `within` values a combinatorial search explores (a list makes it a search dimension)."""
+    if mode not in TEMPORAL_MODES:
+        return [0]
+    tolerances = list(within) if isinstance(within, (list, tuple, range)) else [within]
+    if mode == "then" and any(w < 1 for w in tolerances):
+        raise ValueError(f"mode='then' needs within >= 1 (each rule fires 1..within bars after the previous), got {within!r}")
+    return tolerances
+
+def _combo_result(combo, combined, mode, within):
+    count = len(combined)
+    result = {"combination": combo, "signals": count, "score": count, "signals_df": combined}
+    if mode in TEMPORAL_MODES:
+        result["within"] = within
+    return result
+
+
+def combinatorialGridSearch(df, search_spaces_list, mode="and", n_jobs=-1, within=0, top_k=None):
+    """
+    Every combination of one config per search space (x every `within` tolerance).
+
+    top_k=None keeps a result (with its signals) per combination. top_k=K
+    streams the combinations instead: each is scored by popcount and only
+    (score, position) scalars enter a bounded heap, so memory stays
+    O(K + configs) for any grid; the K best are combined again at the end.
+    Ties keep enumeration order in both modes.
+    """
+    _check_top_k(top_k)
+    df = as_ohlcv(df)
     print("🔗 Combinatorial GRID Search...", flush=True)
     all_groups = [generate_flat_configs(space) for space in search_spaces_list]
     
     # Check size
     total_combinations = 1
     for g in all_groups: total_combinations *= len(g)
+    tolerances = _tolerances(mode, within)
+    total_combinations *= len(tolerances)
     print(f"   -> Total Combinations: {total_combinations}")
 
-    # Flatten for pre-calculation
-    flat_list = [c for group in all_groups for c in group]
-    print("   -> Pre-calculating individual signals...", flush=True)
-    precalc = Parallel(n_jobs=-1)(delayed(evaluate_config)(df, c) for c in flat_list)
-    cache = {json.dumps(r["config"], sort_keys=True, default=str): r.get("signals_df", pd.DataFrame()) for r in precalc}
-    
-    print("   -> Mixing...", flush=True)
+    # One DAG for the individual signals (and, unless streaming, every combination of them)
+    dag = ConfigDAG(df)
+    ids = [[dag.add_config(c) for c in group] for group in all_groups]
+    if top_k is not None:
+        print(f"   -> {dag.summary()}", flush=True)
+        dag.run(n_jobs=n_jobs)
+        return _stream_top_k(df, all_groups, ids, dag, mode, tolerances, top_k)
+
+    combos = [
+        (combo, w, dag.add_combination(idx, mode, w))
+        for combo, idx in zip(itertools.product(*all_groups), itertools.product(*ids)) for w in tolerances
+    ]
+    print(f"   -> {dag.summary()}", flush=True)
+
+    print("   -> Evaluating DAG...", flush=True)
+    dag.run(n_jobs=n_jobs)
     final_results = []
     
-    for combo in itertools.product(*all_groups):
-        dfs = []
-        for c in combo:
-            key = json.dumps(c, sort_keys=True, default=str)
-            dfs.append(cache.get(key, pd.DataFrame()))
-        
-        if any(d.empty for d in dfs):
-            combined = pd.DataFrame()
-        else:
-            if mode == "and":
-                combined = dfs[0][["Date"]]
-                for d in dfs[1:]: combined = combined.merge(d[["Date"]], on="Date", how="inner")
-            else: # OR
-                combined = pd.concat([d[["Date"]] for d in dfs]).drop_duplicates().sort_values("Date")
-        
-        count = len(combined)
-        final_results.append({"combination": combo, "signals": count, "score": count, "signals_df": combined})
+    for combo, w, j in combos:
+        final_results.append(_combo_result(combo, dag.combination(j), mode, w))
     
     # Grid search naturally produces unique combos, but good to be safe
     return sorted(final_results, key=lambda x: x["score"], reverse=True)
 
 
-def combinatorialRandomSearch(df, search_spaces_list, n_iter=100, mode="and"):
+def _check_top_k(top_k):
+    if top_k is not None and (not isinstance(top_k, numbers.Integral) or top_k < 1):
+        raise ValueError(f"top_k must be a positive integer or None, got {top_k!r}")
+
+
+def _stream_top_k(df, all_groups, ids, dag, mode, tolerances, top_k):
+    """Best top_k combinations of a grid, enumerated lazily through a min-heap of scalars."""
+    signals = [[dag.signals(i) for i in group] for group in ids]
+    heap = []   # (score, -seq, idx, w): the root is the worst survivor (lowest score, latest on ties)
+    seq = 0
+    for idx in itertools.product(*(range(len(g)) for g in all_groups)):
+        sets = [signals[b][k] for b, k in enumerate(idx)]
+        for w in tolerances:
+            entry = (len(_combine_signals(df, sets, mode, w)), -seq, idx, w)
+            seq += 1
+            if len(heap) < top_k:
+                heapq.heappush(heap, entry)
+            elif entry[:2] > heap[0][:2]:
+                heapq.heapreplace(heap, entry)
+    print(f"   -> Streamed {seq} combinations, kept the top {len(heap)}", flush=True)
+
+    final_results = []
+    for score, _, idx, w in sorted(heap, key=lambda e: e[:2], reverse=True):
+        combo = tuple(all_groups[b][k] for b, k in enumerate(idx))
+        combined = _combine_signals(df, [signals[b][k] for b, k in enumerate(idx)], mode, w)
+        final_results.append(_combo_result(combo, combined, mode, w))
+    return final_results
+
+
+def combinatorialBranchAndBound(df, search_spaces_list, min_signals=1, top_k=None, n_jobs=-1):
+    """
+    AND-mode combinatorial grid as a depth-first search over partial intersections.
+
+    Adding a block can only shrink an AND, so the popcount of a partial
+    intersection bounds every combination below it: a subtree is pruned once
+    it drops under min_signals or (with top_k) under the K-th best score so
+    far. Blocks are visited most selective first (lowest mean signal count),
+    where intersections die earliest. Returns the combinations with at least
+    min_signals signals (the top_k best of them if given), ordered like
+    combinatorialGridSearch(mode="and").
+    """
+    _check_top_k(top_k)
+    df = as_ohlcv(df)
+    print("🌳 Combinatorial BRANCH & BOUND Search (AND)...", flush=True)
+    all_groups = [generate_flat_configs(space) for space in search_spaces_list]
+    if not all_groups or not all(all_groups):
+        return []
+    total_combinations = math.prod(len(g) for g in all_groups)
+    print(f"   -> Total Combinations: {total_combinations}")
+
+    dag = ConfigDAG(df)
+    ids = [[dag.add_config(c) for c in group] for group in all_groups]
+    print(f"   -> {dag.summary()}", flush=True)
+    dag.run(n_jobs=n_jobs)
+    words = [[dag.signals(i).words for i in group] for group in ids]
+    counts = [[len(dag.signals(i)) for i in group] for group in ids]
+
+    order = sorted(range(len(all_groups)), key=lambda b: (sum(counts[b]) / len(counts[b]), b))
+    leaves_below = [math.prod(len(all_groups[b]) for b in order[d + 1:]) for d in range(len(order))]
+    stride = [math.prod(len(g) for g in all_groups[b + 1:]) for b in range(len(all_groups))]   # grid enumeration order
+    found = []   # (score, -seq, idx, words); a min-heap when top_k is set
+    stats = {"evaluated": 0, "pruned": 0}
+
+    def floor():
+        if top_k is not None and len(found) >= top_k:
+            return max(min_signals, found[0][0])
+        return min_signals
+
+    def descend(depth, partial, picks):
+        block = order[depth]
+        for k, w in enumerate(words[block]):
+            inter = w if partial is None else bits_and([partial, w])
+            count = popcount(inter)
+            if count < floor():
+                stats["pruned"] += leaves_below[depth]
+                continue
+            if depth + 1 < len(order):
+                descend(depth + 1, inter, picks + [(block, k)])
+                continue
+            stats["evaluated"] += 1
+            idx = dict(picks + [(block, k)])
+            entry = (count, -sum(idx[b] * stride[b] for b in idx), tuple(idx[b] for b in range(len(all_groups))), inter)
+            if top_k is None:
+                found.append(entry)
+            elif len(found) < top_k:
+                heapq.heappush(found, entry)
+            elif entry[:2] > found[0][:2]:
+                heapq.heapreplace(found, entry)
+
+    descend(0, None, [])
+    share = 100 * stats["pruned"] / total_combinations
+    print(f"   -> Evaluated {stats['evaluated']} combinations, pruned {stats['pruned']} ({share:.1f}%)", flush=True)
+
+    final_results = []
+    for _, _, idx, inter in sorted(found, key=lambda e: e[:2], reverse=True):
+        combo = tuple(all_groups[b][k] for b, k in enumerate(idx))
+        final_results.append(_combo_result(combo, SignalSet.from_words(inter, len(df), base=df, label="entry"), "and", 0))
+    return final_results
+
+
+def combinatorialRandomSearch(df, search_spaces_list, n_iter=100, mode="and", within=0, sampler="uniform", seed=None):
+    """
+    n_iter distinct combinations drawn over the combination index space.
+
+    One digit per search space (its config index) plus one for the `within`
+    tolerance; sampler and seed work as in randomSearch. The drawn configs
+    and combinations are evaluated on one ConfigDAG. A budget covering every
+    combination runs combinatorialGridSearch instead.
+    """
+    df = as_ohlcv(df)
     print(f"🔗 Combinatorial RANDOM Search ({n_iter} iters)...", flush=True)
     
-    def run_random_combo():
-        combo_configs = [sample_random_config(space) for space in search_spaces_list]
-        dfs = []
-        for cfg in combo_configs:
-            res = evaluate_config(df, cfg)
-            dfs.append(res["signals_df"])
-            
-        if any(d.empty for d in dfs):
-            combined = pd.DataFrame()
-        else:
-            if mode == "and":
-                combined = dfs[0][["Date"]]
-                for d in dfs[1:]: combined = combined.merge(d[["Date"]], on="Date", how="inner")
-            else:
-                combined = pd.concat([d[["Date"]] for d in dfs]).drop_duplicates().sort_values("Date")
-        
-        return {"combination": tuple(combo_configs), "signals": len(combined), "score": len(combined), "signals_df": combined}
-
-    results = Parallel(n_jobs=-1)(delayed(run_random_combo)() for _ in range(n_iter))
+    spaces = [SearchSpace(space) for space in search_spaces_list]
+    tolerances = _tolerances(mode, within)
+    radices = [len(space) for space in spaces] + [len(tolerances)]
+    if n_iter >= math.prod(radices):
+        print(f"   -> {n_iter} iterations cover all {math.prod(radices)} combinations -> exhaustive grid", flush=True)
+        return combinatorialGridSearch(df, search_spaces_list, mode=mode, within=within)
+
+    picks = sample_digits(radices, n_iter, seed=seed if seed is not None else random.getrandbits(63), sampler=sampler)
+    dag = ConfigDAG(df)
+    ids = {}   # (block, config index) -> DAG config id: a config drawn again is lowered once
+    combos = []
+    for digits in picks:
+        combo = tuple(space[d] for space, d in zip(spaces, digits))
+        for b, d in enumerate(digits[:-1]):
+            if (b, d) not in ids:
+                ids[(b, d)] = dag.add_config(combo[b])
+        w = tolerances[digits[-1]]
+        combos.append((combo, w, dag.add_combination([ids[(b, d)] for b, d in enumerate(digits[:-1])], mode, w)))
+    print(f"   -> {dag.summary()}", flush=True)
+    dag.run(n_jobs=-1)
+    results = [_combo_result(combo, dag.combination(j), mode, w) for combo, w, j in combos]
     
     # === DEDUPLICATE HERE ===
     return deduplicate_results(sorted(results, key=lambda x: x["score"], reverse=True))
 
 
-def combinatorialBayesianSearch(df, search_spaces_list, n_iter=100, mode="and"):
+def combinatorialBayesianSearch(df, search_spaces_list, n_iter=100, mode="and", within=0, n_jobs=-1, batch_size=8, seed=None, storage=None):
+    """TPE search over the combinations (every swept parameter of every block, plus `within`); see bayesianSearch."""
+    df = as_ohlcv(df)
     print(f"🧠 Combinatorial BAYESIAN Search ({n_iter} iters)...", flush=True)
-    results = []
-
-    def objective(trial):
-        combo_configs = []
-        for i, space in enumerate(search_spaces_list):
-            t = space["type"]
-            prefix = f"b{i}_{t}"
-            def pick(n, v): return trial.suggest_categorical(f"{prefix}_{n}", v)
-            
-            # Simple approach: Re-build config using Optuna picks
-            # This requires replicating the logic from generate_flat_configs
-            # For simplicity in this fix, we use sample_random_config which works for basic lists
-            # but usually Optuna needs explicit 'suggest' calls to learn.
-            
-            # (Simplified: Random fallback for complex structure, mapped params for simple)
-            cfg = sample_random_config(space) 
-            if t == "crossUpThreshold":
-                cfg["period"] = pick("p", space["period"])
-                cfg["thr"] = pick("t", space["threshold"])
-            # ... Add other mappings ...
-            
-            combo_configs.append(cfg)
-
-        dfs = []
-        for cfg in combo_configs:
-            res = evaluate_config(df, cfg)
-            dfs.append(res["signals_df"])
-
-        if any(d.empty for d in dfs):
-            count = 0
-            combined = pd.DataFrame()
-        else:
-            if mode == "and":
-                combined = dfs[0][["Date"]]
-                for d in dfs[1:]: combined = combined.merge(d[["Date"]], on="Date", how="inner")
-            else:
-                combined = pd.concat([d[["Date"]] for d in dfs]).drop_duplicates().sort_values("Date")
-            count = len(combined)
-
-        results.append({
-            "combination": tuple(combo_configs), 
-            "signals": count, 
-            "score": count, 
-            "signals_df": combined
-        })
-        return count
-
-    study = optuna.create_study(direction="maximize")
-    study.optimize(objective, n_trials=n_iter, n_jobs=-1) 
+    spaces = [SearchSpace(space) for space in search_spaces_list]
+    if not spaces or any(len(space) == 0 for space in spaces):
+        return []
+    suggest = functools.partial(_suggest_combination, spaces=spaces, tolerances=_tolerances(mode, within))
+    results = _optimize(df, suggest, n_iter, n_jobs, batch_size, mode=mode, seed=seed, storage=storage)
     
     # === DEDUPLICATE HERE ===
     return deduplicate_results(sorted(results, key=lambda x: x["score"], reverse=True))
@@ -316,7 +901,7 @@ def plot_signals_pdf(df, results, pdf_name="plots.pdf", top_n=None):
         
         for i, r in enumerate(pbar):
             try:
-                signals = r.get("signals_df", pd.DataFrame())
+                signals = r.get("signals_df", SignalSet.none(df))
                 if signals.empty and "config" in r:
                     signals = run_threshold(df, r["config"])
                 
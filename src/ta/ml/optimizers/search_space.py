@@ -0,0 +1,270 @@
+import bisect
+import inspect
+import itertools
+import math
+import random
+import warnings
+
+import numpy as np
+
+# === CRITICAL IMPORT ===
+from src.ta.functions.indicators.universal_threshold_dispatcher import DYNAMIC_THRESHOLDS
+
+
+# ============================================================
+# SearchSpace: lazy grid over search-space dicts
+# ============================================================
+# A grid is a mixed-radix number: one digit per swept parameter (the last
+# varying fastest, as in itertools.product), one block per search-space dict.
+# Config i is decoded from i directly, so the size, random access, shards and
+# samples of a grid cost O(parameters), never O(grid):
+#
+#     space = SearchSpace(ttBUY)
+#     len(space), space[123456]
+#     for cfg in space.shard(3, 16):      # worker 3 of 16, contiguous
+#         ...
+#     picks = space.sample(500, seed=7)   # without replacement
+#     picks = space.sample(500, seed=7, sampler="sobol")
+
+
+class SearchSpace:
+    """
+    Every config of one search-space dict or a list of them, in generate_flat_configs order.
+
+    Parameters:
+        spaces (dict | list): A search-space dict (configs/searchSpaces.py) or a list of them
+    """
+
+    def __init__(self, spaces):
+        self.blocks = [_Block(s) for s in ([spaces] if isinstance(spaces, dict) else spaces)]
+        self.offsets = [0] + list(itertools.accumulate(b.size for b in self.blocks))
+        self.indices = range(self.offsets[-1])
+
+    # --- size / access ---
+    def __len__(self):
+        return len(self.indices)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return self._view(self.indices[i])
+        return self._decode(self.indices[i])
+
+    def __iter__(self):
+        step, start = self.indices.step, self.indices.start
+        if step != 1:
+            for g in self.indices:
+                yield self._decode(g)
+            return
+        stop = start + len(self.indices)
+        for b, block in enumerate(self.blocks):
+            lo, hi = max(start, self.offsets[b]), min(stop, self.offsets[b + 1])
+            if lo >= hi:
+                continue
+            if hi - lo == block.size:   # the whole block: plain product, no decoding
+                yield from map(block.build, itertools.product(*block.dims))
+            else:
+                for j in range(lo - self.offsets[b], hi - self.offsets[b]):
+                    yield block.config(j)
+
+    def _decode(self, g):
+        b = bisect.bisect_right(self.offsets, g) - 1
+        return self.blocks[b].config(g - self.offsets[b])
+
+    def _view(self, indices) -> "SearchSpace":
+        view = object.__new__(SearchSpace)
+        view.blocks, view.offsets, view.indices = self.blocks, self.offsets, indices
+        return view
+
+    # --- partitioning / sampling ---
+    def shard(self, i: int, n: int, strided: bool = False) -> "SearchSpace":
+        """
+        Shard i of n (a lazy SearchSpace).
+
+        Contiguous shards are consecutive index ranges of (almost) equal size;
+        strided shards take every n-th config from i, which spreads each block
+        over all shards.
+        """
+        if not 0 <= i < n:
+            raise ValueError(f"shard {i} is not in 0..{n - 1}")
+        if strided:
+            return self[i::n]
+        size = len(self)
+        return self[i * size // n:(i + 1) * size // n]
+
+    def sample(self, k: int, seed=None, sampler: str = "uniform") -> list:
+        """
+        k distinct configs (all of them if k >= len), reproducible from seed.
+
+        sampler: "uniform", or "sobol" / "halton" / "lhs", which spread the
+        picks over every swept parameter of a block (blocks get shares
+        proportional to their size). Shards and slices sample uniformly.
+        """
+        _check_sampler(sampler)
+        rng = seed if isinstance(seed, random.Random) else random.Random(seed)
+        k = min(k, len(self))
+        if sampler == "uniform" or self.indices != range(self.offsets[-1]):
+            return [self._decode(g) for g in rng.sample(self.indices, k)]
+        configs = []
+        for block, share in zip(self.blocks, _shares([b.size for b in self.blocks], k)):
+            digits = sample_digits(block.radices, share, seed=rng.getrandbits(63), sampler=sampler)
+            configs.extend(block.build(tuple(dim[d] for dim, d in zip(block.dims, ds))) for ds in digits)
+        return configs
+
+    def __repr__(self):
+        return f"SearchSpace({len(self)} configs in {len(self.blocks)} blocks)"
+
+
+# ============================================================
+# Samplers over mixed-radix index spaces
+# ============================================================
+SAMPLERS = ("uniform", "sobol", "halton", "lhs")
+
+
+def sample_digits(radices, k: int, seed=None, sampler: str = "uniform") -> list:
+    """
+    k distinct digit tuples of a mixed-radix space (all of them, if k >= its size).
+
+    Low-discrepancy samplers map points of the unit cube to digits
+    (floor(u * radix)); points landing on a tuple already drawn are skipped and
+    the sequence continued, and whatever is still missing after a few rounds
+    is drawn uniformly among the unused tuples.
+
+    Parameters:
+        radices (list): Number of values of each digit
+        k (int): Number of tuples
+        seed (int | None): Same seed, same tuples (on any worker)
+        sampler (str): "uniform", "sobol", "halton" or "lhs"
+    """
+    _check_sampler(sampler)
+    size = math.prod(radices)
+    k = min(k, size)
+    rng = random.Random(seed)
+    if sampler == "uniform" or not radices:
+        return [_digits(g, radices) for g in rng.sample(range(size), k)]
+
+    seen, out = set(), []
+    radix = np.asarray(radices)
+    draw = _unit_points(sampler, len(radices), rng.getrandbits(63))
+    for _ in range(8):
+        if len(out) >= k:
+            break
+        points = draw(k - len(out))
+        for row in np.minimum((points * radix).astype(np.int64), radix - 1):
+            ds = tuple(int(d) for d in row)
+            if ds not in seen:
+                seen.add(ds)
+                out.append(ds)
+    out = out[:k]
+    seen = set(out)
+    while len(out) < k:   # top up uniformly
+        ds = _digits(rng.randrange(size), radices)
+        if ds not in seen:
+            seen.add(ds)
+            out.append(ds)
+    return out
+
+
+def _unit_points(sampler, d, seed):
+    """draw(m) -> at least m further points of the sampler's sequence in [0, 1)^d."""
+    from scipy.stats import qmc
+
+    kind = {"sobol": qmc.Sobol, "halton": qmc.Halton, "lhs": qmc.LatinHypercube}[sampler]
+    # newer scipy names the generator argument `rng` (formerly `seed`)
+    arg = "rng" if "rng" in inspect.signature(kind).parameters else "seed"
+    engine = kind(d, **{arg: seed})
+
+    def draw(m):
+        if sampler == "lhs":   # one stratified batch of m points
+            return engine.random(m)
+        with warnings.catch_warnings():   # Sobol balance warning for non powers of two
+            warnings.simplefilter("ignore")
+            return engine.random(1 << (m - 1).bit_length())
+    return draw
+
+
+def _digits(g, radices):
+    digits = [0] * len(radices)
+    for d in range(len(radices) - 1, -1, -1):
+        g, digits[d] = divmod(g, radices[d])
+    return tuple(digits)
+
+
+def _shares(sizes, k):
+    """k split proportionally to sizes (largest remainder, capped at each size)."""
+    total = sum(sizes)
+    if total == 0:
+        return [0] * len(sizes)
+    exact = [k * s / total for s in sizes]
+    shares = [int(x) for x in exact]
+    for i in sorted(range(len(sizes)), key=lambda i: exact[i] - shares[i], reverse=True)[:k - sum(shares)]:
+        shares[i] += 1
+    return [min(share, s) for share, s in zip(shares, sizes)]
+
+
+def _check_sampler(sampler):
+    if sampler not in SAMPLERS:
+        raise ValueError(f"Unknown sampler: {sampler} (expected one of {SAMPLERS})")
+
+
+# ============================================================
+# One search-space dict
+# ============================================================
+# (head fields, swept fields with their search-space keys, has indicator_params)
+_LAYOUTS = {
+    "crossUpThreshold": (("indicator",), (("period", "period"), ("thr", "threshold")), True),
+    "inRangeThreshold": (("indicator",), (("period", "period"), ("lower", "lower"), ("upper", "upper")), True),
+    "timeThreshold": (
+        ("indicator",),
+        (("period", "period"), ("threshold", "threshold"), ("direction", "direction"), ("min_candles", "min_candles")),
+        True,
+    ),
+}
+
+
+class _Block:
+    def __init__(self, space):
+        t = space["type"]
+        self.wd, self.sell = space.get("wd", 0), space.get("sell", False)
+        self.head = {"type": t}
+        self.ind_keys = ()
+        if t in _LAYOUTS:
+            head, swept, has_ind = _LAYOUTS[t]
+            self.head.update({f: space[f] for f in head})
+            self.fields = tuple(f for f, _ in swept)
+            dims = [space[k] for _, k in swept]
+            ind_params = space.get("indicator_params", {})
+            self.ind_keys = tuple(ind_params)
+            dims += [ind_params[k] for k in self.ind_keys]
+            self.has_ind = has_ind
+        elif t == "crossUpLineThreshold":
+            self.head.update({"ind1": space["indicators"][0], "ind2": space["indicators"][1]})
+            self.fields = ("period1", "period2")
+            dims = [space["periods"][0], space["periods"][1]]
+            self.has_ind = False
+        elif t in DYNAMIC_THRESHOLDS:
+            spec = DYNAMIC_THRESHOLDS[t]
+            self.fields = spec.names
+            dims = [space.get(n, [d]) for n, d in spec.params]
+            self.has_ind = False
+        else:   # not a searchable type: an empty block
+            self.fields, dims, self.has_ind = (), [[]], False
+        self.dims = [list(d) for d in dims]
+        self.names = self.fields + tuple(f"indicator_params.{k}" for k in self.ind_keys)
+        self.radices = [len(d) for d in self.dims]
+        self.size = math.prod(self.radices)
+
+    def config(self, j):
+        """Config j of the block (mixed-radix digits, the last dimension fastest)."""
+        if not 0 <= j < self.size:
+            raise IndexError(j)
+        digits = _digits(j, self.radices)
+        return self.build(tuple(dim[k] for dim, k in zip(self.dims, digits)))
+
+    def build(self, values):
+        n = len(self.fields)
+        cfg = dict(self.head)
+        cfg.update(zip(self.fields, values[:n]))
+        cfg["wd"], cfg["sell"] = self.wd, self.sell
+        if self.has_ind:
+            cfg["indicator_params"] = dict(zip(self.ind_keys, values[n:]))
+        return cfg
@@ -0,0 +1,32 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+
+@pytest.fixture(scope="module")
+def ohlcv(request):
+    """
+    Random-walk OHLCV frame shared by the test modules.
+
+    A module tunes it with a module-level OHLCV dict:
+        seed, n, start  - the rng seed, the number of bars and the first date
+        wicks           - random high/low wicks (True) or a fixed ±1% band (False)
+    """
+    params = {"seed": 0, "n": 400, "start": "2022-01-01", "wicks": True}
+    params.update(getattr(request.module, "OHLCV", {}))
+    rng = np.random.default_rng(params["seed"])
+    n = params["n"]
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, n)))
+    if params["wicks"]:
+        high = close * (1 + rng.uniform(0, 0.02, n))
+        low = close * (1 - rng.uniform(0, 0.02, n))
+    else:
+        high, low = close * 1.01, close * 0.99
+    return pd.DataFrame({
+        "Date": pd.date_range(params["start"], periods=n),
+        "open": close,
+        "high": high,
+        "low": low,
+        "close": close,
+        "volume": 1.0,
+    })
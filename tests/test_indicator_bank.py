@@ -0,0 +1,34 @@
+import numpy as np
+import pytest
+
+from src.ta.functions.indicators.indicator_bank import indicator_bank
+from src.ta.functions.indicators.universal_indicator_dispatcher import calculate_indicator
+
+
+OHLCV = {"seed": 11}
+
+
+@pytest.mark.parametrize("type, params", [
+    ("rsi", [7, 14, 14, 30]),
+    ("ma", [5, 20, 50]),
+    ("atr", [7, 14]),
+    ("adx", [14, 28]),
+    ("macd", [(12, 26, 9), {"fast": 5, "slow": 35}]),
+    ("stochrsi", [(14, 14, 3, 3), (7, 21, 5, 3)]),
+    ("williams", [10, 30]),
+    ("bbands", [(20, 1.5), (40, 2)]),
+])
+def test_bank_columns_match_calculate_indicator(ohlcv, type, params):
+    bank = indicator_bank(ohlcv, type, params)
+    assert bank.values.shape == (len(ohlcv), len(params))
+
+    for j, p in enumerate(bank.params):
+        kwargs = {"rsi": {"period": p[0]}, "ma": {"period": p[0]}, "atr": {"period": p[0]},
+                  "adx": {"period": p[0]}, "williams": {"period": p[0]},
+                  "macd": dict(zip(("fast", "slow", "signal"), p)),
+                  "stochrsi": dict(zip(("rsi_length", "stoch_length", "k", "d"), p)),
+                  "bbands": dict(zip(("period", "std_dev"), p))}[type]
+        expected = calculate_indicator(ohlcv, type=type, **kwargs)
+        got = bank.frame(j)
+        assert got.index.equals(expected.index)
+        np.testing.assert_allclose(got.iloc[:, 1].to_numpy(), expected.iloc[:, 1].to_numpy(), rtol=1e-9, atol=1e-9)
@@ -0,0 +1,98 @@
+import numpy as np
+import pandas as pd
+
+from src.ta.functions.indicators.indicator_cache import (
+    clear_indicator_cache,
+    get_indicator_cache,
+    indicator_cache_stats,
+    set_indicator_cache,
+)
+from src.ta.functions.indicators.threshold_functions import crossUpThreshold
+
+
+def _ohlcv(n=300, seed=3):
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, n)))
+    return pd.DataFrame({
+        "Date": pd.date_range("2023-01-01", periods=n),
+        "open": close, "high": close * 1.01, "low": close * 0.99, "close": close, "volume": 1.0,
+    })
+
+
+def test_threshold_sweep_reuses_indicator():
+    df = _ohlcv()
+    clear_indicator_cache()
+    for thr in (30, 40, 50):
+        crossUpThreshold(df, type="rsi", thr=thr, period=14)
+    stats = indicator_cache_stats()
+    assert stats["misses"] == 1
+    assert stats["hits"] == 2
+
+
+def test_fingerprint_changes_with_data():
+    df = _ohlcv()
+    other = df.copy()
+    other.loc[10, "close"] += 1.0
+    clear_indicator_cache()
+    crossUpThreshold(df, type="rsi", thr=30, period=14)
+    crossUpThreshold(other, type="rsi", thr=30, period=14)
+    assert indicator_cache_stats()["misses"] == 2
+
+
+def test_budget_evicts_least_recently_used():
+    df = _ohlcv()
+    budget = get_indicator_cache().max_bytes
+    try:
+        set_indicator_cache(max_bytes=10_000)
+        clear_indicator_cache()
+        for period in range(5, 15):
+            crossUpThreshold(df, type="rsi", thr=30, period=period)
+        stats = indicator_cache_stats()
+        assert stats["bytes"] <= 10_000
+        assert stats["evictions"] > 0
+    finally:
+        set_indicator_cache(max_bytes=budget)
+
+
+def test_float32_mode_halves_cached_frames():
+    from src.ta.functions.indicators.precision import set_precision
+    from src.ta.functions.indicators.universal_indicator_dispatcher import calculate_indicator
+
+    df = _ohlcv()
+    clear_indicator_cache()
+    full = calculate_indicator(df, "bbands")
+    try:
+        set_precision("float32")
+        half = calculate_indicator(df, "bbands")
+        signals = crossUpThreshold(df, type="rsi", thr=50, period=14)
+    finally:
+        set_precision("float64")
+    assert indicator_cache_stats()["misses"] == 3
+    assert (half.dtypes[1:] == np.float32).all()
+    assert signals["signal"].dtype == np.float32
+    np.testing.assert_allclose(half["bb_upper"], full["bb_upper"], rtol=1e-7)
+
+
+def test_cache_miss_hashes_a_plain_frame_once(monkeypatch):
+    from src.ta.functions.indicators import indicator_cache
+    from src.ta.functions.indicators.universal_indicator_dispatcher import calculate_indicator
+
+    calls = []
+    content_hash = indicator_cache.content_hash
+    monkeypatch.setattr(indicator_cache, "content_hash", lambda df: calls.append(1) or content_hash(df))
+    df = _ohlcv(seed=11)
+    clear_indicator_cache()
+    calculate_indicator(df, "stochrsi", rsi_length=14, stoch_length=14)
+    assert len(calls) == 1
+
+
+def test_cached_frame_is_not_shared_without_copy_on_write(monkeypatch):
+    from src.ta.functions.indicators import registry
+    from src.ta.functions.indicators.universal_indicator_dispatcher import calculate_indicator
+
+    monkeypatch.setattr(registry, "_copy_on_write", lambda: False)
+    df = _ohlcv(seed=12)
+    clear_indicator_cache()
+    first = calculate_indicator(df, "bbands", period=20)
+    second = calculate_indicator(df, "bbands", period=20)
+    assert not np.shares_memory(first["bb_mid"].to_numpy(), second["bb_mid"].to_numpy())
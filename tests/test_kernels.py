@@ -0,0 +1,70 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.ta.functions.indicators.universal_indicator_dispatcher import calculate_indicator
+
+
+OHLCV = {"seed": 7, "n": 600, "start": "2021-01-01"}
+
+
+@pytest.mark.parametrize("type, kwargs", [
+    ("rsi", {"period": 21}),
+    ("williams", {}),
+    ("ma", {"period": 10}),
+    ("ema", {}),
+    ("ema_ribbon", {}),
+    ("ema_crossover", {}),
+    ("macd", {"fast": 8, "slow": 30, "signal": 5}),
+    ("roc", {}),
+    ("stochrsi", {"line": "stochrsi_d"}),
+    ("adx", {}),
+    ("ichimoku", {}),
+    ("bbands", {"std_dev": 1.5}),
+    ("atr", {}),
+    ("donchian", {}),
+])
+def test_kernel_backend_matches_pandas(ohlcv, type, kwargs):
+    expected = calculate_indicator(ohlcv.copy(), type=type, backend="pandas", **kwargs)
+    got = calculate_indicator(ohlcv, type=type, backend="numba", **kwargs)
+
+    assert list(got.columns) == list(expected.columns)
+    assert got.index.equals(expected.index)
+    for col in expected.columns[1:]:
+        np.testing.assert_allclose(got[col].to_numpy(float), expected[col].to_numpy(float), rtol=1e-9, atol=1e-9)
+
+
+def test_kernel_backend_does_not_mutate_input(ohlcv):
+    before = list(ohlcv.columns)
+    calculate_indicator(ohlcv, type="macd", backend="numba")
+    assert list(ohlcv.columns) == before
+
+
+def test_ema_provider_fused_pass_matches_pandas():
+    from src.ta.functions.indicators.ema_provider import EMAProvider
+
+    close = pd.Series(100 + np.cumsum(np.random.default_rng(3).normal(0, 1, 500)))
+    close[[0, 7, 250]] = np.nan
+    provider = EMAProvider(close.to_numpy())
+    spans = [8, 13, 21, 34, 55, 89, 144, 233]
+    ribbon = provider.emas(spans)
+    for j, span in enumerate(spans):
+        np.testing.assert_allclose(ribbon[:, j], close.ewm(span=span, adjust=False).mean(), rtol=1e-12)
+    assert provider.ema(21) is provider.ema(21.0)
+
+
+def test_registry_warmup_and_lines_match_frames(ohlcv):
+    from src.ta.functions.indicators import INDICATOR_MAP
+    from src.ta.functions.indicators.registry import get_indicator, indicator_registry
+
+    assert set(INDICATOR_MAP) == set(indicator_registry())
+    for name, spec in indicator_registry().items():
+        frame = calculate_indicator(ohlcv, name)
+        assert frame.index[0] == spec.warmup_bars({}), name
+        assert spec.line({}) == [c for c in frame.columns if c != "Date"][0], name
+
+    # params outside the schema do not change the computation; line selection does not recompute
+    macd = get_indicator("macd")
+    assert macd.key({"period": 5}) == macd.key({"fast": 12})
+    d_line = calculate_indicator(ohlcv, "stochrsi", line="stochrsi_d")
+    assert list(d_line.columns) == ["Date", "stochrsi_d"]
@@ -0,0 +1,47 @@
+import numpy as np
+import pandas as pd
+
+from src.ta.functions.indicators.level_index import LevelIndex
+from src.ta.functions.indicators.threshold_functions import inRangeThreshold, inRangeThresholds
+
+
+def test_counts_and_positions_match_masks():
+    rng = np.random.default_rng(8)
+    values = rng.normal(50, 20, 1000).round(1)
+    values[[3, 400, 999]] = np.nan
+    rows = np.arange(1000) + 25
+    index = LevelIndex(values, rows)
+    lowers = np.array([-np.inf, 20, 30, 50.0, 80, np.nan])
+    uppers = np.array([10, 30, 50.0, 70, np.inf])
+    counts = index.counts(lowers, uppers)
+    for i, lo in enumerate(lowers):
+        for j, up in enumerate(uppers):
+            mask = (values >= lo) & (values <= up)
+            assert counts[i, j] == mask.sum()
+            np.testing.assert_array_equal(index.positions(lo, up), rows[mask])
+
+
+def test_threshold_grid_matches_single_calls():
+    rng = np.random.default_rng(9)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, 300)))
+    df = pd.DataFrame({"Date": pd.date_range("2021-01-01", periods=300), "open": close, "high": close,
+                       "low": close, "close": close, "volume": 1.0})
+    lower, upper = [20, 35, 50], [40, 60]
+    grid = inRangeThresholds(df, "rsi", 14, lower, upper)
+    counts = inRangeThresholds(df, "rsi", 14, lower, upper, counts_only=True)
+    for i, lo in enumerate(lower):
+        for j, up in enumerate(upper):
+            single = inRangeThreshold(df, "rsi", 14, lo, up)
+            assert grid[i][j].positions.tolist() == single.positions.tolist()
+            assert counts[i, j] == len(single)
+
+
+def test_range_grid_defers_positions_until_read():
+    rng = np.random.default_rng(9)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, 300)))
+    df = pd.DataFrame({"Date": pd.date_range("2021-01-01", periods=300), "open": close, "high": close,
+                       "low": close, "close": close, "volume": 1.0})
+    signals = inRangeThresholds(df, "rsi", 14, [30], [60])[0][0]
+    assert signals._positions is None and len(signals) > 0
+    assert len(signals.positions) == len(signals)
+    assert (signals & signals).positions.tolist() == signals.positions.tolist()
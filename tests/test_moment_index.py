@@ -0,0 +1,81 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.ta.functions.indicators.moment_index import MomentIndex, moment_index
+from src.ta.functions.indicators.universal_indicator_dispatcher import calculate_indicator
+
+
+def _series(kind):
+    rng = np.random.default_rng(11)
+    n = 600
+    if kind == "trend":
+        x = 100 * np.exp(np.cumsum(rng.normal(0.003, 0.02, n)))
+    elif kind == "flat":
+        x = np.round(50_000 + np.cumsum(rng.normal(0, 0.01, n)), 2)
+        x[100:160] = 50_000.0
+    else:
+        x = rng.normal(0, 1, n)
+        x[[10, 300, 301]] = np.nan
+    return x
+
+
+@pytest.mark.parametrize("kind", ["trend", "flat", "nan"])
+def test_moments_match_pandas_rolling(kind):
+    x = _series(kind)
+    index = MomentIndex(x)
+    periods = [1, 2, 5, 20, 64, 600, 700]
+    mean, std = index.moments(periods)
+    for j, p in enumerate(periods):
+        np.testing.assert_allclose(mean[:, j], pd.Series(x).rolling(p).mean().to_numpy(), rtol=1e-10, atol=1e-9)
+        # two-pass reference: pandas' add/remove variance itself drifts by ~1e-6 on the flat series
+        exact = np.full(len(x), np.nan)
+        if p > 1:
+            for i in range(p - 1, len(x)):
+                exact[i] = np.std(x[i - p + 1:i + 1], ddof=1)
+        np.testing.assert_allclose(std[:, j], exact, rtol=1e-9, atol=1e-12)
+
+
+def test_bands_grid_matches_calculate_bbands():
+    x = _series("trend")
+    df = pd.DataFrame({"Date": pd.date_range("2020-01-01", periods=len(x)), "close": x})
+    params = [(p, k) for p in (10, 20, 50) for k in (1.5, 2.0, 2.5)]
+    lower, mid, upper = moment_index(df).bands(params)
+    for j, (p, k) in enumerate(params):
+        expected = calculate_indicator(df, "bbands", backend="pandas", period=p, std_dev=k)
+        rows = expected.index.to_numpy()
+        np.testing.assert_allclose(lower[rows, j], expected["bb_lower"], rtol=1e-9)
+        np.testing.assert_allclose(upper[rows, j], expected["bb_upper"], rtol=1e-9)
+        assert np.isnan(mid[: p - 1, j]).all()
+
+
+
+def _two_pass_skew_kurt(x, p):
+    skew, kurt = np.full(len(x), np.nan), np.full(len(x), np.nan)
+    for i in range(p - 1, len(x)):
+        w = x[i + 1 - p:i + 1]
+        d = w - w.mean()
+        m2, m3, m4 = (d ** 2).mean(), (d ** 3).mean(), (d ** 4).mean()
+        if (w == w[0]).all():
+            skew[i], kurt[i] = 0.0, -3.0
+        if np.isnan(m2) or m2 <= 1e-14:
+            continue
+        skew[i] = np.sqrt(p * (p - 1)) / (p - 2) * m3 / m2 ** 1.5
+        kurt[i] = ((p * p - 1) * m4 / m2 ** 2 - 3 * (p - 1) ** 2) / ((p - 2) * (p - 3))
+    return skew, kurt
+
+
+@pytest.mark.parametrize("kind", ["trend", "flat", "nan"])
+def test_higher_moments_match_rolling(kind):
+    # pandas' online skew/kurt drift (up to 1e-2 on the flat series) and its
+    # skew stays NaN after a NaN, so skew/kurt are checked against a two-pass reference
+    x = _series(kind)
+    periods = [4, 20, 64, 600]
+    mean, var, skew, kurt = MomentIndex(x).higher_moments(periods)
+    for j, p in enumerate(periods):
+        r = pd.Series(x).rolling(p)
+        np.testing.assert_allclose(mean[:, j], r.mean().to_numpy(), rtol=1e-10, atol=1e-9)
+        np.testing.assert_allclose(var[:, j], r.var().to_numpy(), rtol=1e-7, atol=1e-9)
+        ref_skew, ref_kurt = _two_pass_skew_kurt(x, p)
+        np.testing.assert_allclose(skew[:, j], ref_skew, rtol=1e-6, atol=1e-7)
+        np.testing.assert_allclose(kurt[:, j], ref_kurt, rtol=1e-6, atol=1e-6)
@@ -0,0 +1,50 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.ta.data.ohlcv import OHLCV
+from src.ta.functions.indicators.threshold_functions import crossUpThreshold, timeThreshold
+from src.ta.functions.indicators.universal_indicator_dispatcher import calculate_indicator
+
+
+@pytest.fixture
+def ohlcv_df():
+    rng = np.random.default_rng(5)
+    n = 300
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, n)))
+    return pd.DataFrame({
+        "Date": pd.date_range("2023-01-01", periods=n),
+        "open": close, "high": close * 1.01, "low": close * 0.99, "close": close, "volume": 1.0,
+    })
+
+
+def test_columns_are_read_only(ohlcv_df):
+    prices = OHLCV(ohlcv_df)
+    with pytest.raises(ValueError):
+        prices.values("close")[0] = 0.0
+    assert prices["close"].to_numpy()[0] == ohlcv_df["close"].iloc[0]
+
+
+def test_columns_keep_their_dtype(ohlcv_df):
+    ohlcv_df = ohlcv_df.assign(volume=np.arange(len(ohlcv_df), dtype=np.int64))
+    prices = OHLCV(ohlcv_df)
+    assert prices.values("volume").dtype == np.int64
+    assert prices.values("close").dtype == np.float64
+    assert prices.to_frame().dtypes.equals(ohlcv_df.dtypes)
+
+
+@pytest.mark.parametrize("backend", ["numba", "pandas"])
+def test_indicators_accept_container(ohlcv_df, backend):
+    expected = calculate_indicator(ohlcv_df, type="adx", backend=backend)
+    got = calculate_indicator(OHLCV(ohlcv_df), type="adx", backend=backend)
+    pd.testing.assert_frame_equal(got, expected)
+
+
+@pytest.mark.parametrize("backend", ["numba", "pandas"])
+def test_thresholds_do_not_mutate_input(ohlcv_df, backend):
+    before = ohlcv_df.copy()
+    for type in ("rsi", "macd", "adx", "ema_crossover", "ichimoku", "bbands", "donchian"):
+        calculate_indicator(ohlcv_df, type=type, backend=backend)
+    crossUpThreshold(ohlcv_df, type="rsi", thr=30, period=14)
+    timeThreshold(ohlcv_df, type="rsi", period=14, level=40, direction="below")
+    pd.testing.assert_frame_equal(ohlcv_df, before)
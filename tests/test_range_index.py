@@ -0,0 +1,57 @@
+import numpy as np
+import pytest
+
+from src.ta.functions.indicators.range_index import ExtremumIndex, extremum_index
+
+
+OHLCV = {"seed": 5, "n": 300, "start": "2021-01-01"}
+
+
+@pytest.fixture(scope="module")
+def ohlcv(ohlcv):
+    ohlcv = ohlcv.copy()
+    ohlcv.loc[[40, 41, 200], "high"] = np.nan
+    return ohlcv
+
+
+@pytest.mark.parametrize("window", [1, 2, 3, 7, 16, 17, 52, 299, 300, 400])
+def test_matches_pandas_rolling(ohlcv, window):
+    index = ExtremumIndex(ohlcv)
+    for col in ("high", "low"):
+        np.testing.assert_array_equal(index.rolling_max(col, window), ohlcv[col].rolling(window).max().to_numpy())
+        np.testing.assert_array_equal(index.rolling_min(col, window), ohlcv[col].rolling(window).min().to_numpy())
+
+
+def test_derived_series_and_registry(ohlcv):
+    index = extremum_index(ohlcv)
+    assert extremum_index(ohlcv.copy()) is index
+    calls = []
+    derived = lambda: calls.append(1) or ohlcv["close"].diff().to_numpy()
+    for window in (5, 10, 20):
+        expected = ohlcv["close"].diff().rolling(window).max().to_numpy()
+        np.testing.assert_array_equal(index.rolling_max("diff", window, derived), expected)
+    assert len(calls) == 1
+
+
+def test_tables_are_built_on_reuse_and_charged_to_the_budget(ohlcv):
+    from src.ta.functions.indicators.range_index import _table_bytes, extremum_table_stats, set_extremum_table_budget
+
+    before = extremum_table_stats()["max_bytes"]
+    try:
+        index = ExtremumIndex(ohlcv)
+        index.rolling_max("close", 10)
+        assert not index._tables    # one window: deque kernel, no table
+        index.rolling_max("close", 20)
+        assert ("close", True) in index._tables
+        one_table = _table_bytes(len(ohlcv))
+        set_extremum_table_budget(one_table)    # room for a single table
+        for window in (5, 10):
+            expected = ohlcv["low"].rolling(window).min().to_numpy()
+            np.testing.assert_array_equal(index.rolling_min("low", window), expected)
+        assert list(index._tables) == [("low", False)]
+        assert extremum_table_stats()["bytes"] <= one_table
+        set_extremum_table_budget(0)            # nothing fits: every query stays on the deque kernel
+        np.testing.assert_array_equal(index.rolling_min("low", 7), ohlcv["low"].rolling(7).min().to_numpy())
+        assert not index._tables
+    finally:
+        set_extremum_table_budget(before)
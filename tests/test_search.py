@@ -0,0 +1,144 @@
+import itertools
+
+import pytest
+
+from src.ta.data.ohlcv import as_ohlcv
+from src.ta.ml.optimizers.search import (
+    _combine_signals, _suggest_config, bayesianSearch, combinatorialBranchAndBound, combinatorialGridSearch,
+    compile_configs, evaluate_config, evaluate_configs, generate_flat_configs,
+)
+from src.ta.ml.optimizers.search_space import SearchSpace
+
+
+OHLCV = {"seed": 21, "wicks": False}
+
+
+SPACES = [
+    {"type": "crossUpThreshold", "indicator": "rsi", "period": [7, 14], "threshold": [30, 50, 70], "wd": 1},
+    {"type": "inRangeThreshold", "indicator": "rsi", "period": [14], "lower": [20, 40], "upper": [50, 80]},
+    {"type": "timeThreshold", "indicator": "rsi", "period": [14], "threshold": [45, 55],
+     "direction": ["above", "below"], "min_candles": [2, 4], "wd": 1},
+    {"type": "stdvBandsThreshold", "ema_period": [10, 20], "window": [30], "sigma": [0.5, 1.0, 1.5], "wd": 1},
+    {"type": "kurtosisThreshold", "window": [20], "k_range": [(-2.0, 1.0), (0.0, 10.0)]},
+    {"type": "skewThreshold", "window": [20, 40], "s_range": [(-1.0, 1.0)]},
+    {"type": "stdvKurtosisThreshold", "ema_p": [20], "window": [30], "sig": [0.5, 1.0], "k_win": [30],
+     "delta_k": [0.1], "n": [3], "sell": True},
+]
+
+
+def test_batched_evaluation_matches_single_configs(ohlcv):
+    configs = [c for space in SPACES for c in generate_flat_configs(space)]
+    batched = evaluate_configs(as_ohlcv(ohlcv), configs, n_jobs=1)
+    for cfg, result in zip(configs, batched):
+        single = evaluate_config(ohlcv, cfg)
+        assert result["config"] is cfg
+        assert result["signals"] == single["signals"]
+        assert result["signals_df"].positions.tolist() == single["signals_df"].positions.tolist()
+    assert sum(r["signals"] > 0 for r in batched) > len(configs) // 2
+
+
+@pytest.mark.parametrize("n_jobs", [1, 3])
+def test_dag_matches_single_configs_and_shares_nodes(ohlcv, n_jobs):
+    configs = [c for space in SPACES for c in generate_flat_configs(space)]
+    configs.append({"type": "crossUpThreshold", "indicator": "rsi", "period": 14, "thr": "x", "wd": 1})
+    dag = compile_configs(as_ohlcv(ohlcv), configs)
+    n_nodes = len(dag.nodes)
+    dag.add_config(dict(configs[0]))    # a duplicate config adds no node
+    assert len(dag.nodes) == n_nodes < dag.requests
+    results = dag.run(n_jobs=n_jobs).results()
+    for cfg, result in zip(configs, results):
+        assert result["signals_df"].positions.tolist() == evaluate_config(ohlcv, cfg)["signals_df"].positions.tolist()
+        assert result["signals_df"].base is not None     # rebound after the trip through a worker
+
+
+def test_combinatorial_grid_combines_single_signals(ohlcv):
+    spaces = [SPACES[0], SPACES[3]]
+    results = combinatorialGridSearch(ohlcv, spaces, mode="or", n_jobs=1)
+    groups = [generate_flat_configs(space) for space in spaces]
+    assert len(results) == len(groups[0]) * len(groups[1])
+    expected = {
+        repr(combo): len(_combine_signals(ohlcv, [evaluate_config(ohlcv, c)["signals_df"] for c in combo], "or"))
+        for combo in itertools.product(*groups)
+    }
+    assert all(r["signals"] == expected[repr(r["combination"])] for r in results)
+
+
+@pytest.mark.parametrize("mode, within", [("and", 0), ("within", [0, 4])])
+def test_streaming_top_k_matches_full_grid(ohlcv, mode, within):
+    spaces = [SPACES[0], SPACES[3]]
+    full = combinatorialGridSearch(ohlcv, spaces, mode=mode, within=within, n_jobs=1)
+    top = combinatorialGridSearch(ohlcv, spaces, mode=mode, within=within, n_jobs=1, top_k=5)
+    assert len(top) == 5
+    for streamed, expected in zip(top, full[:5]):
+        assert streamed["combination"] == expected["combination"]
+        assert streamed.get("within") == expected.get("within")
+        assert streamed["signals_df"].positions.tolist() == expected["signals_df"].positions.tolist()
+
+
+def test_then_mode_needs_a_positive_window(ohlcv):
+    from src.ta.functions.indicators.universal_threshold_dispatcher import mixThresholds
+
+    with pytest.raises(ValueError, match="within >= 1"):
+        mixThresholds(ohlcv, [SPACES[0], SPACES[3]], mode="then")
+    with pytest.raises(ValueError, match="within >= 1"):
+        combinatorialGridSearch(ohlcv, [SPACES[0], SPACES[3]], mode="then", within=[0, 2], n_jobs=1)
+
+
+@pytest.mark.parametrize("top_k", [0, -2])
+def test_top_k_must_be_positive(ohlcv, top_k):
+    with pytest.raises(ValueError, match="top_k"):
+        combinatorialGridSearch(ohlcv, [SPACES[0], SPACES[3]], n_jobs=1, top_k=top_k)
+    with pytest.raises(ValueError, match="top_k"):
+        combinatorialBranchAndBound(ohlcv, [SPACES[0], SPACES[3]], n_jobs=1, top_k=top_k)
+
+
+@pytest.mark.parametrize("min_signals, top_k", [(1, None), (3, None), (1, 4)])
+def test_branch_and_bound_matches_and_grid(ohlcv, min_signals, top_k):
+    spaces = [SPACES[3], SPACES[0], SPACES[2]]
+    full = [r for r in combinatorialGridSearch(ohlcv, spaces, mode="and", n_jobs=1) if r["signals"] >= min_signals]
+    pruned = combinatorialBranchAndBound(ohlcv, spaces, min_signals=min_signals, top_k=top_k, n_jobs=1)
+    expected = full if top_k is None else full[:top_k]
+    assert [r["combination"] for r in pruned] == [r["combination"] for r in expected]
+    assert [r["signals_df"].positions.tolist() for r in pruned] == [r["signals_df"].positions.tolist() for r in expected]
+
+
+def test_optuna_mapping_covers_every_swept_parameter(ohlcv):
+    import optuna
+
+    space = SearchSpace(SPACES)
+    study = optuna.create_study(direction="maximize", sampler=optuna.samplers.RandomSampler(seed=0))
+    seen = {}
+    for _ in range(60):
+        trial = study.ask()
+        cfg = _suggest_config(trial, space)
+        assert any(cfg == c for c in space)
+        study.tell(trial, 0.0)
+        seen.setdefault(cfg["type"], set()).update(k for k in trial.params if k != "strategy_idx")
+    assert any(k.endswith("_direction") for k in seen["timeThreshold"])
+    assert any(k.endswith("_min_candles") for k in seen["timeThreshold"])
+    assert any(k.endswith("_lower") for k in seen["inRangeThreshold"])
+    assert any(k.endswith("_k_range") for k in seen["kurtosisThreshold"])
+
+    results = bayesianSearch(ohlcv, SPACES, n_iter=12, n_jobs=1, batch_size=5, seed=1)
+    assert results and all(r["signals"] == evaluate_config(ohlcv, r["config"])["signals"] for r in results)
+
+
+def test_bayesian_workers_share_one_sqlite_study(ohlcv, tmp_path):
+    import optuna
+
+    storage = f"sqlite:///{tmp_path / 'study.db'}"
+    results = bayesianSearch(ohlcv, SPACES, n_iter=10, n_jobs=2, batch_size=3, seed=5, storage=storage)
+    assert results and all(r["signals"] == evaluate_config(ohlcv, r["config"])["signals"] for r in results)
+    assert all(r["signals_df"].base is not None for r in results)
+    (name,) = optuna.get_all_study_names(storage)
+    trials = optuna.load_study(study_name=name, storage=storage).trials
+    assert len(trials) == 10 and all(t.state == optuna.trial.TrialState.COMPLETE for t in trials)
+
+
+def test_mix_thresholds_forwards_the_bayesian_settings(ohlcv):
+    from src.ta.functions.indicators.universal_threshold_dispatcher import mixThresholds
+
+    spaces = [SPACES[0], SPACES[3]]
+    runs = [mixThresholds(ohlcv, spaces, search="bayesian", n_iter=8, n_jobs=1, batch_size=4, seed=3) for _ in range(2)]
+    assert runs[0] and len(runs[0]) <= 8
+    assert [r["combination"] for r in runs[0]] == [r["combination"] for r in runs[1]]
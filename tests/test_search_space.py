@@ -0,0 +1,63 @@
+import itertools
+import json
+
+import pytest
+
+from src.ta.ml.optimizers.search_space import SearchSpace, sample_digits
+
+SPACES = [
+    {"type": "crossUpThreshold", "indicator": "macd", "period": [5, 10], "threshold": [-1, 0, 1], "wd": 0,
+     "indicator_params": {"fast": [5, 10], "slow": [20, 30, 40]}},
+    {"type": "timeThreshold", "indicator": "rsi", "period": [14], "threshold": [30, 50], "direction": ["above", "below"],
+     "min_candles": [1, 2, 3], "sell": True},
+    {"type": "crossUpLineThreshold", "indicators": ["ema", "ma"], "periods": [[5, 8], [20, 30, 50]], "wd": 2},
+    {"type": "kurtosisThreshold", "window": [20, 40], "k_range": [(-2.0, 1.0), (0.0, 10.0)]},
+    {"type": "unknownThreshold"},
+]
+
+
+def _key(cfg):
+    return json.dumps(cfg, sort_keys=True, default=str)
+
+
+def test_size_access_and_iteration_agree():
+    space = SearchSpace(SPACES)
+    configs = list(space)
+    assert len(space) == len(configs) == 36 + 12 + 6 + 4
+    assert [_key(space[i]) for i in range(len(space))] == [_key(c) for c in configs]
+    assert _key(space[-1]) == _key(configs[-1])
+    assert configs[1] == {"type": "crossUpThreshold", "indicator": "macd", "period": 5, "thr": -1, "wd": 0, "sell": False,
+                          "indicator_params": {"fast": 5, "slow": 30}}
+    with pytest.raises(IndexError):
+        space[len(space)]
+
+
+@pytest.mark.parametrize("strided", [False, True])
+def test_shards_partition_the_grid(strided):
+    space = SearchSpace(SPACES)
+    shards = [space.shard(i, 5, strided=strided) for i in range(5)]
+    assert sum(len(s) for s in shards) == len(space)
+    merged = sorted(itertools.chain(*(list(s) for s in shards)), key=lambda c: list(map(_key, space)).index(_key(c)))
+    assert [_key(c) for c in merged] == [_key(c) for c in space]
+    assert [_key(c) for c in shards[1].shard(0, 2)] == [_key(c) for c in list(shards[1])[:len(shards[1]) // 2]]
+
+
+def test_sample_without_replacement_on_a_huge_grid():
+    huge = SearchSpace({"type": "inRangeThreshold", "indicator": "rsi", "period": list(range(1000)),
+                        "lower": list(range(1000)), "upper": list(range(1000))})
+    assert len(huge) == 10 ** 9
+    picks = huge.sample(200, seed=3)
+    assert len({_key(c) for c in picks}) == 200
+    assert [_key(c) for c in picks] == [_key(c) for c in huge.sample(200, seed=3)]
+    assert huge[10 ** 9 - 1]["period"] == 999 and huge[1234567]["upper"] == 567
+
+
+@pytest.mark.parametrize("sampler", ["uniform", "sobol", "halton", "lhs"])
+def test_samplers_are_distinct_and_reproducible(sampler):
+    space = SearchSpace(SPACES)
+    picks = space.sample(40, seed=11, sampler=sampler)
+    assert len({_key(c) for c in picks}) == 40
+    assert [_key(c) for c in picks] == [_key(c) for c in space.sample(40, seed=11, sampler=sampler)]
+    assert {_key(c) for c in space.sample(10 ** 6, seed=1, sampler=sampler)} == {_key(c) for c in space}
+    digits = sample_digits([2, 3, 4], 24, seed=5, sampler=sampler)
+    assert sorted(digits) == list(itertools.product(range(2), range(3), range(4)))
@@ -0,0 +1,52 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.ta.functions.indicators.signal_filters import dilate, min_gap_filter, min_gap_positions
+from src.ta.functions.indicators.signal_set import SignalSet
+
+
+def _greedy(ticks, gap, keys=None):
+    """Reference: keep a tick when it is more than gap after the last kept one."""
+    keep, last = [], None
+    for t, key in zip(ticks, keys if keys is not None else ticks):
+        if last is None or t - last > gap:
+            keep.append(key)
+            last = t
+    return keep
+
+
+@pytest.fixture(scope="module")
+def bars():
+    n = 500
+    return pd.DataFrame({"Date": pd.date_range("2022-01-01", periods=n, freq="6h"), "close": np.linspace(1, 2, n)})
+
+
+def test_min_gap_is_greedy_against_last_kept():
+    ticks = np.array([0, 1, 2, 3, 4, 10, 11, 13])
+    assert ticks[min_gap_positions(ticks, 1)].tolist() == [0, 2, 4, 10, 13]
+    assert ticks[min_gap_positions(ticks, 0)].tolist() == ticks.tolist()
+
+
+def test_batched_filter_matches_reference(bars):
+    rng = np.random.default_rng(4)
+    sets = [SignalSet(rng.choice(len(bars), size=k, replace=False), base=bars) for k in (0, 1, 40, 200)]
+    wds = [0, 1, 2.5, 7]
+    by_wd = min_gap_filter(sets, wds, unit="D")
+    for wd, filtered in zip(wds, by_wd):
+        for s, f in zip(sets, filtered):
+            days = (bars["Date"].to_numpy()[s.positions] - bars["Date"].to_numpy()[0]) / np.timedelta64(1, "D")
+            # more than wd whole days <=> at least floor(wd) + 1 days
+            assert f.positions.tolist() == _greedy(days, np.floor(wd) + 0.9, keys=s.positions.tolist())
+        bars_filtered = min_gap_filter(sets[3], wd, unit="bars")
+        assert bars_filtered.positions.tolist() == _greedy(sets[3].positions.tolist(), np.floor(wd))
+
+
+@pytest.mark.parametrize("radius", [0, 1, 3, 20])
+def test_dilate_matches_shift_union(radius):
+    mask = np.random.default_rng(radius).random((200, 3)) < 0.05
+    expected = mask.copy()
+    for i in range(1, radius + 1):
+        expected[i:] |= mask[:-i]
+        expected[:-i] |= mask[i:]
+    np.testing.assert_array_equal(dilate(mask, radius), expected)
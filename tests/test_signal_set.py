@@ -0,0 +1,131 @@
+import pickle
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.ta.functions.indicators.signal_set import SignalSet, bind_signals, co_occur, in_sequence, k_of_n
+from src.ta.functions.indicators.threshold_functions import (
+    crossUpLineThreshold, crossUpThreshold, crossUpThresholds, stdvBandsThreshold, stdvBandsThresholds,
+    timeThreshold, timeThresholds,
+)
+from src.ta.functions.indicators.universal_indicator_dispatcher import calculate_indicator
+
+
+OHLCV = {"seed": 11, "start": "2021-01-01", "wicks": False}
+
+
+def test_frame_form_matches_positions(ohlcv):
+    signals = crossUpThreshold(ohlcv, type="rsi", thr=50, period=14)
+    assert isinstance(signals, SignalSet) and not signals.empty
+    frame = signals.to_frame()
+    assert list(frame.columns) == ["Date", "signal"]
+    np.testing.assert_array_equal(frame["signal"].to_numpy(), ohlcv["close"].to_numpy()[signals.positions])
+    np.testing.assert_array_equal(signals["Date"].to_numpy(), ohlcv["Date"].to_numpy()[signals.positions])
+    assert signals.mask.sum() == len(signals)
+
+
+def test_set_algebra_and_bits(ohlcv):
+    a = SignalSet([1, 5, 9, 300], base=ohlcv)
+    b = SignalSet([9, 5, 7], base=ohlcv)
+    assert (a & b).positions.tolist() == [5, 9]
+    assert (a | b).positions.tolist() == [1, 5, 7, 9, 300]
+    assert SignalSet.from_bits(a.bits, len(ohlcv)).positions.tolist() == a.positions.tolist()
+
+
+def test_pickle_drops_dataset_and_rebinds(ohlcv):
+    signals = timeThreshold(ohlcv, type="rsi", period=14, level=50, direction="above", wd=1)
+    restored = pickle.loads(pickle.dumps(signals))
+    assert restored.base is None and len(restored) == len(signals)
+    with pytest.raises(ValueError):
+        restored.to_frame()
+    bind_signals([{"signals_df": restored}], ohlcv)
+    pd.testing.assert_frame_equal(restored.to_frame(), signals.to_frame())
+
+
+def test_threshold_vector_matches_single_calls(ohlcv):
+    thrs = [0.05, 0.2, 0.2, 0.35, 0.8]
+    buys, sells = crossUpThresholds(ohlcv, type="stochrsi", thr=thrs, period=14, wd=1, sell="both")
+    for thr, buy, sell in zip(thrs, buys, sells):
+        assert buy.positions.tolist() == crossUpThreshold(ohlcv, "stochrsi", thr, 14, wd=1).positions.tolist()
+        assert sell.positions.tolist() == crossUpThreshold(ohlcv, "stochrsi", thr, 14, wd=1, sell=True).positions.tolist()
+    cross = crossUpThresholds(ohlcv, type="stochrsi", thr=thrs, period=14, wd=1, matrix=True)
+    assert cross.shape == (len(ohlcv), len(thrs))
+    assert cross.sum(axis=0).tolist() == [len(b) for b in buys]
+
+
+def _time_reference(ohlcv, level, direction, min_candles, wd):
+    # the original pandas streak logic: run ids, cumulative count per run, shift-based ±wd expansion
+    ind = calculate_indicator(ohlcv, "rsi", period=14, backend="pandas")
+    value = ind[[c for c in ind.columns if c != "Date"][0]]
+    cond = value > level if direction == "above" else value < level
+    streak = (cond != cond.shift()).cumsum()
+    valid = cond.groupby(streak).cumsum() >= min_candles
+    for i in range(1, wd + 1):
+        valid |= valid.shift(i, fill_value=False)
+        valid |= valid.shift(-i, fill_value=False)
+    return ind.loc[valid, "Date"].tolist()
+
+
+@pytest.mark.parametrize("wd", [0, 2])
+def test_time_grid_matches_pandas_streaks(ohlcv, wd):
+    levels, min_candles = [40, 50, 65], [0, 1, 3, 6]
+    for direction in ("below", "above"):
+        grid = timeThresholds(ohlcv, type="rsi", period=14, level=levels, direction=direction, min_candles=min_candles, wd=wd)
+        for i, level in enumerate(levels):
+            for j, mc in enumerate(min_candles):
+                assert grid[i][j]["Date"].tolist() == _time_reference(ohlcv, level, direction, mc, wd)
+
+
+def test_sigma_sweep_matches_single_calls(ohlcv):
+    sigmas = [0.5, 0.8, 1.5]
+    above, below = stdvBandsThresholds(ohlcv, ema_period=10, window=30, sigma=sigmas, wd=2)
+    for k, sigma in enumerate(sigmas):
+        s_above, s_below = stdvBandsThreshold(ohlcv, ema_period=10, window=30, sigma=sigma, wd=2)
+        assert above[k].positions.tolist() == s_above.positions.tolist()
+        assert below[k].positions.tolist() == s_below.positions.tolist()
+
+
+def test_bitset_algebra_matches_position_sets(ohlcv):
+    rng = np.random.default_rng(5)
+    n = len(ohlcv)
+    sets = [SignalSet(rng.choice(n, size, replace=False), base=ohlcv) for size in (40, 120, 7, 250)]
+    a, b = sets[0], sets[1]
+    assert (a & b).positions.tolist() == np.intersect1d(a.positions, b.positions).tolist()
+    assert (a | b).positions.tolist() == np.union1d(a.positions, b.positions).tolist()
+    assert (a - b).positions.tolist() == np.setdiff1d(a.positions, b.positions).tolist()
+    votes = np.bincount(np.concatenate([s.positions for s in sets]), minlength=n)
+    for k in range(0, 6):
+        combined = k_of_n(sets, k)
+        assert len(combined) == (votes >= k).sum()
+        assert combined.positions.tolist() == np.flatnonzero(votes >= k).tolist()
+    lazy = SignalSet.from_words(a.words, n, base=ohlcv)
+    assert len(lazy) == len(a) and lazy._positions is None
+    pd.testing.assert_frame_equal(lazy.to_frame(), a.to_frame())
+
+
+def test_temporal_tolerance_modes(ohlcv):
+    a = SignalSet([10, 50, 100, 200], base=ohlcv)
+    b = SignalSet([12, 50, 140, 203], base=ohlcv)
+    assert co_occur([a, b], 0).positions.tolist() == [50]
+    assert co_occur([a, b], 3).positions.tolist() == [12, 50, 203]
+    assert co_occur([a, b], 3).positions.tolist() == co_occur([b, a], 3).positions.tolist()
+    assert in_sequence([a, b], 2).positions.tolist() == [12]
+    assert in_sequence([a, b], 3).positions.tolist() == [12, 203]
+    assert in_sequence([b, a], 59).positions.tolist() == [50, 100]
+    c = SignalSet([14, 205], base=ohlcv)
+    assert in_sequence([a, b, c], 3).positions.tolist() == [14, 205]
+    with pytest.raises(ValueError, match="within"):
+        in_sequence([a, b], 0)
+
+
+def test_line_cross_needs_a_line_of_multi_line_indicators(ohlcv):
+    with pytest.raises(ValueError, match="line="):
+        crossUpLineThreshold(ohlcv, "ema", 5, "bbands", 20)
+    signals = crossUpLineThreshold(ohlcv, "ema", 5, "bbands", 20, wd=0, kwargs2={"line": "bb_mid"})
+    fast = calculate_indicator(ohlcv, "ema", period=5)
+    mid = calculate_indicator(ohlcv, "bbands", period=20)[["Date", "bb_mid"]]
+    merged = fast.merge(mid, on="Date")
+    cross = (merged["ema"].shift(1) < merged["bb_mid"].shift(1)) & (merged["ema"] >= merged["bb_mid"])
+    assert len(signals) > 0
+    assert signals["Date"].tolist() == merged.loc[cross, "Date"].tolist()
@@ -0,0 +1,47 @@
+import numpy as np
+import pytest
+
+from src.ta.functions.indicators.streaming import STREAMING_STATES, streaming_state
+from src.ta.functions.indicators.universal_indicator_dispatcher import calculate_indicator
+
+
+OHLCV = {"seed": 21, "start": "2022-06-01"}
+
+
+PARAMS = {
+    "ema": {"period": 10},
+    "ma": {"period": 10},
+    "macd": {"fast": 5, "slow": 20, "signal": 7},
+    "adx": {"period": 14},
+    "rsi": {"period": 14},
+    "roc": {"period": 9},
+    "williams": {"period": 14},
+    "atr": {"period": 14},
+    "bbands": {"period": 20, "std_dev": 2},
+    "donchian": {"period": 20},
+}
+
+
+@pytest.mark.parametrize("type", sorted(STREAMING_STATES))
+def test_seeded_stream_continues_batch(ohlcv, type):
+    params = PARAMS[type]
+    expected = calculate_indicator(ohlcv, type=type, **params).reindex(ohlcv.index)
+    cols = [c for c in expected.columns if c != "Date"]
+
+    split = 150
+    state = streaming_state(type, ohlcv.iloc[:split], **params)
+    for i in range(split, len(ohlcv)):
+        snap = state.update(ohlcv.iloc[i])
+        got = np.array([snap[c] for c in cols], dtype=float)
+        np.testing.assert_allclose(got, expected.loc[i, cols].to_numpy(dtype=float), rtol=1e-8, atol=1e-8)
+
+
+@pytest.mark.parametrize("type", ["rsi", "bbands", "williams"])
+def test_cold_stream_matches_batch(ohlcv, type):
+    params = PARAMS[type]
+    expected = calculate_indicator(ohlcv, type=type, **params).reindex(ohlcv.index)
+    cols = [c for c in expected.columns if c != "Date"]
+    state = streaming_state(type, **params)
+    for bar in ohlcv.itertuples(index=False):
+        snap = state.update(bar)
+    np.testing.assert_allclose([snap[c] for c in cols], expected.iloc[-1][cols].to_numpy(dtype=float), rtol=1e-8)